@@ -0,0 +1,59 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trading_stack.tca.arrival import ArrivalPriceIndex
+
+T0 = datetime(2025, 1, 2, 14, 30, tzinfo=UTC)
+
+
+def _bars(n: int, start: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    close = 100 + np.cumsum(rng.normal(0, 0.05, n + start))[start:]
+    return pd.DataFrame(
+        {
+            "ts": [T0 + timedelta(seconds=start + i) for i in range(n)],
+            "symbol": "SPY",
+            "open": close,
+            "high": close + 0.02,
+            "low": close - 0.04,
+            "close": close,
+            "volume": rng.integers(1, 100, n),
+        }
+    )
+
+
+def test_asof_matches_scan_and_refreshes_incrementally(tmp_path: Path) -> None:
+    path = tmp_path / "bars1s_SPY.parquet"
+    df = _bars(50)
+    df.to_parquet(path, index=False)
+    idx = ArrivalPriceIndex()
+    assert idx.refresh(path) and not idx.refresh(path)
+    assert idx.arrival("SPY", T0 - timedelta(seconds=1)) is None
+
+    df = pd.concat([df, _bars(30, start=50)], ignore_index=True)
+    df.to_parquet(path, index=False)
+    assert idx.refresh(path) and idx.series["SPY"].ts.size == 80
+
+    for sec in (0.0, 12.5, 49.0, 79.9, 500.0):
+        ts = T0 + timedelta(seconds=sec)
+        prior = df[df["ts"] <= ts]
+        assert idx.arrival("SPY", ts) == prior["close"].iloc[-1]
+        assert idx.arrival("SPY", ts, "mid") == (prior["high"] + prior["low"]).iloc[-1] / 2
+        win = prior[prior["ts"] > ts - timedelta(seconds=10)]
+        vwap = (win["close"] * win["volume"]).sum() / win["volume"].sum() if len(win) else None
+        got = idx.arrival("SPY", ts, "vwap", window_sec=10)
+        assert np.isclose(got or 0.0, vwap or prior["close"].iloc[-1])  # empty window -> last
+
+
+def test_rewrite_back_in_time_rebuilds(tmp_path: Path) -> None:
+    path = tmp_path / "bars.parquet"
+    _bars(20, start=10).to_parquet(path, index=False)
+    idx = ArrivalPriceIndex()
+    idx.refresh(path)
+    pd.concat([_bars(20, start=10), _bars(5)], ignore_index=True).to_parquet(path, index=False)
+    idx.refresh(path)
+    ts = idx.series["SPY"].ts
+    assert ts.size == 25 and bool(np.all(np.diff(ts) > 0))
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from trading_stack.services.controller.guards import FeedGuard, GuardState, LlmGuard, PnlGuard
+
+NOW = datetime(2025, 1, 2, 15, 0, tzinfo=UTC)
+
+
+def _append(path: Path, rows: list[dict[str, object]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = pd.DataFrame(rows)
+    if path.exists():
+        df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+    df.to_parquet(path, index=False)
+
+
+def test_feed_guard_folds_appended_bars(tmp_path: Path) -> None:
+    bars = tmp_path / "2025-01-02" / "bars1s_SPY.parquet"
+    g = FeedGuard(tmp_path, "SPY")
+    g.update()
+    assert not g.ok(NOW)
+    _append(bars, [{"ts": NOW - timedelta(seconds=s)} for s in range(40, 60)])
+    g.update()
+    assert not g.ok(NOW)  # 20 of the last 60 s covered
+    _append(bars, [{"ts": NOW - timedelta(seconds=s)} for s in range(0, 40)])
+    g.update()
+    assert g.ok(NOW)
+    assert not g.ok(NOW + timedelta(seconds=61))  # stale without new rows
+
+
+def test_llm_guard_rate_and_latest_threshold(tmp_path: Path) -> None:
+    props, applied = tmp_path / "proposals_SPY.parquet", tmp_path / "applied_SPY.parquet"
+    g = LlmGuard(props, applied)
+    _append(
+        props,
+        [
+            {"ts": NOW - timedelta(minutes=m), "signal.threshold_bps": 1.0 + m}
+            for m in (20, 1, 5, 3)  # not in time order
+        ],
+    )
+    _append(applied, [{"ts": NOW - timedelta(minutes=2), "delta_bps": 0.1}])
+    g.update()
+    assert g.seen(NOW) == 3
+    assert g.latest_threshold() == 2.0
+    assert not g.rate_ok(NOW, max_accept_rate=0.30)  # 1 of 3
+    _append(applied, [{"ts": NOW - timedelta(minutes=1), "delta_bps": 0.0}])
+    _append(props, [{"ts": NOW, "signal.threshold_bps": 0.7}])
+    g.update()
+    assert g.latest_threshold() == 0.7
+    assert g.rate_ok(NOW, max_accept_rate=0.30)  # 1 of 4
+
+
+def _fills(n: int, px: float) -> list[dict[str, object]]:
+    rows: list[dict[str, object]] = []
+    for i in range(n):
+        t = NOW - timedelta(minutes=10) + timedelta(seconds=i)
+        for tag, side, p in ((f"b{px}_{i}", "BUY", 100.0), (f"s{px}_{i}", "SELL", px)):
+            rows.append({"kind": "INTENT", "tag": tag, "symbol": "SPY", "side": side})
+            rows.append({"kind": "FILL", "tag": tag, "event_ts": t, "fill_qty": 10, "avg_px": p})
+    return rows
+
+
+def test_pnl_guard_freezes_on_window_drawdown(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("EQUITY_USD", "1000")
+    ledger = tmp_path / NOW.date().isoformat() / "ledger.parquet"
+    g = PnlGuard(tmp_path, "SPY")
+    g.update(NOW)
+    assert g.ok(NOW)  # neutral without data
+    _append(ledger, _fills(10, 101.0))  # +10 per round trip
+    g.update(NOW)
+    assert g.ok(NOW)
+    _append(ledger, _fills(1, 99.5))  # -5 from a peak of +100: -0.5% of 1000
+    g.update(NOW)
+    assert not g.ok(NOW)
+    assert g.ok(NOW + timedelta(minutes=40))  # points aged out -> neutral
+
+
+def test_guard_state_uses_fresh_mtm_first(tmp_path: Path) -> None:
+    class Mtm:
+        def get(self, _now: datetime) -> dict[str, float]:
+            return {"drawdown_pct": -0.6}
+
+    g = GuardState("SPY", tmp_path, tmp_path, tmp_path / "p.parquet", tmp_path / "a.parquet")
+    g.update(NOW)
+    assert g.not_frozen(NOW)
+    g.mtm = Mtm()  # type: ignore[assignment]
+    assert not g.not_frozen(NOW)
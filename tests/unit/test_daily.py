@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from trading_stack.accounting.daily import (
+    load_close,
+    opening_positions,
+    period_rollup,
+    roll_days,
+)
+
+
+def _fill(tag: str, side: str, q: float, avg: float) -> dict:
+    return {
+        "ts": datetime(2025, 1, 2, tzinfo=UTC),
+        "kind": "FILL",
+        "tag": tag,
+        "symbol": "SPY",
+        "side": side,
+        "fill_qty": q,
+        "avg_px": avg,
+    }
+
+
+def _ledger(root: Path, day: str, rows: list[dict]) -> None:
+    (root / day).mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows).to_parquet(root / day / "ledger.parquet", index=False)
+
+
+def test_close_carries_into_next_day(tmp_path: Path) -> None:
+    led, out = tmp_path / "exec", tmp_path / "acct"
+    _ledger(led, "2025-01-02", [_fill("a", "BUY", 10, 100.0)])
+    _ledger(led, "2025-01-03", [_fill("b", "SELL", 4, 105.0)])
+    assert roll_days(led, out) == ["2025-01-02", "2025-01-03"]
+
+    opening = opening_positions(led, out, "2025-01-03")
+    assert opening["SPY"].qty == 10 and opening["SPY"].avg_cost == 100.0
+    close = load_close(out, "2025-01-03")
+    assert close is not None and close["positions"][0]["qty"] == 6.0
+    assert close["positions"][0]["realized_pnl"] == 20.0  # day-2 realized only
+
+
+def test_rollups_are_cached_and_recomputed_on_change(tmp_path: Path) -> None:
+    led, out = tmp_path / "exec", tmp_path / "acct"
+    _ledger(led, "2025-01-02", [_fill("a", "BUY", 10, 100.0)])
+    _ledger(led, "2025-01-03", [_fill("b", "SELL", 4, 105.0)])
+    _ledger(led, "2025-02-03", [_fill("c", "SELL", 6, 90.0)])
+    roll_days(led, out, fee_per_share=0.01)
+    assert roll_days(led, out, fee_per_share=0.01) == []
+
+    # a changed Jan 2 close moves every later day's opening state
+    _ledger(led, "2025-01-02", [_fill("a", "BUY", 10, 100.0), _fill("x", "BUY", 2, 100.0)])
+    assert roll_days(led, out, fee_per_share=0.01) == ["2025-01-02", "2025-01-03", "2025-02-03"]
+
+    jan = period_rollup(led, out, "2025-01", fee_per_share=0.01).iloc[0]
+    assert jan["days"] == 2 and jan["open_qty"] == 0 and jan["close_qty"] == 8
+    assert jan["realized_pnl"] == 20.0 and jan["turnover"] == 1200.0 + 420.0
+    assert abs(jan["fees"] - 0.16) < 1e-12
+    year = period_rollup(led, out, "2025", fee_per_share=0.01).iloc[0]
+    assert year["close_qty"] == 2 and year["realized_pnl"] == 20.0 - 60.0
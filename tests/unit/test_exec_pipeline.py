@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pandas as pd
+
+from trading_stack.adapters.fake.adapter import FakeAdapter, FakeConfig
+from trading_stack.adapters.ibkr.adapter import OrderEvent, PlaceResult
+from trading_stack.core.schemas import NewOrder
+from trading_stack.execution.store import OrderStateStore
+from trading_stack.ipc.sqlite_queue import connect, depth, enqueue
+from trading_stack.risk.gate import RiskConfig
+from trading_stack.services.execd.worker import ExecPipeline
+
+
+class _SlowAckAdapter:
+    """Acks after a fixed delay and fills each order completely at its limit."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self.waits: list[tuple[float, float]] = []  # (start, end) of each ack wait
+        self.limits: dict[str, tuple[float, float]] = {}
+
+    async def place_async(self, order: NewOrder) -> PlaceResult:
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        start = time.monotonic()
+        await asyncio.sleep(self.delay)
+        self.waits.append((start, time.monotonic()))
+        self._in_flight -= 1
+        self.limits[order.tag or ""] = (order.qty, order.limit or 0.0)
+        trade: Any = SimpleNamespace(order=SimpleNamespace(orderId=1))
+        return PlaceResult(trade=trade, ack_ts=datetime.now(UTC))
+
+    async def events(self, tag: str) -> AsyncIterator[OrderEvent]:
+        qty, px = self.limits.pop(tag)
+        yield OrderEvent(tag, "FILL", datetime.now(UTC), 1, qty=qty, px=px)
+
+
+def test_pipeline_overlaps_slow_acks(tmp_path: Path) -> None:
+    con = connect(tmp_path / "queue.db")
+    for i in range(4):
+        o = NewOrder(
+            symbol="SPY", side="BUY", qty=1, limit=500.0, tag=f"t{i}", ts=datetime.now(UTC)
+        )
+        enqueue(con, "order_intents", f"t{i}", o.model_dump(mode="json"))
+    risk = RiskConfig(max_notional=2000, price_band_bps=150, killswitch_path=str(tmp_path / "HALT"))
+    adapter = _SlowAckAdapter(delay=0.3)
+    pipe = ExecPipeline(con, adapter, risk, str(tmp_path / "exec"), concurrency=4, poll_sec=0.01)
+    asyncio.run(pipe.run(max_loop=2))
+
+    assert adapter.max_in_flight == 3  # max_open_orders=3 rejects the 4th intent
+    # Every ack wait began before the first one finished: they overlapped
+    assert max(s for s, _ in adapter.waits) < min(e for _, e in adapter.waits)
+    assert depth(con, "order_intents") == 0
+    day = datetime.now(UTC).date().isoformat()
+    df = pd.read_parquet(tmp_path / "exec" / day / "ledger.parquet")
+    kinds = df.groupby("kind").size().to_dict()
+    assert kinds["ACK"] == 3 and kinds["REJ"] == 1 and kinds["INTENT"] == 4
+    assert "max open" in str(df[df["kind"] == "REJ"]["reason"].iloc[0])
+
+
+def test_recover_ledgers_fills_that_happened_while_down(tmp_path: Path) -> None:
+    con = connect(tmp_path / "queue.db")
+    risk = RiskConfig(max_notional=2000, price_band_bps=150, killswitch_path=str(tmp_path / "HALT"))
+    fake = FakeAdapter(FakeConfig(ack_sigma=0.0, ack_ms=0.0, fill_model="none"))
+    t0 = datetime.now(UTC)
+
+    async def run() -> tuple[list[str], list[str], list[str]]:
+        store = OrderStateStore(tmp_path / "state")
+        for tag in ("filled", "cancelled", "open", "lost"):
+            store.record(tag, "NEW", t0, symbol="SPY", side="BUY", qty=2)
+            store.record(tag, "ACK", t0)
+            if tag != "lost":
+                o = NewOrder(symbol="SPY", side="BUY", qty=2, limit=500.0, tag=tag, ts=t0)
+                await fake.place_async(o)
+        store.close()  # execd goes down; meanwhile the broker fills one and cancels one
+        fake._execute(fake._tracks["filled"], 2, 2, 500.0)
+        fake.cancel(fake._trades["cancelled"])
+
+        pipe = ExecPipeline(con, fake, risk, str(tmp_path / "exec"), store=store)
+        res = await pipe.recover()
+        assert list(pipe.states) == ["open"]  # still working at the broker: watched again
+        for t in pipe._watching:
+            t.cancel()
+        return res
+
+    closed, unresolved, orphans = asyncio.run(run())
+    assert closed == ["cancelled", "filled"] and unresolved == ["lost"] and orphans == []
+    day = datetime.now(UTC).date().isoformat()
+    df = pd.read_parquet(tmp_path / "exec" / day / "ledger.parquet")
+    rows = {(r.tag, r.kind) for r in df.itertuples()}
+    assert rows == {("filled", "FILL"), ("cancelled", "CANCEL")}
+    fill = df[df["kind"] == "FILL"].iloc[0]
+    assert fill["fill_qty"] == 2 and fill["avg_px"] == 500.0 and fill["symbol"] == "SPY"
+    assert sorted(OrderStateStore(tmp_path / "state").recover()) == ["lost", "open"]
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from trading_stack.adapters.fake.adapter import FakeAdapter, FakeConfig
+from trading_stack.core.schemas import NewOrder
+from trading_stack.services.execd.main import app
+
+
+def _order(tag: str, qty: float = 4, limit: float = 100.0) -> NewOrder:
+    return NewOrder(symbol="SPY", side="BUY", qty=qty, limit=limit, tag=tag, ts=datetime.now(UTC))
+
+
+def test_ack_latency_is_seeded() -> None:
+    a = [FakeAdapter(FakeConfig(seed=3)).ack_latency_sec() for _ in range(2)]
+    b = FakeAdapter(FakeConfig(seed=4)).ack_latency_sec()
+    assert a[0] == a[1] and a[0] != b
+
+
+def test_instant_fills_in_partials() -> None:
+    fake = FakeAdapter(FakeConfig(ack_ms=1.0, ack_sigma=0.0, partials=2))
+
+    async def run() -> list[tuple[str, float]]:
+        await fake.connect_async()
+        await fake.place_async(_order("x"))
+        return [(e.kind, e.qty) async for e in fake.events("x")]
+
+    assert asyncio.run(run()) == [("PARTIAL", 2), ("FILL", 2)]
+    assert fake.open_order_tags() == set()
+
+
+def test_reject_rate_one_raises() -> None:
+    fake = FakeAdapter(FakeConfig(ack_ms=0.1, reject_rate=1.0))
+    with pytest.raises(RuntimeError, match="reject"):
+        asyncio.run(fake.place_async(_order("r")))
+
+
+def test_bars_model_fills_on_trade_through_with_participation(tmp_path: Path) -> None:
+    t0 = datetime(2025, 1, 2, 14, 30, tzinfo=UTC)
+    bars = pd.DataFrame(
+        {
+            "ts": [t0 + timedelta(seconds=i) for i in range(4)],
+            "symbol": "SPY",
+            "open": [101.0, 100.5, 100.2, 99.5],
+            "high": [101.5, 100.8, 100.4, 99.9],
+            "low": [100.6, 100.1, 99.8, 99.2],
+            "close": [100.7, 100.3, 99.9, 99.6],
+            "volume": [100, 100, 100, 100],
+        }
+    )
+    path = tmp_path / "bars.parquet"
+    bars.to_parquet(path, index=False)
+    cfg = FakeConfig(
+        ack_ms=0.1, ack_sigma=0.0, fill_model="bars", bars_path=str(path), bar_sec=0.02
+    )
+    fake = FakeAdapter(cfg)
+
+    async def run() -> list[tuple[str, float, float]]:
+        await fake.connect_async()
+        await fake.place_async(_order("b", qty=15, limit=100.0))
+        return [(e.kind, e.qty, e.px) async for e in fake.events("b")]
+
+    evs = asyncio.run(run())
+    # only bars 2-3 trade through 100.0 (at the limit / at the 99.5 open); 10% of volume each
+    assert [e[1] for e in evs] == [10, 5] and evs[-1][0] == "FILL"
+    assert {e[2] for e in evs} <= {100.0, 99.5}
+
+
+def test_bench_rejects_unknown_fill_model(tmp_path: Path) -> None:
+    res = CliRunner().invoke(app, ["bench", "--fill-model", "bar", "--out-dir", str(tmp_path)])
+    assert res.exit_code == 2 and "--fill-model" in res.output
+    assert not any(tmp_path.iterdir())  # nothing was queued
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_stack.features.rolling import FeatureEngine, FeatureTail
+from trading_stack.llm.advisor import bar_features
+
+T0 = datetime(2025, 1, 2, 15, 0, tzinfo=UTC)
+
+
+def _reference(df: pd.DataFrame, window_sec: int) -> dict[str, float]:
+    """The advisor's former full-reload path: bars with ts > last ts - window."""
+    df = df.sort_values("ts", kind="stable")
+    df = df[df["ts"] > df["ts"].iloc[-1] - pd.Timedelta(seconds=window_sec)]
+    closes = df["close"].to_numpy(float)
+    rets = np.diff(closes) / closes[:-1]
+    ranges = (df["high"] - df["low"]).clip(lower=0.0).to_numpy() / closes * 1e4
+    pv, v = float((df["close"] * df["volume"]).sum()), float(df["volume"].sum())
+    return {
+        "realized_vol_bps": float(np.sqrt(np.mean(rets**2)) * 1e4) if len(rets) else 0.0,
+        "spread_proxy_bps": float(np.median(ranges)),
+        "trend_bps": float((closes[-1] / closes[0] - 1.0) * 1e4) if len(closes) > 1 else 0.0,
+        "range_bps": float((df["high"].max() - df["low"].min()) / closes[-1] * 1e4),
+        "vwap_dev_bps": (closes[-1] / (pv / v) - 1.0) * 1e4 if v > 0 else 0.0,
+        "bars": float(len(df)),
+    }
+
+
+def _bars(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    rows, px, t = [], 500.0, T0
+    for _ in range(n):
+        t += timedelta(seconds=rng.choice((1, 1, 1, 2, 5)))  # gaps in the tape
+        px *= 1.0 + rng.gauss(0.0, 2e-4)
+        half = abs(rng.gauss(0.0, 0.03))
+        vol = rng.choice((0, 10, 100, 250))
+        rows.append({"ts": t, "high": px + half, "low": px - half, "close": px, "volume": vol})
+    return pd.DataFrame(rows)
+
+
+def test_engine_matches_full_recompute_across_chunks_and_ring_growth() -> None:
+    bars = _bars(600)
+    eng = FeatureEngine(windows_sec=(30, 120), capacity=8)  # forces the ring to grow
+    for start in range(0, len(bars), 37):
+        eng.update(bars.iloc[start : start + 37])
+        seen = bars.iloc[: start + 37]
+        for w in (30, 120):
+            got, want = eng.features(w), _reference(seen, w)
+            assert got == pytest.approx(want, rel=1e-9, abs=1e-9)
+
+
+def test_engine_drops_late_bars_and_starts_at_zero() -> None:
+    eng = FeatureEngine((60,))
+    assert eng.features(60)["bars"] == 0.0
+    eng.on_bar(T0, 101.0, 99.0, 100.0, 10)
+    eng.on_bar(T0 - timedelta(seconds=1), 101.0, 99.0, 100.0, 10)
+    assert eng.dropped == 1
+    assert eng.features(60)["bars"] == 1.0
+
+
+def test_feature_tail_and_advisor_read_appended_rows(tmp_path: Path) -> None:
+    p = tmp_path / "bars1s_SPY.parquet"
+    bars = _bars(300)
+    bars.iloc[:200].to_parquet(p, index=False)
+    tail = FeatureTail(p, (120,))
+    assert tail.features(120) == pytest.approx(_reference(bars.iloc[:200], 120))
+    bars.to_parquet(p, index=False)
+    assert tail.features(120) == pytest.approx(_reference(bars, 120))
+    feats = bar_features(p, window_sec=120)
+    assert feats == pytest.approx(_reference(bars, 120))
+
+
+def test_advisor_drops_tails_of_other_days(tmp_path: Path) -> None:
+    from trading_stack.llm import advisor
+
+    paths = [tmp_path / d / f"bars1s_{s}.parquet" for d in ("d1", "d2") for s in ("SPY", "QQQ")]
+    for p in paths:
+        p.parent.mkdir(exist_ok=True)
+        _bars(130).to_parquet(p, index=False)
+    for p in paths[:2]:
+        bar_features(p)
+    assert set(paths[:2]) <= set(advisor._FEATURES)
+    bar_features(paths[2])  # first read of the next day
+    assert paths[0] not in advisor._FEATURES and paths[1] not in advisor._FEATURES
+    bar_features(paths[3])
+    assert set(advisor._FEATURES) == set(paths[2:])
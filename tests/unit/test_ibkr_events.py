@@ -0,0 +1,64 @@
+import asyncio
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from trading_stack.adapters.ibkr.adapter import IBKRAdapter
+from trading_stack.core.schemas import NewOrder
+
+
+def _trade(tag: str, status: str) -> Any:
+    return SimpleNamespace(
+        order=SimpleNamespace(orderRef=tag, orderId=11),
+        orderStatus=SimpleNamespace(status=status),
+        log=[],
+    )
+
+
+def _fill(shares: float, price: float) -> Any:
+    return SimpleNamespace(execution=SimpleNamespace(shares=shares, price=price))
+
+
+def test_callbacks_stream_ack_partial_fill() -> None:
+    ad = IBKRAdapter()
+    order = NewOrder(symbol="SPY", side="BUY", qty=3, limit=500.0, tag="a", ts=datetime.now(UTC))
+
+    def fake_place(_contract: Any, o: Any) -> Any:
+        assert o.orderRef == "a"
+        trade = _trade("a", "Submitted")
+        loop = asyncio.get_running_loop()
+        loop.call_soon(ad._on_status, trade)
+        loop.call_soon(ad._on_exec, trade, _fill(1, 500.0))
+        loop.call_soon(ad._on_exec, trade, _fill(2, 499.0))
+        loop.call_soon(ad._on_status, _trade("a", "Filled"))  # duplicate ACK is dropped
+        return trade
+
+    ad.ib.placeOrder = fake_place  # type: ignore[method-assign,assignment]
+
+    async def run() -> list[Any]:
+        res = await ad.place_async(order)
+        evs = [ev async for ev in ad.events("a")]
+        return [res.ack_ts, *evs]
+
+    ack_ts, *evs = asyncio.run(run())
+    assert [e.kind for e in evs] == ["PARTIAL", "FILL"]
+    assert [e.qty for e in evs] == [1, 2] and evs[1].px == 499.0
+    assert ack_ts <= evs[0].ts
+    assert "a" not in ad._tracks
+
+
+def test_inactive_before_ack_raises_reject() -> None:
+    ad = IBKRAdapter()
+    order = NewOrder(symbol="SPY", side="BUY", qty=1, limit=1.0, tag="r", ts=datetime.now(UTC))
+
+    def fake_place(*_args: Any) -> Any:
+        trade = _trade("r", "Inactive")
+        trade.log = [SimpleNamespace(message="price too far")]
+        asyncio.get_running_loop().call_soon(ad._on_status, trade)
+        return trade
+
+    ad.ib.placeOrder = fake_place  # type: ignore[method-assign,assignment]
+    with pytest.raises(RuntimeError, match="price too far"):
+        asyncio.run(ad.place_async(order))
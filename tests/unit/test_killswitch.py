@@ -0,0 +1,68 @@
+import time
+from pathlib import Path
+
+from trading_stack.risk.gate import RiskConfig, is_killswitched
+from trading_stack.risk.killswitch import KillSwitch, get_killswitch
+
+
+def test_file_halt_and_in_process_override(tmp_path: Path) -> None:
+    halt = tmp_path / "RUN" / "HALT"
+    ks = KillSwitch(halt, poll_sec=3600.0, start=False)
+    assert not ks.halted
+    halt.parent.mkdir(parents=True)
+    halt.touch()
+    assert not ks.halted  # cached until the next refresh
+    assert ks.refresh() and ks.halted
+    halt.unlink()
+    assert not ks.refresh()
+
+    ks.halt("manual")
+    assert ks.halted and ks.reason == "manual"
+    assert ks.refresh()  # override survives file refreshes
+    ks.clear()
+    assert not ks.halted
+
+    ks.halt("fleet", propagate=True)
+    assert halt.exists()
+    ks.clear()  # removes the file it created
+    assert not halt.exists() and not ks.halted
+
+
+def test_clear_keeps_halt_file_created_elsewhere(tmp_path: Path) -> None:
+    halt = tmp_path / "HALT"
+    halt.write_text("operator", encoding="utf-8")
+    ks = KillSwitch(halt, start=False)
+    ks.halt("manual")
+    ks.clear()
+    assert halt.exists() and ks.halted
+
+
+def test_gate_refreshes_on_demand_without_a_thread(tmp_path: Path) -> None:
+    halt = tmp_path / "HALT"
+    cfg = RiskConfig(max_notional=1.0, price_band_bps=1, killswitch_path=str(halt))
+    assert not is_killswitched(cfg)
+    assert not get_killswitch(str(halt)).watching
+    halt.touch()
+    time.sleep(0.06)  # past the default 50 ms cache
+    assert is_killswitched(cfg)
+
+
+def test_watcher_thread_picks_up_halt_file(tmp_path: Path) -> None:
+    halt = tmp_path / "HALT"
+    ks = get_killswitch(str(halt), watch=True)
+    assert ks.watching
+    halt.touch()
+    deadline = time.monotonic() + 2.0
+    while not ks.halted and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert ks.halted
+    ks.stop()
+
+
+def test_refresh_never_undoes_a_halt(tmp_path: Path) -> None:
+    ks = KillSwitch(tmp_path / "HALT", poll_sec=0.0)  # watcher refreshing flat out
+    for _ in range(500):
+        ks.halt("manual")
+        assert ks.halted
+        ks.clear()
+    ks.stop()
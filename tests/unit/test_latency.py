@@ -0,0 +1,64 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from trading_stack.core.latency import SpanRing, dump, histograms, span, split_trace, with_trace
+from trading_stack.ipc.sqlite_queue import connect, reserve
+from trading_stack.services.engined.live import SymbolRunner
+
+
+def test_ring_drains_per_stage_and_wraps() -> None:
+    r = SpanRing(capacity=8)
+    for i in range(5):
+        r.record("a", 1_000 * (i + 1))
+    r.record("b", 7_000)
+    got = r.drain()
+    assert sorted(got) == ["a", "b"]
+    assert got["a"].tolist() == [1_000, 2_000, 3_000, 4_000, 5_000]
+    assert r.drain() == {}  # nothing new since last drain
+    for _ in range(20):  # wraps: only the newest `capacity` samples survive
+        r.record("a", 10)
+    assert len(r.drain()["a"]) == 8
+    h = histograms({"a": got["a"]})
+    assert h.iloc[0]["count"] == 5 and h.iloc[0]["max_us"] == 5.0
+
+
+def test_span_dump_writes_histograms(tmp_path: Path) -> None:
+    with span("test.block"):
+        sum(range(100))
+    path = dump("unit", root=tmp_path)
+    assert path is not None
+    df = pd.read_parquet(path)
+    assert "test.block" in set(df["stage"])
+    assert {"p50_us", "p99_us", "count", "proc"} <= set(df.columns)
+
+
+def test_trace_roundtrip() -> None:
+    tag = with_trace("mr_long", 1_700_000_000_000_000_000)
+    assert split_trace(tag) == ("mr_long", 1_700_000_000_000_000_000)
+    assert split_trace("plain_tag") == ("plain_tag", None)
+    assert split_trace(None) == (None, None)
+
+
+def test_intent_trace_origin_is_feedd_ingest(tmp_path: Path) -> None:
+    ts0 = datetime(2025, 1, 2, 15, 0, tzinfo=UTC)
+    rows = []
+    for i in range(31):
+        px = 400.0 if i < 30 else 401.0  # the last bar triggers an intent
+        ts = ts0 + timedelta(seconds=i)
+        rows.append(
+            {"ts": ts, "symbol": "SPY", "open": px, "high": px, "low": px, "close": px}
+            | {"volume": 10, "ingest_ts": ts + timedelta(milliseconds=250)}
+        )
+    day = tmp_path / "live" / "2025-01-02"
+    day.mkdir(parents=True)
+    pd.DataFrame(rows).to_parquet(day / "bars1s_SPY.parquet", index=False)
+    con = connect(tmp_path / "queue.db")
+    runner = SymbolRunner("SPY", con, str(tmp_path / "live"), str(tmp_path / "exec"))
+    runner.poll()
+    row = reserve(con, "order_intents")
+    assert row is not None
+    ingest = rows[-1]["ingest_ts"]
+    assert isinstance(ingest, datetime)
+    assert split_trace(row["payload"]["tag"])[1] == int(ingest.timestamp() * 1e6) * 1000
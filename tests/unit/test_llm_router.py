@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from trading_stack.llm.advisor import make_proposal, make_proposal_async
+from trading_stack.llm.router import (
+    AsyncRouter,
+    LocalStubProvider,
+    ProviderResponse,
+    ResponseCache,
+    RulesProvider,
+)
+
+FEATS = {"realized_vol_bps": 6.0, "spread_proxy_bps": 1.2, "trend_bps": 0.4}
+
+
+class _Logged(LocalStubProvider):
+    """Stub that logs when each call starts and ends."""
+
+    def __init__(self, name: str, log: list[str], latency_sec: float = 0.0) -> None:
+        super().__init__(latency_sec=latency_sec)
+        self.name, self.log = name, log
+
+    async def apropose(self, features: dict[str, float]) -> ProviderResponse:
+        self.log.append(f"start {self.name}")
+        try:
+            return await super().apropose(features)
+        finally:
+            self.log.append(f"end {self.name}")
+
+
+def test_concurrent_providers_deadline_and_rules_fallback() -> None:
+    log: list[str] = []
+    a, b = _Logged("a", log, latency_sec=0.01), _Logged("b", log, latency_sec=0.01)
+    router = AsyncRouter([a, b], deadline_sec=1.0)
+    routed = asyncio.run(router.propose(FEATS))
+    assert log[:2] == ["start a", "start b"]  # both in flight before either finished
+    assert routed.provider == "a" and not routed.fallback
+    assert routed.cost_usd == a.cost_usd + b.cost_usd
+
+    slow = AsyncRouter([LocalStubProvider(latency_sec=1.0)], deadline_sec=0.02)
+    routed = asyncio.run(slow.propose(FEATS))
+    assert routed.fallback and routed.provider == "rules"
+    assert routed.response.params == RulesProvider().propose(FEATS).params
+    assert slow.timeouts == 1
+
+
+def test_failing_provider_falls_through_in_order() -> None:
+    bad, good = LocalStubProvider(fail=True), LocalStubProvider(cost_usd=0.002)
+    router = AsyncRouter([bad, good])
+    routed = asyncio.run(router.propose(FEATS))
+    assert routed.response.cost_usd == 0.002 and router.errors == 1
+
+
+def test_budget_reservations_hold_under_concurrency() -> None:
+    router = AsyncRouter([LocalStubProvider(latency_sec=0.01, cost_usd=0.4)], budget_usd=1.0)
+    regimes = {f"s{i}": {**FEATS, "realized_vol_bps": 10.0 * i} for i in range(3)}
+    out = asyncio.run(router.propose_many(regimes))
+    assert sorted(r.fallback for r in out.values()) == [False, False, True]
+    assert router.budget.spent_usd == 0.8
+
+
+def test_cache_hits_by_regime_with_ttl_and_lru() -> None:
+    now = [0.0]
+    stub = LocalStubProvider(latency_sec=0.0)
+    cache = ResponseCache(step=0.5, ttl_sec=60.0, max_entries=2, clock=lambda: now[0])
+    router = AsyncRouter([stub], cache=cache)
+    asyncio.run(router.propose(FEATS))
+    again = asyncio.run(router.propose({**FEATS, "realized_vol_bps": 6.1, "bars": 119.0}))
+    assert again.cached and again.cost_usd == 0.0 and stub.calls == 1
+    now[0] = 61.0
+    assert not asyncio.run(router.propose(FEATS)).cached  # expired
+    for v in (20.0, 30.0):  # two newer regimes push FEATS out of a 2-entry cache
+        cache.put(cache.key("stub", {**FEATS, "realized_vol_bps": v}), ProviderResponse({}, "", 0))
+    assert cache.get(cache.key("stub", FEATS)) is None
+
+
+def test_cache_is_checked_in_provider_order() -> None:
+    log: list[str] = []
+    a, b = _Logged("a", log, latency_sec=0.0), _Logged("b", log, latency_sec=0.0)
+    router = AsyncRouter([a, b])
+    router.cache.put(router.cache.key("b", FEATS), ProviderResponse({"x": 1.0}, "", 0.0))
+    routed = asyncio.run(router.propose(FEATS))  # a outranks b's cached answer
+    assert routed.provider == "a" and not routed.cached and log == ["start a", "end a"]
+
+    router.cache._d.clear()
+    router.cache.put(router.cache.key("b", FEATS), ProviderResponse({"x": 1.0}, "", 0.0))
+    a.fail = True
+    routed = asyncio.run(router.propose(FEATS))  # a failed: b's cached answer, no call to b
+    assert routed.provider == "b" and routed.cached and b.calls == 0
+
+    pricey = AsyncRouter([LocalStubProvider(cost_usd=5.0), b], budget_usd=1.0)
+    pricey.cache.put(pricey.cache.key("b", FEATS), ProviderResponse({"x": 2.0}, "", 0.0))
+    routed = asyncio.run(pricey.propose(FEATS))  # stub is over budget: skipped
+    assert routed.cached and routed.response.params == {"x": 2.0}
+
+
+def test_async_proposal_uses_router(tmp_path: Path) -> None:
+    p = tmp_path / "bars.parquet"
+    ts0 = datetime(2025, 1, 1, 12, 0, 0, tzinfo=UTC)
+    px = [500.0 + 0.01 * (i % 9) for i in range(200)]
+    pd.DataFrame(
+        {
+            "ts": [ts0 + timedelta(seconds=i) for i in range(200)],
+            "symbol": "SPY",
+            "open": px,
+            "high": [x + 0.02 for x in px],
+            "low": [x - 0.02 for x in px],
+            "close": px,
+            "volume": 100,
+        }
+    ).to_parquet(p, index=False)
+    router = AsyncRouter([LocalStubProvider(latency_sec=0.0, cost_usd=0.01)])
+    prop, routed = asyncio.run(make_proposal_async("SPY", p, router))
+    assert routed.provider == "stub" and routed.cost_usd == 0.01
+    assert prop.params == make_proposal("SPY", p, "rules").params
+
+
+def test_propose_many_coalesces_identical_regimes() -> None:
+    stub = LocalStubProvider(latency_sec=0.01)
+    router = AsyncRouter([stub])
+    out = asyncio.run(router.propose_many({"SPY": FEATS, "QQQ": dict(FEATS), "IWM": FEATS}))
+    assert stub.calls == 1 and [r.cached for r in out.values()] == [False, True, True]
+    assert {r.response.params["signal.threshold_bps"] for r in out.values()} == {
+        out["SPY"].response.params["signal.threshold_bps"]
+    }
+
+
+def test_rules_answers_are_never_reused_for_nearby_features() -> None:
+    near = [
+        {"realized_vol_bps": 5.0, "spread_proxy_bps": 1.0, "trend_bps": 4.9},
+        {"realized_vol_bps": 5.2, "spread_proxy_bps": 1.2, "trend_bps": 5.1},  # same bucket
+    ]
+    router = AsyncRouter([RulesProvider()])
+    for f in near:
+        routed = asyncio.run(router.propose(f))
+        assert not routed.cached and routed.response == RulesProvider().propose(f)
+    out = asyncio.run(router.propose_many({"SPY": near[0], "QQQ": near[1]}))
+    assert out["QQQ"].response == RulesProvider().propose(near[1])
+    assert out["SPY"].response == RulesProvider().propose(near[0])
+    # the fallback is not shared across symbols either
+    down = AsyncRouter([LocalStubProvider(fail=True)])
+    out = asyncio.run(down.propose_many({"SPY": near[0], "QQQ": near[1]}))
+    assert out["QQQ"].fallback and out["QQQ"].response == RulesProvider().propose(near[1])
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from trading_stack.accounting.lots import LotEngine
+from trading_stack.accounting.positions import compute_positions
+
+
+def _fill(tag: str, side: str, q: float, avg: float) -> dict:
+    return {"kind": "FILL", "tag": tag, "symbol": "SPY", "side": side, "fill_qty": q, "avg_px": avg}
+
+
+def test_methods_differ_only_in_relief_order() -> None:
+    eng = LotEngine()
+    eng.on_fill("a", "SPY", "BUY", 10, 100.0)
+    eng.on_fill("b", "SPY", "BUY", 10, 110.0)
+    eng.on_fill("c", "SPY", "SELL", 15, 120.0)
+    assert eng.realized("SPY", "fifo") == 10 * 20 + 5 * 10
+    assert eng.realized("SPY", "lifo") == 10 * 10 + 5 * 20
+    assert eng.realized("SPY", "avg") == 15 * 15
+    assert [(lot.lot_id, lot.qty) for lot in eng.open_lots("SPY", "fifo")] == [("b", 5)]
+    assert [(lot.lot_id, lot.qty) for lot in eng.open_lots("SPY", "lifo")] == [("a", 5)]
+    assert eng.position("SPY", "avg").avg_cost == 105.0
+
+
+def test_shorts_mirror_longs_and_flip_through_flat() -> None:
+    eng = LotEngine()
+    eng.on_fill("a", "SPY", "SELL", 10, 100.0)
+    eng.on_fill("b", "SPY", "SELL", 10, 90.0)
+    eng.on_fill("c", "SPY", "BUY", 25, 80.0)  # covers 20, opens 5 long
+    for m in ("fifo", "lifo", "avg"):
+        assert eng.realized("SPY", m) == 10 * 20 + 10 * 10
+        pos = eng.position("SPY", m)
+        assert pos.qty == 5 and pos.avg_cost == 80.0
+
+
+def test_specific_id_relieves_designated_lots_first() -> None:
+    eng = LotEngine()
+    for tag, px in (("a", 100.0), ("b", 110.0), ("c", 120.0)):
+        eng.on_fill(tag, "SPY", "BUY", 10, px)
+    eng.designate("s", ["b"])
+    eng.on_fill("s", "SPY", "SELL", 15, 130.0)  # all of b, then FIFO from a
+    assert eng.realized("SPY", "specific") == 10 * 20 + 5 * 30
+    assert [(lot.lot_id, lot.qty) for lot in eng.open_lots("SPY", "specific")] == [
+        ("a", 5),
+        ("c", 10),
+    ]
+    eng.on_fill("t", "SPY", "SELL", 15, 130.0)  # FIFO again: b's tombstone is skipped
+    assert eng.open_lots("SPY", "specific") == []
+    assert eng.realized("SPY", "specific") == 350.0 + 5 * 30 + 10 * 10
+
+
+def test_avg_matches_positions_engine(tmp_path: Path) -> None:
+    p = tmp_path / "ledger.parquet"
+    rows = [
+        _fill("a", "BUY", 3, 100.0),
+        _fill("a", "BUY", 2, 101.0),
+        _fill("b", "SELL", 7, 103.0),
+        _fill("c", "BUY", 4, 99.0),
+    ]
+    pd.DataFrame(rows).to_parquet(p, index=False)
+    eng = LotEngine(p)
+    assert eng.update() == 4
+    ref = compute_positions(p)["SPY"]
+    got = eng.position("SPY", "avg")
+    assert got.qty == ref.qty
+    assert got.avg_cost == pytest.approx(ref.avg_cost)
+    assert got.realized_pnl == pytest.approx(ref.realized_pnl)
+    assert [lot.qty for lot in eng.open_lots("SPY", "fifo")] == [2]  # a's two fills: one lot
@@ -1,7 +1,18 @@
 from datetime import UTC, datetime, timedelta
 
+import pandas as pd
+
 from trading_stack.core.schemas import MarketTrade
-from trading_stack.ingest.metrics import freshness_p99_ms, rth_gap_events
+from trading_stack.ingest.metrics import (
+    clock_offset_median_ms,
+    clock_offset_median_ms_df,
+    freshness_p99_ms,
+    freshness_p99_ms_df,
+    rth_gap_events,
+    rth_gap_events_df,
+    trade_second_coverage,
+    trade_second_coverage_df,
+)
 
 
 def _t(n: int) -> datetime:
@@ -24,3 +35,21 @@ def test_freshness_and_gaps() -> None:
     assert 80.0 <= f99 <= 200.0
     gaps = rth_gap_events(trades, max_gap_sec=2)
     assert gaps == 1
+
+
+def test_frame_metrics_match_model_metrics() -> None:
+    trades = [
+        MarketTrade(
+            ts=_t(n) + timedelta(milliseconds=250 * (n % 3)),
+            symbol="SPY",
+            price=1.0,
+            size=1,
+            ingest_ts=_t(n) + timedelta(milliseconds=40 * n - 100) if n % 4 else None,
+        )
+        for n in (0, 1, 2, 3, 5, 9, 10, 11, 40)
+    ]
+    df = pd.DataFrame([t.model_dump() for t in trades])
+    assert freshness_p99_ms_df(df) == freshness_p99_ms(trades)
+    assert clock_offset_median_ms_df(df) == clock_offset_median_ms(trades)
+    assert rth_gap_events_df(df) == rth_gap_events(trades)
+    assert trade_second_coverage_df(df) == trade_second_coverage(trades)
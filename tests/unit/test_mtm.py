@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from trading_stack.accounting.mtm import MarkToMarket, MtmReader, publish
+from trading_stack.accounting.positions import PositionSnapshot
+
+T0 = datetime(2025, 1, 2, 15, 0, tzinfo=UTC)
+
+
+def test_unrealized_and_equity() -> None:
+    m = MarkToMarket(10_000.0)
+    m.set_position(PositionSnapshot("SPY", 10.0, 100.0, 5.0))
+    m.set_position(PositionSnapshot("QQQ", -5.0, 200.0, 0.0))
+    m.mark("SPY", 101.0)
+    m.mark("QQQ", 198.0)
+    st = m.update(T0)
+    assert st.unrealized_pnl == 10.0 + 10.0
+    assert st.realized_pnl == 5.0
+    assert st.equity == 10_025.0
+    assert st.gross_exposure == 10 * 101.0 + 5 * 198.0
+    m.set_position(PositionSnapshot("SPY", 0.0, 0.0, 15.0))  # closed at 101
+    assert m.equity == 10_000.0 + 15.0 + 10.0
+
+
+def test_rolling_peak_expires() -> None:
+    m = MarkToMarket(1_000.0, window_sec=60.0)
+    m.set_position(PositionSnapshot("SPY", 1.0, 100.0, 0.0))
+    m.mark("SPY", 150.0)
+    assert m.update(T0).drawdown == 0.0
+    m.mark("SPY", 120.0)
+    st = m.update(T0 + timedelta(seconds=30))
+    assert st.peak_equity == 1_050.0
+    assert st.drawdown == -30.0
+    st = m.update(T0 + timedelta(seconds=90))  # the 1050 peak left the window
+    assert st.peak_equity == 1_020.0
+    assert st.drawdown == 0.0
+    assert st.high_water == 1_050.0
+
+
+def test_reader_ignores_stale(tmp_path: Path) -> None:
+    p = tmp_path / "mtm.json"
+    r = MtmReader(p, max_age_sec=5.0)
+    assert r.get(T0) is None
+    publish(MarkToMarket(1_000.0).update(T0), p)
+    got = r.get(T0 + timedelta(seconds=1))
+    assert got is not None and got["equity"] == 1_000.0
+    assert r.get(T0 + timedelta(seconds=10)) is None
@@ -0,0 +1,58 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+from trading_stack.adapters.ibkr.adapter import BrokerOrder
+from trading_stack.execution.store import OrderStateStore
+
+T0 = datetime(2025, 1, 2, 14, 30, tzinfo=UTC)
+
+
+def _new(store: OrderStateStore, tag: str, qty: float = 2) -> None:
+    store.record(tag, "NEW", T0, symbol="SPY", side="BUY", qty=qty)
+    store.record(tag, "ACK", T0)
+
+
+def test_recover_replays_log_and_drops_terminal(tmp_path: Path) -> None:
+    s = OrderStateStore(tmp_path, snapshot_every=3)
+    _new(s, "a")
+    _new(s, "b")
+    s.record("a", "PARTIAL", T0, px=100.0, qty=1)
+    s.record("b", "FILL", T0, px=101.0, qty=2)
+    # crash: no close(), plus a torn half-line at the end of the log
+    with s.log_path.open("a", encoding="utf-8") as f:
+        f.write('{"tag": "a", "kind": "FI')
+
+    r = OrderStateStore(tmp_path)
+    live = r.recover()
+    assert list(live) == ["a"]
+    assert live["a"].state == "PARTIAL" and live["a"].fill_qty == 1 and live["a"].remaining == 1
+    assert r.log_path.read_text(encoding="utf-8").endswith("\n")  # torn tail truncated
+    r.record("a", "FILL", T0, px=100.0, qty=1)
+    assert OrderStateStore(tmp_path).recover() == {}
+
+
+def test_compaction_rotates_log_generation(tmp_path: Path) -> None:
+    s = OrderStateStore(tmp_path, snapshot_every=2, compact_bytes=200)
+    for i in range(6):
+        _new(s, f"o{i}")
+    assert s.gen > 0 and not (tmp_path / "orders.0.log").exists()
+    s.close()
+    assert sorted(OrderStateStore(tmp_path).recover()) == [f"o{i}" for i in range(6)]
+
+
+def test_reconcile_uses_broker_record_and_reports_orphans(tmp_path: Path) -> None:
+    s = OrderStateStore(tmp_path)
+    for tag in ("keep", "filled", "cancelled", "unknown"):
+        _new(s, tag)
+    s.record("filled", "PARTIAL", T0, px=100.0, qty=1)
+    done = {
+        "filled": BrokerOrder("filled", "filled", [(T0, 1, 100.0), (T0, 1, 101.0)]),
+        "cancelled": BrokerOrder("cancelled", "cancelled", ts=T0),
+    }
+    events, unresolved, orphans = s.reconcile({"keep", "manual"}, done)
+    assert [(e.tag, e.kind, e.qty, e.px) for e in events] == [
+        ("cancelled", "CANCEL", 0.0, 0.0),
+        ("filled", "FILL", 1.0, 101.0),  # the first execution was already recorded
+    ]
+    assert unresolved == ["unknown"] and orphans == ["manual"]
+    assert sorted(s.states) == ["cancelled", "filled", "keep", "unknown"]  # nothing recorded
@@ -3,7 +3,7 @@ from pathlib import Path
 
 import pandas as pd
 
-from trading_stack.accounting.positions import compute_positions
+from trading_stack.accounting.positions import PositionsEngine, compute_positions
 
 
 def test_positions_from_incremental_avg(tmp_path: Path) -> None:
@@ -48,3 +48,44 @@ def test_positions_from_incremental_avg(tmp_path: Path) -> None:
     assert abs(s.qty - 1.0) < 1e-9
     assert abs(s.avg_cost - 101.0) < 1e-6
     assert s.realized_pnl > 0.0
+
+
+def _fill(tag: str, side: str, q: float, avg: float, sec: int) -> dict:
+    ts = datetime(2025, 1, 1, tzinfo=UTC) + timedelta(seconds=sec)
+    return {
+        "kind": "FILL",
+        "tag": tag,
+        "symbol": "SPY",
+        "side": side,
+        "fill_qty": q,
+        "avg_px": avg,
+        "event_ts": ts,
+    }
+
+
+def test_engine_resumes_from_checkpoint_and_handles_shorts(tmp_path: Path) -> None:
+    p, ck = tmp_path / "ledger.parquet", tmp_path / "ck.json"
+    rows = [_fill("a", "BUY", 2, 100.0, 0), _fill("b", "SELL", 3, 103.0, 1)]
+    pd.DataFrame(rows).to_parquet(p, index=False)
+    eng = PositionsEngine(p)
+    assert eng.update() == 2 and eng.update() == 0
+    eng.checkpoint(ck)
+    s = eng.positions["SPY"]
+    assert s.qty == -1 and s.avg_cost == 103.0 and s.realized_pnl == 6.0  # flipped short
+
+    rows.append(_fill("c", "BUY", 1, 101.0, 2))
+    pd.DataFrame(rows).to_parquet(p, index=False)
+    resumed = PositionsEngine.resume(p, ck)
+    assert resumed.update() == 1  # only the new fill is replayed
+    assert resumed.positions == compute_positions(p)
+    assert resumed.positions["SPY"].qty == 0 and resumed.positions["SPY"].realized_pnl == 8.0
+
+
+def test_engine_rebuilds_when_ledger_is_replaced(tmp_path: Path) -> None:
+    p = tmp_path / "ledger.parquet"
+    pd.DataFrame([_fill("a", "BUY", 1, 100.0, 0), _fill("b", "BUY", 1, 102.0, 1)]).to_parquet(p)
+    eng = PositionsEngine(p)
+    eng.update()
+    pd.DataFrame([_fill("z", "BUY", 5, 99.0, 0)]).to_parquet(p)
+    eng.update()
+    assert eng.positions["SPY"].qty == 5 and eng.positions["SPY"].avg_cost == 99.0
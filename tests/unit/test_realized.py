@@ -0,0 +1,70 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trading_stack.accounting.positions import compute_positions
+from trading_stack.accounting.realized import realized_pnl_all, realized_pnl_timeseries
+
+
+def _ledger(n_orders: int = 40) -> pd.DataFrame:
+    """Interleaved multi-symbol orders, each filled in 1-3 partials (cumulative avg_px)."""
+    rng = np.random.default_rng(11)
+    t0 = datetime(2025, 1, 2, 14, 30, tzinfo=UTC)
+    rows = []
+    for k in range(n_orders):
+        sym, side = ("SPY", "QQQ")[k % 2], ("BUY", "SELL")[int(rng.integers(0, 2))]
+        filled, notional = 0.0, 0.0
+        for j in range(int(rng.integers(1, 4))):
+            q, px = float(rng.integers(1, 5)), float(100 + rng.normal(0, 1))
+            filled, notional = filled + q, notional + q * px
+            rows.append(
+                {
+                    "kind": "FILL",
+                    "tag": f"o{k}",
+                    "symbol": sym,
+                    "side": side,
+                    "fill_qty": q,
+                    "avg_px": notional / filled,
+                    "event_ts": t0 + timedelta(seconds=2 * k + j),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def test_all_symbols_match_positions_engine_and_are_cached(tmp_path: Path) -> None:
+    p = tmp_path / "ledger.parquet"
+    _ledger().to_parquet(p, index=False)
+    ts = realized_pnl_all(p)
+    assert realized_pnl_all(p) is ts  # unchanged ledger -> cached frame
+    assert ts["event_ts"].is_monotonic_increasing
+    positions = compute_positions(p)
+    for sym in ("SPY", "QQQ"):
+        one = realized_pnl_timeseries(p, sym)
+        assert np.isclose(one["realized_pnl_cum"].iloc[-1], positions[sym].realized_pnl)
+        assert np.isclose(one["position_qty"].iloc[-1], positions[sym].qty)
+        assert np.isclose(one["realized_pnl_delta"].sum(), one["realized_pnl_cum"].iloc[-1])
+
+
+def test_missing_symbol_side_joined_from_intents(tmp_path: Path) -> None:
+    t0 = datetime(2025, 1, 2, tzinfo=UTC)
+    df = pd.DataFrame(
+        [
+            {"kind": "INTENT", "tag": "b", "symbol": "SPY", "side": "BUY", "ts": t0},
+            {"kind": "INTENT", "tag": "s", "symbol": "SPY", "side": "SELL", "ts": t0},
+            {"kind": "FILL", "tag": "b", "fill_qty": 2.0, "avg_px": 100.0, "event_ts": t0},
+            {
+                "kind": "FILL",
+                "tag": "s",
+                "fill_qty": 2.0,
+                "avg_px": 101.0,
+                "event_ts": t0 + timedelta(seconds=1),
+            },
+        ]
+    )
+    p = tmp_path / "ledger.parquet"
+    df.to_parquet(p, index=False)
+    out = realized_pnl_timeseries(p, "SPY")
+    assert out["realized_pnl_cum"].tolist() == [0.0, 2.0]
+    assert realized_pnl_timeseries(p, "QQQ").empty
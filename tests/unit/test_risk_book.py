@@ -0,0 +1,97 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from trading_stack.core.schemas import NewOrder
+from trading_stack.risk.book import RiskBook
+from trading_stack.risk.gate import RiskConfig, pretrade_check
+
+TS = datetime(2025, 1, 1, 15, 0, tzinfo=UTC)
+
+
+def _order() -> NewOrder:
+    return NewOrder(symbol="SPY", side="BUY", qty=1, limit=500.0, tag="x", ts=TS)
+
+
+def test_open_orders_limit_and_release(tmp_path: Path) -> None:
+    cfg = RiskConfig(max_notional=2000, price_band_bps=150, killswitch_path=str(tmp_path / "H"))
+    book = RiskBook()
+    for i in range(3):
+        book.apply({"kind": "INTENT", "tag": f"t{i}", "symbol": "SPY", "side": "BUY", "qty": 2})
+        book.apply({"kind": "ACK", "tag": f"t{i}"})
+    ok, reason = pretrade_check(_order(), 500.0, cfg, book)
+    assert not ok and "max open" in reason
+    book.apply({"kind": "FILL", "tag": "t0", "fill_qty": 1, "avg_px": 500.0})
+    assert book.open_order_count == 3  # partial fill keeps the order open
+    book.apply({"kind": "FILL", "tag": "t0", "fill_qty": 1, "avg_px": 501.0})  # 2nd px = 502
+    book.apply({"kind": "CANCEL", "tag": "t1"})
+    assert book.open_order_count == 1
+    assert pretrade_check(_order(), 500.0, cfg, book) == (True, "OK")
+    assert book.positions["SPY"].qty == 2 and abs(book.positions["SPY"].avg_cost - 501.0) < 1e-9
+
+
+def test_daily_loss_stop_uses_marked_pnl(tmp_path: Path) -> None:
+    cfg = RiskConfig(
+        max_notional=1e9,
+        price_band_bps=10_000,
+        killswitch_path=str(tmp_path / "H"),
+        equity_usd=10_000.0,
+        daily_loss_stop_pct=1.0,  # -100 USD
+    )
+    book = RiskBook()
+    book.apply({"kind": "INTENT", "tag": "s", "symbol": "SPY", "side": "SELL", "qty": 10})
+    book.apply({"kind": "ACK", "tag": "s"})
+    book.apply({"kind": "FILL", "tag": "s", "fill_qty": 10, "avg_px": 500.0})
+    assert book.open_order_count == 0
+    book.mark("SPY", 509.0)  # short 10 -> -90
+    assert pretrade_check(_order(), 509.0, cfg, book)[0]
+    book.mark("SPY", 511.0)  # -110
+    ok, reason = pretrade_check(_order(), 511.0, cfg, book)
+    assert not ok and "daily loss" in reason
+    # buying back realizes the loss; unrealized goes to zero
+    book.apply({"kind": "INTENT", "tag": "b", "symbol": "SPY", "side": "BUY", "qty": 10})
+    book.apply({"kind": "FILL", "tag": "b", "fill_qty": 10, "avg_px": 511.0})
+    assert abs(book.realized_pnl + 110.0) < 1e-9 and book.unrealized_pnl == 0.0
+
+
+def test_seed_from_ledger(tmp_path: Path) -> None:
+    p = tmp_path / "ledger.parquet"
+    rows = [
+        {"ts": TS, "kind": "INTENT", "tag": "a", "symbol": "SPY", "side": "BUY", "qty": 1.0},
+        {"ts": TS, "event_ts": TS + timedelta(seconds=1), "kind": "ACK", "tag": "a"},
+        {"ts": TS, "kind": "INTENT", "tag": "b", "symbol": "SPY", "side": "BUY", "qty": 1.0},
+        {"ts": TS, "kind": "REJ", "tag": "b", "reason": "x"},
+    ]
+    pd.DataFrame(rows).to_parquet(p, index=False)
+    book = RiskBook()
+    book.seed_from_ledger(p)
+    assert book.open_order_count == 1 and set(book.orders) == {"a"}
+
+
+def test_daily_pnl_restarts_on_a_new_utc_day(tmp_path: Path) -> None:
+    cfg = RiskConfig(
+        max_notional=1e9,
+        price_band_bps=10_000,
+        killswitch_path=str(tmp_path / "H"),
+        equity_usd=10_000.0,
+        daily_loss_stop_pct=1.0,  # -100 USD
+    )
+    book = RiskBook()
+    book.apply({"ts": TS, "kind": "INTENT", "tag": "s", "symbol": "SPY", "side": "SELL", "qty": 10})
+    book.apply({"ts": TS, "kind": "FILL", "tag": "s", "fill_qty": 10, "avg_px": 500.0})
+    book.apply({"ts": TS, "kind": "INTENT", "tag": "b", "symbol": "SPY", "side": "BUY", "qty": 5})
+    book.apply({"ts": TS, "kind": "FILL", "tag": "b", "fill_qty": 5, "avg_px": 520.0})  # -100
+    book.mark("SPY", 520.0)  # 5 still short: -100 unrealized
+    book.apply({"ts": TS, "kind": "INTENT", "tag": "o", "symbol": "SPY", "side": "BUY", "qty": 1})
+    book.apply({"ts": TS, "kind": "ACK", "tag": "o"})
+    assert book.daily_pnl == -200.0 and not pretrade_check(_order(), 520.0, cfg, book)[0]
+
+    next_day = _order().model_copy(update={"ts": TS + timedelta(days=1)})
+    assert pretrade_check(next_day, 520.0, cfg, book) == (True, "OK")
+    assert book.realized_pnl == 0.0 and book.unrealized_pnl == 0.0
+    assert book.positions["SPY"].qty == -5 and book.open_order_count == 1  # carried over
+    book.mark("SPY", 530.0)  # today's move only: -50
+    assert book.daily_pnl == -50.0
+    book.apply({"ts": TS, "kind": "CANCEL", "tag": "o"})  # a late row for yesterday
+    assert book.day == (TS + timedelta(days=1)).date() and book.daily_pnl == -50.0
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from trading_stack.params.runtime import RuntimeParams, RuntimeParamsCache
+
+
+def test_save_is_atomic_and_leaves_no_temp_files(tmp_path: Path) -> None:
+    p = tmp_path / "params" / "runtime_SPY.json"
+    rp = RuntimeParams.load(p, "SPY")
+    rp.signal_threshold_bps = 1.25
+    rp.save(p)
+    assert RuntimeParams.load(p, "SPY").signal_threshold_bps == 1.25
+    assert [x.name for x in p.parent.iterdir()] == ["runtime_SPY.json"]
+
+
+def test_cache_reloads_only_on_change(tmp_path: Path) -> None:
+    p = tmp_path / "runtime_SPY.json"
+    cache = RuntimeParamsCache(p, "SPY", default_bps=0.5, check_interval_sec=0.0)
+    snap = cache.get()
+    assert snap.version == 0 and snap.signal_threshold_bps == 0.5  # missing file -> defaults
+
+    rp = RuntimeParams(symbol="SPY", signal_threshold_bps=0.8)
+    rp.save(p)
+    snap = cache.get()
+    assert snap.version == 1 and snap.signal_threshold_bps == 0.8
+    assert cache.get() is snap  # unchanged file -> same snapshot, no re-parse
+
+    rp.signal_threshold_bps = 1.1
+    rp.save(p)
+    snap = cache.get()
+    assert snap.version == 2 and snap.signal_threshold_bps == 1.1
+
+    p.write_text("{not json", encoding="utf-8")
+    assert cache.get() is snap  # torn/corrupt file keeps the last good snapshot
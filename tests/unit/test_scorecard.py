@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from trading_stack.scorecard.checks import exec_checks, risk_checks, run_checks
+from trading_stack.scorecard.context import ScorecardContext
+
+NOW = datetime(2025, 1, 2, 16, 0, tzinfo=UTC)
+
+
+def _ledger() -> pd.DataFrame:
+    rows = []
+    for i in range(4):
+        t = NOW - timedelta(minutes=5 - i)
+        tag = f"sanity_{i}"
+        rows += [
+            {"ts": t, "kind": "INTENT", "tag": tag},
+            {
+                "ts": t,
+                "event_ts": t + timedelta(milliseconds=100 * (i + 1)),
+                "kind": "ACK",
+                "tag": tag,
+            },
+            {"ts": t, "event_ts": t + timedelta(seconds=1), "kind": "CANCEL", "tag": tag},
+        ]
+    rows.append({"ts": NOW, "kind": "REJ", "tag": "x", "reason": "max open orders 3 >= 3"})
+    return pd.DataFrame(rows)
+
+
+def test_exec_and_risk_rows_from_context() -> None:
+    ctx = ScorecardContext(NOW, "SPY", exec_day=None, ledger=_ledger())
+    assert exec_checks(ctx)[0] == ("ledger_integrity", "no exec dir", False)
+    ctx.exec_day = Path("data/exec/2025-01-02")
+    rows = {name: (value, ok) for name, value, ok in exec_checks(ctx)}
+    assert rows["ack_latency_p95_ms"] == ("385.0", True)
+    assert rows["cancel_success (sanity 30m, acked)"] == ("100%", True)
+    assert rows["shortfall_median_bps"] == ("NA", False)
+    assert risk_checks(ctx)[0] == ("blocked_orders_last_15m", "1", False)
+
+
+def test_groups_keep_their_order_when_run_concurrently() -> None:
+    def slow(_: ScorecardContext) -> list[tuple[str, str, bool]]:
+        time.sleep(0.05)
+        return [("a", "1", True)]
+
+    def fast(_: ScorecardContext) -> list[tuple[str, str, bool]]:
+        return [("b", "2", True), ("c", "3", False)]
+
+    ctx = ScorecardContext(NOW, "SPY")
+    rows = run_checks(ctx, (("slow", slow), ("fast", fast)))
+    assert [r[0] for r in rows] == ["a", "b", "c"]
+
+
+def test_evaluate_reuses_cached_groups_until_an_input_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from trading_stack.scorecard import results
+
+    day = tmp_path / "exec" / "2025-01-02"
+    day.mkdir(parents=True)
+    _ledger().to_parquet(day / "ledger.parquet", index=False)
+    loads: list[list[str]] = []
+    load = results.load_context
+
+    def counting(*args: Any, **kw: Any) -> Any:
+        loads.append(list(kw["parts"]))
+        return load(*args, **kw)
+
+    monkeypatch.setattr(results, "load_context", counting)
+    kw: dict[str, Any] = {
+        "live_dir": tmp_path / "live",
+        "llm_dir": tmp_path / "llm",
+        "exec_dir": tmp_path / "exec",
+        "tca_dir": tmp_path / "tca",
+        "queue_path": tmp_path / "queue.db",
+        "run_dir": tmp_path / "run",
+        "params_dir": tmp_path / "params",
+        "cache_path": tmp_path / "cache.json",
+        "now": NOW,
+    }
+    first = results.evaluate("SPY", **kw)
+    gates = {r.gate: r for r in first}
+    assert gates["blocked_orders_last_15m"].threshold == "== 0"
+    assert gates["cancel_success (sanity 30m, acked)"].threshold == "== 100%"
+    assert results.evaluate("SPY", **kw) == first
+    assert loads[1:] == [["heartbeats"]]  # ops is never cached
+
+    _ledger().iloc[:3].to_parquet(day / "ledger.parquet", index=False)
+    results.evaluate("SPY", **kw)
+    assert loads[-1] == ["bars", "ledger", "queue", "heartbeats"]  # exec, engine, risk
+    results.evaluate("SPY", **{**kw, "now": NOW + timedelta(seconds=60)})
+    assert len(loads[-1]) == 6  # everything is older than max_age_sec
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from trading_stack.scorecard.checks import run_checks
+from trading_stack.scorecard.context import load_context
+from trading_stack.scorecard.watch import GateHistory, ScorecardWatcher, green_streak
+
+NOW = datetime(2025, 1, 2, 16, 0, tzinfo=UTC)
+DAY = "2025-01-02"
+
+
+def _ledger(start: int, n: int) -> pd.DataFrame:
+    rows = []
+    for i in range(start, start + n):
+        t = NOW - timedelta(minutes=20 - i)
+        tag = f"sanity_{i}"
+        rows += [
+            {"ts": t, "event_ts": t, "kind": "INTENT", "tag": tag, "symbol": "SPY", "side": "BUY"},
+            {
+                "ts": t,
+                "event_ts": t + timedelta(milliseconds=50 * (i + 1)),
+                "kind": "ACK",
+                "tag": tag,
+            },
+            {
+                "ts": t,
+                "event_ts": t + timedelta(seconds=1),
+                "kind": "FILL",
+                "tag": tag,
+                "fill_qty": 1.0,
+                "avg_px": 100.0 + i,
+                "shortfall_bps": float(i),
+            },
+        ]
+    return pd.DataFrame(rows)
+
+
+def _proposals(start: int, n: int) -> pd.DataFrame:
+    ts = [NOW - timedelta(minutes=30 - 2 * i) for i in range(start, start + n)]
+    return pd.DataFrame({"ts": ts[::-1], "cost_usd": 0.01, "new_threshold_bps": 0.5})
+
+
+def _write(tmp: Path, ledger: pd.DataFrame, props: pd.DataFrame) -> dict[str, Path]:
+    dirs = {k: tmp / k for k in ("live", "exec", "llm", "tca", "run", "params")}
+    (dirs["exec"] / DAY).mkdir(parents=True, exist_ok=True)
+    (dirs["llm"] / DAY).mkdir(parents=True, exist_ok=True)
+    ledger.to_parquet(dirs["exec"] / DAY / "ledger.parquet", index=False)
+    props.to_parquet(dirs["llm"] / DAY / "proposals_SPY.parquet", index=False)
+    return dirs
+
+
+def _both(dirs: dict[str, Path], w: ScorecardWatcher) -> tuple[list, list]:
+    kw = {
+        "live_dir": dirs["live"],
+        "llm_dir": dirs["llm"],
+        "exec_dir": dirs["exec"],
+        "tca_dir": dirs["tca"],
+        "queue_path": dirs["run"] / "queue.db",
+        "run_dir": dirs["run"],
+        "params_dir": dirs["params"],
+    }
+    ctx = load_context("SPY", now=NOW, **kw)  # type: ignore[arg-type]
+    return w.tick(NOW), run_checks(ctx)
+
+
+def test_watcher_matches_one_shot_checks_across_appends(tmp_path: Path) -> None:
+    dirs = _write(tmp_path, _ledger(0, 3), _proposals(0, 4))
+    w = ScorecardWatcher(
+        "SPY",
+        live_dir=dirs["live"],
+        llm_dir=dirs["llm"],
+        exec_dir=dirs["exec"],
+        tca_dir=dirs["tca"],
+        queue_path=dirs["run"] / "queue.db",
+        run_dir=dirs["run"],
+        params_dir=dirs["params"],
+    )
+    got, want = _both(dirs, w)
+    assert got == want
+    _write(
+        tmp_path,
+        pd.concat([_ledger(0, 3), _ledger(3, 4)], ignore_index=True),
+        pd.concat([_proposals(0, 4), _proposals(4, 6)], ignore_index=True),
+    )
+    got, want = _both(dirs, w)
+    assert got == want
+    assert dict((n, v) for n, v, _ in got)["llm_proposals_seen_15m"] == "2"
+
+
+def _history(root: Path, day: str, ok: bool, samples: int = 3) -> None:
+    h = GateHistory(root)
+    t0 = pd.Timestamp(f"{day} 15:00", tz="UTC").to_pydatetime()  # 10:00 ET
+    for i in range(samples):
+        h.record(t0 + timedelta(minutes=i), [("a", "1", True), ("b", "1", ok)])
+    h.flush()
+
+
+def test_green_streak_stops_at_red_or_missing_session(tmp_path: Path) -> None:
+    for day in ("2025-01-06", "2025-01-07", "2025-01-08"):  # Mon..Wed
+        _history(tmp_path, day, ok=True)
+    assert green_streak(tmp_path, ["a", "b"], min_samples=3) == [
+        "2025-01-08",
+        "2025-01-07",
+        "2025-01-06",
+    ]
+    _history(tmp_path, "2025-01-03", ok=True)  # Fri before: the weekend is no gap
+    assert len(green_streak(tmp_path, ["a", "b"], min_samples=3)) == 4
+    _history(tmp_path, "2025-01-10", ok=True)  # Thursday missing breaks the streak
+    assert green_streak(tmp_path, ["a", "b"], min_samples=3) == ["2025-01-10"]
+    _history(tmp_path, "2025-01-09", ok=False)
+    assert green_streak(tmp_path, ["a", "b"], min_samples=3) == ["2025-01-10"]
+    assert green_streak(tmp_path, ["a"], min_samples=3)[-1] == "2025-01-03"
+    assert green_streak(tmp_path, ["a"], min_samples=4) == []
+
+
+def test_green_streak_skips_the_session_in_progress(tmp_path: Path) -> None:
+    for day in ("2025-01-06", "2025-01-07"):
+        _history(tmp_path, day, ok=True)
+    _history(tmp_path, "2025-01-08", ok=False)  # Wednesday so far: one red tick
+    midday = datetime(2025, 1, 8, 17, 0, tzinfo=UTC)  # 12:00 ET
+    assert green_streak(tmp_path, ["a", "b"], min_samples=3, now=midday) == [
+        "2025-01-07",
+        "2025-01-06",
+    ]
+    after_close = datetime(2025, 1, 8, 21, 5, tzinfo=UTC)  # 16:05 ET: Wednesday counts
+    assert green_streak(tmp_path, ["a", "b"], min_samples=3, now=after_close) == []
+
+
+def test_green_streak_bridges_listed_holidays(tmp_path: Path) -> None:
+    for day in ("2025-01-17", "2025-01-21"):  # Fri, then Tue after MLK day
+        _history(tmp_path, day, ok=True)
+    assert green_streak(tmp_path, ["a", "b"], min_samples=3) == ["2025-01-21"]
+    mlk = [date(2025, 1, 20)]
+    assert len(green_streak(tmp_path, ["a", "b"], min_samples=3, holidays=mlk)) == 2
+
+
+def test_gate_history_keeps_rows_of_a_failed_flush(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from trading_stack.scorecard import watch
+
+    h = GateHistory(tmp_path)
+    t0 = datetime(2025, 1, 6, 15, 0, tzinfo=UTC)
+    h.record(t0, [("a", "1", True)])
+    h.flush()
+    write = watch.atomic_write_parquet
+
+    def broken(*_args: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(watch, "atomic_write_parquet", broken)
+    h.record(t0 + timedelta(minutes=1), [("a", "1", True)])
+    with pytest.raises(OSError):
+        h.flush()
+    monkeypatch.setattr(watch, "atomic_write_parquet", write)
+    monkeypatch.setattr(watch.pd, "read_parquet", broken)  # the day is served from memory
+    h.record(t0 + timedelta(minutes=2), [("a", "1", True)])
+    h.flush()
+    monkeypatch.undo()
+    back = pd.read_parquet(tmp_path / "2025-01-06" / "gates.parquet")
+    assert len(back) == 3 and back["ts"].is_monotonic_increasing
+    assert [p.name for p in (tmp_path / "2025-01-06").iterdir()] == ["gates.parquet"]
@@ -0,0 +1,102 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from trading_stack.ipc.sqlite_queue import connect, depth
+from trading_stack.services.engined.live import SymbolRunner
+from trading_stack.services.engined.shards import shard_symbols
+
+
+def test_shard_symbols_balanced_and_stable() -> None:
+    shards = shard_symbols(["qqq", "SPY", "IWM", "SPY", "DIA", "TLT"], 2)
+    assert shards == [["DIA", "QQQ", "TLT"], ["IWM", "SPY"]]
+    assert shard_symbols(["SPY"], 8) == [["SPY"]]
+
+
+def test_symbol_runner_enqueues_non_spy_symbol(tmp_path: Path) -> None:
+    day = tmp_path / "live" / "2025-01-01"
+    day.mkdir(parents=True)
+    ts0 = datetime(2025, 1, 1, 15, 0, tzinfo=UTC)
+    rows = []
+    for i in range(31):
+        px = 400.0 if i < 30 else 401.0  # last bar spikes well above the rolling mean
+        rows.append(
+            {
+                "ts": ts0 + timedelta(seconds=i),
+                "symbol": "QQQ",
+                "open": px,
+                "high": px,
+                "low": px,
+                "close": px,
+                "volume": 10,
+            }
+        )
+    pd.DataFrame(rows).to_parquet(day / "bars1s_QQQ.parquet", index=False)
+    con = connect(tmp_path / "queue.db")
+    runner = SymbolRunner(
+        "QQQ",
+        con,
+        bars_dir=str(tmp_path / "live"),
+        shadow_ledger_root=str(tmp_path / "exec"),
+        params_root=str(tmp_path / "params"),
+        symbol_whitelist={"QQQ", "SPY"},
+    )
+    assert runner.poll() == 31
+    assert runner.poll() == 0  # nothing new
+    assert depth(con, "order_intents") == 1
+    lag = runner.lag_sec(ts0 + timedelta(seconds=40))
+    assert lag is not None and abs(lag - 10.0) < 1e-9
+    # Appended rows are tailed, not re-read
+    more = dict(rows[-1], ts=ts0 + timedelta(seconds=31))
+    pd.concat([pd.DataFrame(rows), pd.DataFrame([more])]).to_parquet(
+        day / "bars1s_QQQ.parquet", index=False
+    )
+    assert runner.poll() == 1
+
+    # A restarted shard resumes after its last intent instead of replaying the day
+    ledgers = list((tmp_path / "exec").glob("*/ledger.parquet"))
+    shadows = len(pd.concat(pd.read_parquet(p) for p in ledgers))
+    restarted = SymbolRunner(
+        "QQQ",
+        connect(tmp_path / "queue.db"),
+        bars_dir=str(tmp_path / "live"),
+        shadow_ledger_root=str(tmp_path / "exec"),
+        params_root=str(tmp_path / "params"),
+        symbol_whitelist={"QQQ", "SPY"},
+    )
+    assert restarted.poll() == 0
+    assert len(pd.concat(pd.read_parquet(p) for p in ledgers)) == shadows
+    assert restarted.last_ts == runner.last_ts
+
+
+def test_same_signal_on_two_symbols_enqueues_both(tmp_path: Path) -> None:
+    day = tmp_path / "live" / "2025-01-01"
+    day.mkdir(parents=True)
+    ts0 = datetime(2025, 1, 1, 15, 0, tzinfo=UTC)
+    con = connect(tmp_path / "queue.db")
+    for sym in ("QQQ", "SPY"):
+        px = [400.0] * 30 + [401.0]
+        pd.DataFrame(
+            {
+                "ts": [ts0 + timedelta(seconds=i) for i in range(31)],
+                "symbol": sym,
+                "open": px,
+                "high": px,
+                "low": px,
+                "close": px,
+                "volume": 10,
+            }
+        ).to_parquet(day / f"bars1s_{sym}.parquet", index=False)
+        runner = SymbolRunner(
+            sym,
+            con,
+            bars_dir=str(tmp_path / "live"),
+            shadow_ledger_root=str(tmp_path / "exec"),
+            params_root=str(tmp_path / "params"),
+            symbol_whitelist={"QQQ", "SPY"},
+        )
+        runner.poll()
+    # both are "mr_short" on the same bar: the tags must still differ
+    tags = [r[0] for r in con.execute("SELECT tag FROM queue ORDER BY tag")]
+    assert tags == ["20250101T150030_QQQ_mr_short", "20250101T150030_SPY_mr_short"]
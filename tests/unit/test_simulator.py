@@ -0,0 +1,84 @@
+from datetime import UTC, datetime, timedelta
+
+import pandas as pd
+
+from trading_stack.core.schemas import NewOrder
+from trading_stack.execution.simulator import SimConfig, SimExchange
+
+T0 = datetime(2025, 1, 2, 14, 30, tzinfo=UTC)
+
+
+def _order(tag: str, qty: float, limit: float | None, side: str = "BUY") -> NewOrder:
+    return NewOrder(symbol="SPY", side=side, qty=qty, limit=limit, tag=tag, ts=T0)  # type: ignore[arg-type]
+
+
+def _t(sec: int) -> datetime:
+    return T0 + timedelta(seconds=sec)
+
+
+def test_touch_fills_only_after_queue_ahead_is_consumed() -> None:
+    sim = SimExchange(SimConfig(participation=0.5, queue_ahead=30, touch_volume_frac=0.5))
+    sim.submit(_order("a", 40, 100.0))
+    # each touching bar prints 50 at 100.0: first eats the 30 ahead, leaving 20 for us
+    r1 = sim.match("SPY", _t(1), 100.4, 100.5, 100.0, 100)
+    r2 = sim.match("SPY", _t(2), 100.2, 100.3, 100.0, 100)
+    assert [r["fill_qty"] for r in r1 + r2] == [20, 20]
+    assert r2[0]["avg_px"] == 100.0 and sim.open_tags() == set()
+
+
+def test_trade_through_caps_by_participation_and_prices_gaps_at_open() -> None:
+    sim = SimExchange(SimConfig(participation=0.1, fill_on_touch=False))
+    sim.submit(_order("s", 15, 100.0, side="SELL"))
+    assert sim.match("SPY", _t(1), 99.8, 100.0, 99.5, 100) == []  # touch only
+    r = sim.match("SPY", _t(2), 100.6, 100.9, 100.4, 100)  # gapped above the limit
+    assert r[0]["fill_qty"] == 10 and r[0]["avg_px"] == 100.6
+    r = sim.match("SPY", _t(3), 100.0, 100.2, 99.9, 100)
+    assert r[0]["fill_qty"] == 5 and r[0]["avg_px"] == (10 * 100.6 + 5 * 100.0) / 15
+
+
+def test_run_replays_bars_without_lookahead() -> None:
+    bars = pd.DataFrame(
+        {
+            "ts": [_t(i) for i in range(4)],
+            "symbol": "SPY",
+            "open": [99.0, 99.0, 101.0, 101.0],
+            "high": [99.5, 99.5, 101.5, 101.5],
+            "low": [98.5, 98.5, 100.5, 100.5],
+            "volume": [1000, 1000, 1000, 1000],
+        }
+    )
+    orders = [
+        NewOrder(symbol="SPY", side="BUY", qty=5, limit=100.0, tag="b", ts=_t(1)),
+        NewOrder(symbol="SPY", side="BUY", qty=5, limit=None, tag="m", ts=_t(2)),
+    ]
+    sim = SimExchange(SimConfig(participation=1.0))
+    df = sim.run(bars, orders)
+    fills = df[df["kind"] == "FILL"].set_index("tag")
+    # only bar 1 trades through 100.0 and it is not after b's ts, so b keeps resting
+    assert "b" not in fills.index and sim.open_tags() == {"b"}
+    assert fills.loc["m", "avg_px"] == 101.0 and fills.loc["m", "event_ts"] == _t(3)
+    assert df.groupby("kind").size().to_dict() == {"ACK": 2, "FILL": 1, "INTENT": 2}
+    assert sim.cancel("b", _t(4))[0]["kind"] == "CANCEL"
+
+
+def test_orders_share_a_bars_cap_and_printed_volume() -> None:
+    sim = SimExchange(SimConfig(participation=0.3, queue_ahead=10, touch_volume_frac=0.5))
+    sim.submit(_order("a", 20, 100.0))
+    sim.submit(_order("b", 20, 100.0))
+    # 50 prints at 100.0, consumed once: a's 10 ahead, a's 20, b's 10 ahead, b's 10;
+    # together they hit the 30-share participation cap
+    r = sim.match("SPY", _t(1), 100.2, 100.3, 100.0, 100)
+    assert [(x["tag"], x["fill_qty"]) for x in r] == [("a", 20), ("b", 10)]
+    assert sim.orders["b"].queue_ahead == 0
+    r = sim.match("SPY", _t(2), 100.2, 100.3, 99.9, 10)  # trades through: cap of 3
+    assert [(x["tag"], x["fill_qty"]) for x in r] == [("b", 3)]
+
+
+def test_fractional_orders_fill_fractionally() -> None:
+    sim = SimExchange(SimConfig(participation=0.1, fill_on_touch=False))
+    sim.submit(_order("f", 0.5, 100.0))
+    sim.submit(_order("w", 3, 100.0))
+    r = sim.match("SPY", _t(1), 100.0, 100.1, 99.9, 5)  # cap 0.5
+    assert [(x["tag"], x["fill_qty"]) for x in r] == [("f", 0.5)]
+    r = sim.match("SPY", _t(2), 100.0, 100.1, 99.9, 25)  # cap 2.5, whole shares only
+    assert [(x["tag"], x["fill_qty"]) for x in r] == [("w", 2)]
@@ -0,0 +1,40 @@
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+from trading_stack.backtest.sweep import run_sweep, simulate
+from trading_stack.core.schemas import Bar1s
+from trading_stack.strategy.baseline import MeanReversion1S
+
+
+def _bars(n: int = 300) -> np.ndarray:
+    rows = []
+    for i in range(n):
+        c = 500.0 + 0.05 * np.sin(i / 7.0) + 0.02 * ((i * 37) % 11 - 5)
+        rows.append([float(i), c - 0.01, c + 0.03, c - 0.03, c])
+    return np.array(rows, dtype=np.float64)
+
+
+def test_simulate_matches_strategy_signals() -> None:
+    bars = _bars()
+    strat = MeanReversion1S(threshold=0.5, window=30, symbol="SPY")
+    ts0 = datetime(2025, 1, 1, tzinfo=UTC)
+    n_intents = 0
+    for i, (_, o, h, lo, c) in enumerate(bars):
+        bar = Bar1s(
+            ts=ts0 + timedelta(seconds=i), symbol="SPY", open=o, high=h, low=lo, close=c, volume=1
+        )
+        n_intents += len(strat.on_bar(bar))
+    res = simulate(bars, threshold_bps=0.5, window=30)
+    assert res["signals"] == n_intents
+    assert 0 < res["fills"] <= res["signals"]
+    assert res["turnover"] > 0
+
+
+def test_run_sweep_grid() -> None:
+    df = run_sweep(_bars(), thresholds=[0.3, 1.0], windows=[15, 30], workers=2)
+    assert len(df) == 4
+    assert {"threshold_bps", "window", "pnl", "turnover", "shortfall_bps"} <= set(df.columns)
+    direct = simulate(_bars(), 1.0, 30)
+    row = df[(df["threshold_bps"] == 1.0) & (df["window"] == 30)].iloc[0]
+    assert row["pnl"] == direct["pnl"]
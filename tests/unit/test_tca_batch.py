@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from trading_stack.tca.batch import batch_tca, fills_frame, read_tca, tca_day
+from trading_stack.tca.metrics import TCA
+
+T0 = datetime(2025, 1, 2, 15, 0, tzinfo=UTC)
+
+
+def _bars() -> pd.DataFrame:
+    rows = []
+    for i in range(120):
+        c = 100.0 + 0.01 * i
+        rows.append(
+            {
+                "ts": T0 + timedelta(seconds=i),
+                "symbol": "SPY",
+                "open": c,
+                "high": c + 0.02,
+                "low": c - 0.02,
+                "close": c,
+                "volume": 100 + i,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def _ledger() -> pd.DataFrame:
+    t = T0 + timedelta(seconds=10)
+    return pd.DataFrame(
+        [
+            {"ts": t, "kind": "INTENT", "tag": "a", "symbol": "SPY", "side": "BUY", "qty": 2},
+            {"ts": t, "event_ts": t + timedelta(seconds=3), "kind": "FILL", "tag": "a",
+             "fill_qty": 1.0, "avg_px": 100.2},
+            {"ts": t, "event_ts": t + timedelta(seconds=5), "kind": "FILL", "tag": "a",
+             "fill_qty": 1.0, "avg_px": 100.25},
+        ]
+    )  # fmt: skip
+
+
+def test_batch_matches_single_fill_tca_and_scans() -> None:
+    bars = _bars()
+    fills = fills_frame(_ledger())
+    assert fills["symbol"].tolist() == ["SPY", "SPY"]
+    assert fills["px"].tolist() == pytest.approx([100.2, 100.3])
+    out = batch_tca(fills, bars)
+
+    arrival = 100.10  # close of the bar at the intent (t0 + 10s)
+    assert out["arrival_px"].tolist() == pytest.approx([arrival, arrival])
+    ref = TCA(arrival=arrival, fills_wavg=100.3, side="BUY").shortfall_bps
+    assert out["arrival_shortfall_bps"].iloc[1] == pytest.approx(ref)
+
+    win = bars.iloc[11:16]  # bars in (intent, second fill]
+    vwap = float((win["close"] * win["volume"]).sum() / win["volume"].sum())
+    assert out["ivwap"].iloc[1] == pytest.approx(vwap)
+    mark = 100.0 + 0.01 * (15 + 30)  # close 30s after the second fill
+    assert out["markout_30s_bps"].iloc[1] == pytest.approx((mark / 100.3 - 1) * 1e4)
+
+
+def test_markouts_past_the_last_mark_are_nan() -> None:
+    bars = _bars().iloc[:45]  # last close at t0 + 44s; fills at t0 + 13s and 15s
+    out = batch_tca(fills_frame(_ledger()), bars)
+    assert out["markout_5s_bps"].notna().all()
+    assert out["markout_30s_bps"].tolist()[0] == pytest.approx((100.43 / 100.2 - 1) * 1e4)
+    assert out["markout_30s_bps"].isna().tolist() == [False, True]  # t0+45s: not yet marked
+    assert out["markout_60s_bps"].isna().all()
+
+
+def test_tca_day_writes_parquet_read_back(tmp_path: Path) -> None:
+    day = T0.date().isoformat()
+    (tmp_path / "exec" / day).mkdir(parents=True)
+    (tmp_path / "live" / day).mkdir(parents=True)
+    _ledger().to_parquet(tmp_path / "exec" / day / "ledger.parquet", index=False)
+    _bars().to_parquet(tmp_path / "live" / day / "bars1s_SPY.parquet", index=False)
+    out = tca_day(day, tmp_path / "exec", tmp_path / "live", tmp_path / "tca")
+    assert out is not None
+    back = read_tca(tmp_path / "tca", day)
+    assert len(back) == 2 and "markout_60s_bps" in back.columns
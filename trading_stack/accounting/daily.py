@@ -0,0 +1,252 @@
+"""Daily close snapshots carried into the next day, and cached per-day rollups."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import typer
+
+from trading_stack.accounting.positions import PositionsEngine, PositionSnapshot
+from trading_stack.storage.atomic import atomic_write_text
+
+app = typer.Typer(help="Daily position carry-over and accounting rollups")
+
+ROLLUP_COLS = [
+    "day",
+    "symbol",
+    "open_qty",
+    "close_qty",
+    "avg_cost",
+    "realized_pnl",
+    "fills",
+    "shares",
+    "turnover",
+    "fees",
+]
+_LEDGER_COLS = ["kind", "tag", "symbol", "fill_qty", "avg_px", "fee"]
+
+
+def ledger_days(ledger_root: str | Path) -> list[str]:
+    return sorted(p.parent.name for p in Path(ledger_root).glob("*/ledger.parquet"))
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_close(out_root: str | Path, day: str) -> dict[str, Any] | None:
+    """The close record for `day`: positions plus the hashes its rollup was built from."""
+    p = Path(out_root) / day / "close.json"
+    try:
+        data: dict[str, Any] = json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data
+
+
+def closing_positions(close: dict[str, Any] | None) -> dict[str, PositionSnapshot]:
+    if close is None:
+        return {}
+    return {p["symbol"]: PositionSnapshot(**p) for p in close["positions"]}
+
+
+def opening_positions(
+    ledger_root: str | Path, out_root: str | Path, day: str
+) -> dict[str, PositionSnapshot]:
+    """Opening state for `day`: the close of the latest earlier ledger day (rolled first,
+    so a stale or missing close is rebuilt)."""
+    prior = [d for d in ledger_days(ledger_root) if d < day]
+    if not prior:
+        return {}
+    roll_days(ledger_root, out_root, until=prior[-1])
+    return closing_positions(load_close(out_root, prior[-1]))
+
+
+def roll_days(
+    ledger_root: str | Path,
+    out_root: str | Path,
+    until: str | None = None,
+    fee_per_share: float = 0.0,
+) -> list[str]:
+    """
+    Bring close.json + rollup.parquet up to date for every ledger day <= `until`, in
+    order. A day is reused while its ledger content hash, its opening state (the prior
+    close hash) and the fee model all match; only changed days, and later days whose
+    opening state moved as a result, are recomputed. Returns the recomputed days.
+    """
+    out = Path(out_root)
+    done: list[str] = []
+    prev: dict[str, Any] | None = None
+    for day in ledger_days(ledger_root):
+        if until is not None and day > until:
+            break
+        ledger = Path(ledger_root) / day / "ledger.parquet"
+        close = load_close(out, day)
+        st = os.stat(ledger)
+        stat_key = [st.st_mtime_ns, st.st_size, st.st_ino]
+        if close is not None and close.get("stat") == stat_key:
+            led_hash = close["ledger_hash"]  # unchanged file: skip re-hashing
+        else:
+            led_hash = file_hash(ledger)
+        fresh = (
+            close is not None
+            and close["ledger_hash"] == led_hash
+            and close["open_hash"] == (prev["close_hash"] if prev else "")
+            and close.get("fee_per_share") == fee_per_share
+            and (out / day / "rollup.parquet").exists()
+        )
+        if not fresh:
+            open_hash = prev["close_hash"] if prev else ""
+            opening = closing_positions(prev)
+            close = _close_day(ledger, day, opening, out, led_hash, open_hash, fee_per_share)
+            done.append(day)
+        assert close is not None
+        if close.get("stat") != stat_key:
+            close["stat"] = stat_key
+            atomic_write_text(out / day / "close.json", json.dumps(close))
+        prev = close
+    return done
+
+
+def _close_day(
+    ledger: Path,
+    day: str,
+    opening: dict[str, PositionSnapshot],
+    out: Path,
+    led_hash: str,
+    open_hash: str,
+    fee_per_share: float,
+) -> dict[str, Any]:
+    eng = PositionsEngine(ledger, opening)
+    eng.update()
+    positions = [asdict(p) for p in eng.positions.values() if p.qty != 0]
+    close = {
+        "day": day,
+        "ledger_hash": led_hash,
+        "open_hash": open_hash,
+        "fee_per_share": fee_per_share,
+        "close_hash": hashlib.sha256(
+            json.dumps([[p["symbol"], p["qty"], p["avg_cost"]] for p in positions]).encode()
+        ).hexdigest(),
+        "positions": positions,
+    }
+    rollup = _rollup(ledger, day, opening, eng.positions, fee_per_share)
+    (out / day).mkdir(parents=True, exist_ok=True)
+    rollup.to_parquet(out / day / "rollup.parquet", index=False)
+    atomic_write_text(out / day / "close.json", json.dumps(close))
+    return close
+
+
+def _rollup(
+    ledger: Path,
+    day: str,
+    opening: dict[str, PositionSnapshot],
+    closing: dict[str, PositionSnapshot],
+    fee_per_share: float,
+) -> pd.DataFrame:
+    df = pd.read_parquet(ledger)
+    have = [c for c in _LEDGER_COLS if c in df.columns]
+    fills = df.loc[df["kind"] == "FILL", have] if "kind" in df.columns else df.iloc[:0]
+    if "symbol" not in fills.columns or fills.empty:
+        act = pd.DataFrame(columns=["symbol", "fills", "shares", "turnover", "fees"])
+    else:
+        fills = fills.dropna(subset=["symbol"]).copy()
+        fills["fill_qty"] = fills["fill_qty"].astype(float)
+        # sum of per-fill px*q per tag telescopes to the tag's final avg_px * total qty
+        per_tag = fills.groupby("tag").agg(
+            symbol=("symbol", "last"),
+            fills=("fill_qty", "size"),
+            shares=("fill_qty", "sum"),
+            avg_px=("avg_px", "last"),
+        )
+        per_tag["turnover"] = per_tag["shares"] * per_tag["avg_px"].astype(float)
+        if "fee" in fills.columns:
+            per_tag["fees"] = fills.groupby("tag")["fee"].sum().astype(float)
+        else:
+            per_tag["fees"] = per_tag["shares"] * fee_per_share
+        act = per_tag.groupby("symbol", as_index=False)[
+            ["fills", "shares", "turnover", "fees"]
+        ].sum()
+    rows = []
+    for sym in sorted(set(opening) | set(closing) | set(act["symbol"].astype(str))):
+        o, c = opening.get(sym), closing.get(sym)
+        a = act[act["symbol"] == sym]
+        rows.append(
+            {
+                "day": day,
+                "symbol": sym,
+                "open_qty": o.qty if o else 0.0,
+                "close_qty": c.qty if c else 0.0,
+                "avg_cost": c.avg_cost if c else 0.0,
+                "realized_pnl": c.realized_pnl if c else 0.0,
+                "fills": int(a["fills"].sum()),
+                "shares": float(a["shares"].sum()),
+                "turnover": float(a["turnover"].sum()),
+                "fees": float(a["fees"].sum()),
+            }
+        )
+    return pd.DataFrame(rows, columns=ROLLUP_COLS)
+
+
+def period_rollup(
+    ledger_root: str | Path, out_root: str | Path, period: str, fee_per_share: float = 0.0
+) -> pd.DataFrame:
+    """Per-symbol totals for a day ("2025-01-02"), month ("2025-01") or year ("2025"),
+    read from the daily rollups after refreshing only days that changed."""
+    roll_days(ledger_root, out_root, fee_per_share=fee_per_share)
+    days = [d for d in ledger_days(ledger_root) if d.startswith(period)]
+    parts = [pd.read_parquet(Path(out_root) / d / "rollup.parquet") for d in days]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=ROLLUP_COLS[1:])
+    df = pd.concat(parts, ignore_index=True).sort_values(["symbol", "day"], kind="stable")
+    g = df.groupby("symbol", as_index=False)
+    return g.agg(
+        days=("day", "nunique"),
+        open_qty=("open_qty", "first"),
+        close_qty=("close_qty", "last"),
+        avg_cost=("avg_cost", "last"),
+        realized_pnl=("realized_pnl", "sum"),
+        fills=("fills", "sum"),
+        shares=("shares", "sum"),
+        turnover=("turnover", "sum"),
+        fees=("fees", "sum"),
+    )
+
+
+@app.command()
+def roll(
+    ledger_root: str = "data/exec",
+    out_root: str = "data/accounting",
+    until: str | None = None,
+    fee_per_share: float = 0.0,
+) -> None:
+    """Close every ledger day up to `until` (default: all), recomputing changed days only."""
+    done = roll_days(ledger_root, out_root, until=until, fee_per_share=fee_per_share)
+    typer.echo(f"[accounting] recomputed {len(done)} day(s): {', '.join(done) or '-'}")
+
+
+@app.command()
+def query(
+    period: str,
+    ledger_root: str = "data/exec",
+    out_root: str = "data/accounting",
+    fee_per_share: float = 0.0,
+) -> None:
+    """Print per-symbol totals for a day, month (YYYY-MM) or year (YYYY)."""
+    df = period_rollup(ledger_root, out_root, period, fee_per_share=fee_per_share)
+    typer.echo(df.to_string(index=False) if not df.empty else f"no ledger days in {period}")
+
+
+if __name__ == "__main__":
+    app()
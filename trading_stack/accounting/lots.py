@@ -0,0 +1,174 @@
+"""Tax-lot accounting: open lots per symbol under FIFO, LIFO, average cost and
+specific-ID relief, all kept current so the method is chosen at query time."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from trading_stack.accounting.positions import PositionSnapshot
+from trading_stack.storage.tail import ParquetTail
+
+LotMethod = Literal["fifo", "lifo", "avg", "specific"]
+METHODS: tuple[LotMethod, ...] = ("fifo", "lifo", "avg", "specific")
+_EPS = 1e-9
+_FILL_COLS = ["kind", "tag", "symbol", "side", "fill_qty", "avg_px"]
+
+
+@dataclass
+class Lot:
+    lot_id: str  # opening fill's tag, suffixed when one tag opens several lots
+    qty: float  # signed: >0 long, <0 short; every open lot of a symbol has one sign
+    px: float
+
+
+class LotQueue:
+    """
+    Open lots in opening order: a deque of ids plus an id -> Lot index. Relief from
+    either end pops in O(1); removal by id (specific-ID) drops the index entry and
+    leaves a tombstone that the end pops skip, so each lot is pushed and popped once.
+    """
+
+    def __init__(self) -> None:
+        self.lots: dict[str, Lot] = {}
+        self._order: deque[str] = deque()
+        self._used: dict[str, int] = {}  # ids are never reused while a tombstone may exist
+        self.qty = 0.0
+
+    def open(self, lot_id: str, qty: float, px: float, pool: bool = False) -> None:
+        """Add `qty` (signed) at `px`: into an open lot of the same id (another fill of
+        the same order), into the single lot when pooling, else as a new lot."""
+        lot = next(iter(self.lots.values()), None) if pool else self.lots.get(lot_id)
+        if lot is not None:
+            lot.px = (lot.px * abs(lot.qty) + px * abs(qty)) / (abs(lot.qty) + abs(qty))
+            lot.qty += qty
+        else:
+            n = self._used.get(lot_id, 0)
+            self._used[lot_id] = n + 1
+            key = lot_id if n == 0 else f"{lot_id}#{n}"
+            self.lots[key] = Lot(key, qty, px)
+            self._order.append(key)
+        self.qty += qty
+
+    def relieve(self, qty: float, px: float, end: Literal["old", "new"]) -> tuple[float, float]:
+        """Close up to `qty` (> 0) from the oldest or newest lots; returns (closed, pnl)."""
+        closed = pnl = 0.0
+        while qty - closed > _EPS and self._order:
+            lot_id = self._order[0] if end == "old" else self._order[-1]
+            lot = self.lots.get(lot_id)
+            if lot is None:  # tombstone of a lot closed by id
+                self._order.popleft() if end == "old" else self._order.pop()
+                continue
+            q, p = self._take(lot, qty - closed, px)
+            closed, pnl = closed + q, pnl + p
+            if lot.lot_id not in self.lots:
+                self._order.popleft() if end == "old" else self._order.pop()
+        return closed, pnl
+
+    def relieve_id(self, lot_id: str, qty: float, px: float) -> tuple[float, float]:
+        lot = self.lots.get(lot_id)
+        return (0.0, 0.0) if lot is None else self._take(lot, qty, px)
+
+    def open_lots(self) -> list[Lot]:
+        return [self.lots[i] for i in self._order if i in self.lots]
+
+    def _take(self, lot: Lot, qty: float, px: float) -> tuple[float, float]:
+        q = min(qty, abs(lot.qty))
+        sign = 1.0 if lot.qty > 0 else -1.0
+        lot.qty -= sign * q
+        self.qty -= sign * q
+        if abs(lot.qty) < _EPS:
+            del self.lots[lot.lot_id]
+        if not self.lots:
+            self.qty = 0.0
+        return q, (px - lot.px) * q * sign
+
+
+class _Book:
+    """One relief method's lots and realized P&L per symbol."""
+
+    def __init__(self, method: LotMethod) -> None:
+        self.method = method
+        self.queues: dict[str, LotQueue] = {}
+        self.realized: dict[str, float] = {}
+
+    def fill(self, lot_id: str, symbol: str, dq: float, px: float, close_ids: list[str]) -> None:
+        lq = self.queues.setdefault(symbol, LotQueue())
+        left = abs(dq)
+        if lq.qty != 0 and (lq.qty > 0) != (dq > 0):
+            pnl = 0.0
+            if self.method == "specific":
+                for i in close_ids:
+                    q, p = lq.relieve_id(i, left, px)
+                    left, pnl = left - q, pnl + p
+            # avg holds one pooled lot; specific-ID relieves any undesignated rest FIFO
+            q, p = lq.relieve(left, px, "new" if self.method == "lifo" else "old")
+            left, pnl = left - q, pnl + p
+            self.realized[symbol] = self.realized.get(symbol, 0.0) + pnl
+        if left > _EPS:
+            lq.open(lot_id, left if dq > 0 else -left, px, pool=self.method == "avg")
+
+
+class LotEngine:
+    """
+    Replays ledger FILL rows (same per-tag price recovery as PositionsEngine) into one
+    book per method, each amortized O(1) per fill, so `position`/`realized`/`open_lots`
+    take the method as an argument. A fill crossing through flat closes every open lot
+    and opens the remainder on the other side, identically for longs and shorts.
+    Specific-ID closes the lots named via `designate(tag, lot_ids)` before the fill.
+    """
+
+    def __init__(self, ledger_path: str | Path | None = None) -> None:
+        self.books = {m: _Book(m) for m in METHODS}
+        self._tags: dict[str, tuple[float, float]] = {}
+        self._designated: dict[str, list[str]] = {}
+        self._tail = ParquetTail(ledger_path, columns=_FILL_COLS) if ledger_path else None
+
+    def update(self) -> int:
+        if self._tail is None:
+            return 0
+        new = self._tail.poll()
+        if self._tail.reset:
+            self.books = {m: _Book(m) for m in METHODS}
+            self._tags.clear()
+        if new.empty or not set(_FILL_COLS).issubset(new.columns):
+            return 0
+        fills = new[new["kind"] == "FILL"]
+        cols = ("tag", "symbol", "side", "fill_qty", "avg_px")
+        for tag, sym, side, q, a in fills[list(cols)].itertuples(index=False, name=None):
+            self.on_fill(str(tag), str(sym), str(side), float(q or 0.0), float(a or 0.0))
+        return len(fills)
+
+    def designate(self, tag: str, lot_ids: list[str]) -> None:
+        """Specific-ID: the closing order `tag` relieves these lots first, in order."""
+        self._designated[tag] = list(lot_ids)
+
+    def on_fill(self, tag: str, symbol: str, side: str, fill_qty: float, avg_px: float) -> None:
+        if fill_qty <= 0 or avg_px <= 0:
+            return
+        q_prev, a_prev = self._tags.get(tag, (0.0, 0.0))
+        q_new = q_prev + fill_qty
+        px = avg_px if q_prev == 0 else (avg_px * q_new - a_prev * q_prev) / fill_qty
+        self._tags[tag] = (q_new, avg_px)
+        dq = fill_qty if side.upper() == "BUY" else -fill_qty
+        close_ids = self._designated.get(tag, [])
+        for book in self.books.values():
+            book.fill(tag, symbol, dq, px, close_ids)
+
+    def open_lots(self, symbol: str, method: LotMethod = "fifo") -> list[Lot]:
+        lq = self.books[method].queues.get(symbol)
+        return lq.open_lots() if lq else []
+
+    def realized(self, symbol: str, method: LotMethod = "fifo") -> float:
+        return self.books[method].realized.get(symbol, 0.0)
+
+    def position(self, symbol: str, method: LotMethod = "fifo") -> PositionSnapshot:
+        lots = self.open_lots(symbol, method)
+        qty = sum(lot.qty for lot in lots)
+        cost = sum(abs(lot.qty) * lot.px for lot in lots) / abs(qty) if qty else 0.0
+        return PositionSnapshot(symbol, qty, cost, self.realized(symbol, method))
+
+    def positions(self, method: LotMethod = "fifo") -> dict[str, PositionSnapshot]:
+        return {s: self.position(s, method) for s in self.books[method].queues}
@@ -0,0 +1,144 @@
+"""Streaming mark-to-market: positions x latest marks -> equity curve, rolling peak and
+drawdown, published as one small JSON file so readers never touch Parquet."""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from trading_stack.accounting.positions import PositionSnapshot
+from trading_stack.storage.atomic import atomic_write_text
+
+
+@dataclass(frozen=True)
+class MtmState:
+    ts: str
+    equity: float
+    realized_pnl: float
+    unrealized_pnl: float
+    gross_exposure: float
+    peak_equity: float  # max equity over the rolling window
+    drawdown: float  # equity - peak_equity (<= 0)
+    drawdown_pct: float  # drawdown / peak_equity * 100
+    high_water: float  # max equity since start
+    positions: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+class MarkToMarket:
+    """
+    `set_position` and `mark` keep per-symbol unrealized P&L and exposure and adjust the
+    running totals by the change, so a tick costs O(changed symbols). The rolling peak
+    over `window_sec` is a monotonic deque of (t, equity) with non-increasing equity:
+    each point is pushed and popped at most once, so `update` is amortized O(1).
+    """
+
+    def __init__(self, start_equity: float, window_sec: float = 1800.0) -> None:
+        self.start_equity = start_equity
+        self.window_sec = window_sec
+        self.qty: dict[str, float] = {}
+        self.avg_cost: dict[str, float] = {}
+        self.marks: dict[str, float] = {}
+        self.realized: dict[str, float] = {}
+        self._unreal: dict[str, float] = {}
+        self._expo: dict[str, float] = {}
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+        self.gross_exposure = 0.0
+        self.high_water = start_equity
+        self._peaks: deque[tuple[float, float]] = deque()
+
+    @property
+    def equity(self) -> float:
+        return self.start_equity + self.realized_pnl + self.unrealized_pnl
+
+    def set_position(self, pos: PositionSnapshot) -> None:
+        s = pos.symbol
+        self.realized_pnl += pos.realized_pnl - self.realized.get(s, 0.0)
+        self.realized[s] = pos.realized_pnl
+        self.qty[s], self.avg_cost[s] = pos.qty, pos.avg_cost
+        self._revalue(s)
+
+    def mark(self, symbol: str, px: float) -> None:
+        if px > 0 and self.marks.get(symbol) != px:
+            self.marks[symbol] = px
+            self._revalue(symbol)
+
+    def update(self, now: datetime) -> MtmState:
+        """Append the current equity to the curve and return the published state."""
+        t, eq = now.timestamp(), self.equity
+        peaks = self._peaks
+        while peaks and peaks[-1][1] <= eq:
+            peaks.pop()
+        peaks.append((t, eq))
+        while peaks[0][0] < t - self.window_sec:
+            peaks.popleft()
+        peak = peaks[0][1]
+        self.high_water = max(self.high_water, eq)
+        dd = eq - peak
+        return MtmState(
+            ts=now.isoformat(),
+            equity=eq,
+            realized_pnl=self.realized_pnl,
+            unrealized_pnl=self.unrealized_pnl,
+            gross_exposure=self.gross_exposure,
+            peak_equity=peak,
+            drawdown=dd,
+            drawdown_pct=dd / peak * 100.0 if peak > 0 else 0.0,
+            high_water=self.high_water,
+            positions={
+                s: {
+                    "qty": self.qty[s],
+                    "avg_cost": self.avg_cost[s],
+                    "mark": self.marks.get(s, 0.0),
+                    "unrealized": self._unreal.get(s, 0.0),
+                }
+                for s in self.qty
+            },
+        )
+
+    def _revalue(self, s: str) -> None:
+        q, mark = self.qty.get(s, 0.0), self.marks.get(s)
+        if mark is None:
+            mark = self.avg_cost.get(s, 0.0)  # unmarked: carry at cost
+        unreal = (mark - self.avg_cost.get(s, 0.0)) * q if q else 0.0
+        expo = abs(q) * mark
+        self.unrealized_pnl += unreal - self._unreal.get(s, 0.0)
+        self.gross_exposure += expo - self._expo.get(s, 0.0)
+        self._unreal[s], self._expo[s] = unreal, expo
+
+
+def publish(state: MtmState, path: str | Path) -> None:
+    atomic_write_text(path, json.dumps(asdict(state)))
+
+
+class MtmReader:
+    """Cached reader of the published state: re-parses only when the file changed and
+    returns None when it is missing or older than `max_age_sec`."""
+
+    def __init__(self, path: str | Path, max_age_sec: float = 10.0) -> None:
+        self.path = Path(path)
+        self.max_age_sec = max_age_sec
+        self._key: tuple[int, int, int] | None = None
+        self._state: dict[str, Any] | None = None
+
+    def get(self, now: datetime) -> dict[str, Any] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if key != self._key:
+            try:
+                self._state = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+            self._key = key
+        if self._state is None:
+            return None
+        age = now.timestamp() - datetime.fromisoformat(self._state["ts"]).timestamp()
+        return self._state if age <= self.max_age_sec else None
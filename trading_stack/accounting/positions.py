@@ -1,89 +1,158 @@
 from __future__ import annotations
 
-from collections.abc import Generator
-from dataclasses import dataclass
+import json
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any
 
 import pandas as pd
 
+from trading_stack.storage.atomic import atomic_write_text
+from trading_stack.storage.tail import ParquetTail
+
+_FILL_COLS = ["kind", "tag", "symbol", "side", "fill_qty", "avg_px"]
+
 
 @dataclass
 class PositionSnapshot:
     symbol: str
-    qty: float
+    qty: float  # signed: >0 long, <0 short
     avg_cost: float
     realized_pnl: float
 
 
-def _iter_fills_incremental(df: pd.DataFrame) -> Generator[dict[str, Any], None, None]:
+class PositionsEngine:
     """
-    Ledger FILL rows contain 'fill_qty' (incremental) and 'avg_px' (cumulative avg).
-    Recover each incremental fill price using: p_i = (A_n*Q_n - A_{n-1}*Q_{n-1}) / (Q_n - Q_{n-1})
-    Grouped by 'tag' to avoid cross-trade contamination.
+    Average-cost positions kept current from FILL events, in ledger (append) order.
+    Ledger FILL rows contain 'fill_qty' (incremental) and 'avg_px' (cumulative avg per
+    tag), so each fill price is recovered as p_i = (A_n*Q_n - A_{n-1}*Q_{n-1}) / q_i from
+    the per-tag running (Q, A). `update()` consumes only rows appended since the last
+    call; `checkpoint`/`resume` persist the state together with the ledger row offset.
+    `opening` is the prior day's close: carried qty/avg_cost with realized reset to 0.
     """
-    need = {"kind", "tag", "symbol", "side", "fill_qty", "avg_px", "event_ts"}
-    if not need.issubset(set(df.columns)):
-        return
-    df = df[df["kind"] == "FILL"].copy()
-    df = df.sort_values(["tag", "event_ts"])
-    prev: dict[str, tuple[float, float]] = {}  # tag -> (Q_prev, A_prev)
-    for _, r in df.iterrows():
-        tag = str(r["tag"])
-        q = float(r.get("fill_qty", 0.0) or 0.0)
-        a = float(r.get("avg_px", 0.0) or 0.0)  # cumulative average price after this fill
-        if q <= 0 or a <= 0:
-            continue
-        q_prev, a_prev = prev.get(tag, (0.0, 0.0))
-        q_new = q_prev + q
-        px_i = a if q_prev == 0 else ((a * q_new) - (a_prev * q_prev)) / q
-        prev[tag] = (q_new, a)
-        yield dict(
-            ts=r.get("event_ts"),
-            tag=tag,
-            symbol=str(r["symbol"]),
-            side=str(r["side"]),
-            qty=q,
-            px=float(px_i),
-        )
 
+    def __init__(
+        self, ledger_path: str | Path, opening: dict[str, PositionSnapshot] | None = None
+    ) -> None:
+        self.ledger_path = Path(ledger_path)
+        self.opening = {
+            s: PositionSnapshot(s, p.qty, p.avg_cost, 0.0)
+            for s, p in (opening or {}).items()
+            if p.qty != 0
+        }
+        self.positions: dict[str, PositionSnapshot] = {}
+        self._tags: dict[str, tuple[float, float]] = {}  # tag -> (Q_prev, A_prev)
+        self._reset()
+        self._tail = ParquetTail(self.ledger_path, columns=_FILL_COLS)
+
+    def _reset(self) -> None:
+        self.positions = {s: PositionSnapshot(**asdict(p)) for s, p in self.opening.items()}
+        self._tags = {}
+
+    @property
+    def offset(self) -> int:
+        return self._tail.offset
+
+    def update(self) -> int:
+        """Apply FILL rows appended since the last update; returns how many were applied."""
+        new = self._tail.poll()
+        if self._tail.reset:  # ledger replaced: rebuild from its first row
+            self._reset()
+        if new.empty or not set(_FILL_COLS).issubset(new.columns):
+            return 0
+        fills = new[new["kind"] == "FILL"]
+        cols = ("tag", "symbol", "side", "fill_qty", "avg_px")
+        for tag, sym, side, q, a in fills[list(cols)].itertuples(index=False, name=None):
+            self.on_fill(str(tag), str(sym), str(side), float(q or 0.0), float(a or 0.0))
+        return len(fills)
 
-def compute_positions(ledger_path: str | Path) -> dict[str, PositionSnapshot]:
-    p = Path(ledger_path)
-    if not p.exists():
-        return {}
-    df = pd.read_parquet(p)
-    snaps: dict[str, PositionSnapshot] = {}
-    for f in _iter_fills_incremental(df):
-        sym = f["symbol"]
-        side = f["side"]
-        q = float(f["qty"])
-        px = float(f["px"])
-        pos = snaps.get(sym, PositionSnapshot(symbol=sym, qty=0.0, avg_cost=0.0, realized_pnl=0.0))
-        if side == "BUY":
-            new_qty = pos.qty + q
-            pos.avg_cost = (pos.avg_cost * pos.qty + px * q) / max(new_qty, 1e-9)
+    def on_fill(self, tag: str, symbol: str, side: str, fill_qty: float, avg_px: float) -> None:
+        if fill_qty <= 0 or avg_px <= 0:
+            return
+        q_prev, a_prev = self._tags.get(tag, (0.0, 0.0))
+        q_new = q_prev + fill_qty
+        px = avg_px if q_prev == 0 else (avg_px * q_new - a_prev * q_prev) / fill_qty
+        self._tags[tag] = (q_new, avg_px)
+        pos = self.positions.get(symbol)
+        if pos is None:
+            pos = self.positions[symbol] = PositionSnapshot(symbol, 0.0, 0.0, 0.0)
+        dq = fill_qty if side.upper() == "BUY" else -fill_qty
+        if pos.qty == 0 or (pos.qty > 0) == (dq > 0):
+            new_qty = pos.qty + dq
+            pos.avg_cost = (pos.avg_cost * abs(pos.qty) + px * fill_qty) / abs(new_qty)
             pos.qty = new_qty
-        else:  # SELL
-            sell_qty = min(q, pos.qty)
-            pos.realized_pnl += (px - pos.avg_cost) * sell_qty
-            pos.qty -= sell_qty
-            if pos.qty == 0:
-                pos.avg_cost = 0.0
-        snaps[sym] = pos
-    return snaps
-
-
-def write_snapshot(ledger_path: str | Path, out_path: str | Path) -> None:
-    snaps = compute_positions(ledger_path)
-    rows = [
-        dict(symbol=s.symbol, qty=s.qty, avg_cost=s.avg_cost, realized_pnl=s.realized_pnl)
-        for s in snaps.values()
-    ]
+            return
+        matched = min(fill_qty, abs(pos.qty))
+        pos.realized_pnl += (px - pos.avg_cost) * matched * (1.0 if pos.qty > 0 else -1.0)
+        rest = fill_qty - matched
+        if rest > 0:  # flipped through flat: remainder opens at the fill price
+            pos.qty, pos.avg_cost = (rest if dq > 0 else -rest), px
+        else:
+            pos.qty += dq
+            if abs(pos.qty) < 1e-12:
+                pos.qty, pos.avg_cost = 0.0, 0.0
+
+    def checkpoint(self, path: str | Path) -> None:
+        body = {
+            "ledger": str(self.ledger_path),
+            "offset": self.offset,
+            "positions": [asdict(p) for p in self.positions.values()],
+            "tags": self._tags,
+        }
+        atomic_write_text(path, json.dumps(body))
+
+    @classmethod
+    def resume(
+        cls,
+        ledger_path: str | Path,
+        checkpoint_path: str | Path,
+        opening: dict[str, PositionSnapshot] | None = None,
+    ) -> PositionsEngine:
+        """Restore from a checkpoint of the same ledger; a missing or foreign checkpoint
+        starts from `opening` (the next update replays the whole ledger)."""
+        eng = cls(ledger_path, opening)
+        ck = Path(checkpoint_path)
+        if not ck.exists():
+            return eng
+        try:
+            data = json.loads(ck.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return eng
+        if data.get("ledger") != str(eng.ledger_path):
+            return eng
+        eng.positions = {p["symbol"]: PositionSnapshot(**p) for p in data["positions"]}
+        eng._tags = {t: (float(q), float(a)) for t, (q, a) in data["tags"].items()}
+        eng._tail.offset = int(data["offset"])
+        return eng
+
+
+def compute_positions(
+    ledger_path: str | Path, opening: dict[str, PositionSnapshot] | None = None
+) -> dict[str, PositionSnapshot]:
+    eng = PositionsEngine(ledger_path, opening)
+    eng.update()
+    return eng.positions
+
+
+def write_snapshot(
+    ledger_path: str | Path,
+    out_path: str | Path,
+    checkpoint_path: str | Path | None = None,
+    opening: dict[str, PositionSnapshot] | None = None,
+) -> None:
+    """Write positions to parquet; with a checkpoint only fills since the last run are
+    replayed and the checkpoint is advanced afterwards."""
+    if checkpoint_path is not None:
+        eng = PositionsEngine.resume(ledger_path, checkpoint_path, opening)
+    else:
+        eng = PositionsEngine(ledger_path, opening)
+    eng.update()
+    rows = [asdict(s) for s in eng.positions.values()]
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
     if not rows:
-        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
         pd.DataFrame(columns=["symbol", "qty", "avg_cost", "realized_pnl"]).to_parquet(
             out_path, index=False
         )
-        return
-    pd.DataFrame(rows).to_parquet(out_path, index=False)
+    else:
+        pd.DataFrame(rows).to_parquet(out_path, index=False)
+    if checkpoint_path is not None:
+        eng.checkpoint(checkpoint_path)
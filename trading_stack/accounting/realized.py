@@ -1,28 +1,66 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 PathLike = str | Path
 
+_COLUMNS = [
+    "event_ts",
+    "symbol",
+    "realized_pnl_delta",
+    "realized_pnl_cum",
+    "position_qty",
+    "avg_cost",
+]
+
+# ledger path -> ((mtime_ns, size, inode), all-symbol timeseries)
+_CACHE: dict[Path, tuple[tuple[int, int, int], pd.DataFrame]] = {}
+
+
 def _empty_df() -> pd.DataFrame:
-    return pd.DataFrame(
-        columns=[
-            "event_ts", "symbol", "realized_pnl_delta",
-            "realized_pnl_cum", "position_qty", "avg_cost"
-        ]
-    )
+    return pd.DataFrame(columns=_COLUMNS)
+
 
 def realized_pnl_timeseries(ledger_path: PathLike, symbol: str) -> pd.DataFrame:
     """Compute timestamped realized P&L from FILL rows using average-cost accounting."""
-    p = Path(ledger_path)
-    if not p.exists():
+    ts = realized_pnl_all(ledger_path)
+    if ts.empty:
         return _empty_df()
-    df = pd.read_parquet(p)
-    if df.empty:
+    out = ts[ts["symbol"] == symbol]
+    return out.reset_index(drop=True) if not out.empty else _empty_df()
+
+
+def realized_pnl_all(ledger_path: PathLike) -> pd.DataFrame:
+    """Realized P&L timeseries for every symbol in one pass, cached per ledger version
+    (mtime_ns, size, inode) so repeated calls within a tick are free. Treat as read-only."""
+    p = Path(ledger_path)
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
         return _empty_df()
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    hit = _CACHE.get(p)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    out = _compute(pd.read_parquet(p))
+    _CACHE[p] = (key, out)
+    return out
+
+
+def realized_pnl_from_ledger(ledger: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    """Same as `realized_pnl_timeseries` for a ledger frame already in memory."""
+    ts = _compute(ledger)
+    out = ts[ts["symbol"] == symbol] if not ts.empty else ts
+    return out.reset_index(drop=True) if not out.empty else _empty_df()
 
+
+def _compute(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty or "kind" not in df.columns:
+        return _empty_df()
     fills = df[df["kind"] == "FILL"].copy()
     if fills.empty:
         return _empty_df()
@@ -30,94 +68,70 @@ def realized_pnl_timeseries(ledger_path: PathLike, symbol: str) -> pd.DataFrame:
     # Ensure FILL rows have symbol/side; join with INTENT by tag if missing
     need_cols = {"symbol", "side"}
     if not need_cols.issubset(fills.columns) or fills[list(need_cols)].isna().any().any():
-        intents = df[df["kind"] == "INTENT"][["tag", "symbol", "side"]].drop_duplicates()
+        intents = df[df["kind"] == "INTENT"][["tag", "symbol", "side"]].drop_duplicates("tag")
         fills = fills.merge(intents, on="tag", how="left", suffixes=("", "_i"))
         for c in ("symbol", "side"):
-            if c not in fills.columns or fills[c].isna().any():
-                fills[c] = fills[f"{c}_i"]
-
-    fills = fills[fills["symbol"] == symbol].copy()
+            fills[c] = fills[c].fillna(fills[f"{c}_i"]) if c in fills.columns else fills[f"{c}_i"]
+    fills = fills.dropna(subset=["symbol", "side"])
     if fills.empty:
         return _empty_df()
 
+    # Event-time order across all symbols; ties keep ledger order
     fills["event_ts"] = pd.to_datetime(fills["event_ts"], utc=True)
-    fills = fills.sort_values(["event_ts", "tag"]).reset_index(drop=True)
-    fills["fill_qty"] = fills["fill_qty"].astype(float)
-    fills["avg_px"] = fills["avg_px"].astype(float)
-
-    # Reconstruct per-fill prices from cumulative avg per tag
-    def per_tag_px(g: pd.DataFrame) -> pd.DataFrame:
-        qprev = 0.0
-        aprev = 0.0
-        px = []
-        for _, r in g.iterrows():
-            q = float(r["fill_qty"])
-            a = float(r["avg_px"])           # cumulative avg after this fill
-            qnew = qprev + q
-            px_i = a if qprev == 0 else ((a * qnew) - (aprev * qprev)) / q
-            px.append(px_i)
-            qprev, aprev = qnew, a
-        g = g.copy()
-        g["fill_px"] = px
-        return g
-
-    fills = fills.groupby("tag", group_keys=False).apply(per_tag_px)
-
-    # Run position + realized P&L (average cost)
-    pos_qty = 0.0
-    avg_cost = 0.0
-    realized_cum = 0.0
-    deltas, qtys, costs = [], [], []
-    for _, r in fills.iterrows():
-        side = str(r["side"]).upper()
-        q = float(r["fill_qty"])
-        px = float(r["fill_px"])
-        delta = 0.0
-
-        if side == "BUY":
-            if pos_qty < 0:  # covering short
-                matched = min(q, -pos_qty)
-                delta += (avg_cost - px) * matched
-                pos_qty += matched
-                q -= matched
-                if pos_qty == 0 and q > 0 or q > 0:
-                    avg_cost = px
-                    pos_qty += q
-            else:
-                new_qty = pos_qty + q
-                avg_cost = (avg_cost * pos_qty + px * q) / (new_qty if new_qty != 0 else 1.0)
-                pos_qty = new_qty
-
-        else:  # SELL
-            if pos_qty > 0:  # reducing long
-                matched = min(q, pos_qty)
-                delta += (px - avg_cost) * matched
-                pos_qty -= matched
-                q -= matched
-                if pos_qty == 0 and q > 0 or q > 0:
-                    avg_cost = px
-                    pos_qty -= q
-            else:  # increasing short
-                size = abs(pos_qty)
-                new_size = size + q
-                if pos_qty < 0:
-                    avg_cost = (avg_cost * size + px * q) / (new_size if new_size != 0 else 1.0)
-                else:
-                    avg_cost = px
-                pos_qty -= q
-
-        realized_cum += delta
-        deltas.append(delta)
-        qtys.append(pos_qty)
-        costs.append(avg_cost)
-
-    out = fills[["event_ts", "symbol"]].copy()
-    out["realized_pnl_delta"] = deltas
-    out["realized_pnl_cum"] = pd.Series(deltas).cumsum()
-    out["position_qty"] = qtys
-    out["avg_cost"] = costs
+    fills = fills.sort_values("event_ts", kind="stable").reset_index(drop=True)
+    q = fills["fill_qty"].astype(float).to_numpy()
+    a = fills["avg_px"].astype(float).to_numpy()
+
+    # Per-fill prices from the cumulative average per tag: p_i = (A_n*Q_n - A_{n-1}*Q_{n-1}) / q_i
+    qcum = pd.Series(q).groupby(fills["tag"].to_numpy()).cumsum().to_numpy()
+    aq = a * qcum
+    aq_prev = pd.Series(aq).groupby(fills["tag"].to_numpy()).shift(fill_value=0.0).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        px = np.where(q > 0, (aq - aq_prev) / q, 0.0)
+
+    sym_codes, symbols = pd.factorize(fills["symbol"].astype(str))
+    signed = np.where(fills["side"].astype(str).str.upper().to_numpy() == "BUY", q, -q)
+    delta, qty, cost = _avg_cost_scan(sym_codes, signed, px, len(symbols))
+
+    out = pd.DataFrame(
+        {
+            "event_ts": fills["event_ts"],
+            "symbol": fills["symbol"].astype(str),
+            "realized_pnl_delta": delta,
+        }
+    )
+    out["realized_pnl_cum"] = out.groupby("symbol")["realized_pnl_delta"].cumsum()
+    out["position_qty"] = qty
+    out["avg_cost"] = cost
     return out
 
+
+def _avg_cost_scan(
+    codes: np.ndarray, dq: np.ndarray, px: np.ndarray, n_symbols: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sequential average-cost state per symbol over signed fill quantities. The loop is
+    over plain floats (not numpy scalars), which keeps the per-fill cost to a few ops."""
+    n = len(dq)
+    delta, qty_out, cost_out = [0.0] * n, [0.0] * n, [0.0] * n
+    pos, avg = [0.0] * n_symbols, [0.0] * n_symbols
+    for i, (c, d, p) in enumerate(zip(codes.tolist(), dq.tolist(), px.tolist(), strict=True)):
+        q0, a0 = pos[c], avg[c]
+        q1 = q0 + d
+        if q0 == 0 or (q0 > 0) == (d > 0):
+            a1 = (a0 * abs(q0) + p * abs(d)) / abs(q1) if q1 != 0 else 0.0
+        else:
+            delta[i] = (p - a0) * min(abs(d), abs(q0)) * (1.0 if q0 > 0 else -1.0)
+            if q1 == 0:
+                a1 = 0.0
+            elif (q1 > 0) == (q0 > 0):
+                a1 = a0
+            else:  # flipped through flat: remainder opens at the fill price
+                a1 = p
+        pos[c], avg[c] = q1, a1
+        qty_out[i], cost_out[i] = q1, a1
+    return np.array(delta), np.array(qty_out), np.array(cost_out)
+
+
 def drawdown_pct_last_window(ts_df: pd.DataFrame, equity_usd: float, window_min: int = 30) -> float:
     """Return current drawdown over last window in PCT of equity (negative is loss)."""
     if equity_usd <= 0 or ts_df is None or ts_df.empty:
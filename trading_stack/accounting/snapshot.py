@@ -5,18 +5,26 @@ from pathlib import Path
 
 import typer
 
+from trading_stack.accounting.daily import opening_positions
 from trading_stack.accounting.positions import write_snapshot
 
 app = typer.Typer(help="Positions & PnL snapshot from ledger")
 
 
 @app.command()
-def main(ledger_root: str = "data/exec", out_root: str = "data/accounting") -> None:
+def main(
+    ledger_root: str = "data/exec", out_root: str = "data/accounting", carry: bool = True
+) -> None:
     today = datetime.now(UTC).date().isoformat()
     led = Path(ledger_root) / today / "ledger.parquet"
     out_dir = Path(out_root) / today
     out_dir.mkdir(parents=True, exist_ok=True)
-    write_snapshot(led, out_dir / "positions.parquet")
+    # opens from the previous ledger day's close, so overnight positions carry over
+    opening = opening_positions(ledger_root, out_root, today) if carry else None
+    # resumes from the previous run's checkpoint, so only new fills are replayed
+    write_snapshot(
+        led, out_dir / "positions.parquet", out_dir / "positions.ckpt.json", opening=opening
+    )
     typer.echo(f"[accounting] wrote {out_dir / 'positions.parquet'}")
 
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import time
 from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any
@@ -15,6 +16,7 @@ else:
     except Exception:  # pragma: no cover
         websockets = None
 
+from trading_stack.core.latency import record
 from trading_stack.core.schemas import MarketTrade
 
 BASE = "wss://stream.data.alpaca.markets"
@@ -42,20 +44,25 @@ async def stream_trades(symbol: str, feed: str = "v2/iex") -> AsyncIterator[Mark
                 await ws.send(json.dumps({"action": "subscribe", "trades": [symbol]}))
                 async for raw in ws:
                     now = datetime.now(UTC)
+                    t0 = time.perf_counter_ns()
                     payload = json.loads(raw)
                     events = payload if isinstance(payload, list) else [payload]
-                    for ev in events:
-                        if ev.get("T") == "t":  # trade
-                            ts = _iso_to_dt(ev["t"])
-                            yield MarketTrade(
-                                ts=ts,
-                                symbol=str(ev["S"]),
-                                price=float(ev["p"]),
-                                size=int(ev["s"]),
-                                venue=None,
-                                source=f"alpaca:{feed}",
-                                ingest_ts=now,
-                            )
+                    trades = [
+                        MarketTrade(
+                            ts=_iso_to_dt(ev["t"]),
+                            symbol=str(ev["S"]),
+                            price=float(ev["p"]),
+                            size=int(ev["s"]),
+                            venue=None,
+                            source=f"alpaca:{feed}",
+                            ingest_ts=now,
+                        )
+                        for ev in events
+                        if ev.get("T") == "t"  # trade
+                    ]
+                    record("feedd.decode", t0)
+                    for t in trades:
+                        yield t
         except Exception:
             # brief backoff before reconnect
             await asyncio.sleep(1.0)
@@ -0,0 +1 @@
+"""In-process stand-in for the IBKR adapter, for tests and execd benchmarks."""
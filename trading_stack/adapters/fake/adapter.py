@@ -0,0 +1,243 @@
+"""Fake broker with seeded ack latency, rejects and bar-driven fills; mirrors the async
+surface of IBKRAdapter (connect_async/place_async/events/cancel/disconnect)."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, cast
+
+import numpy as np
+import pandas as pd
+
+from trading_stack.adapters.ibkr.adapter import (
+    TERMINAL,
+    BrokerOrder,
+    EventKind,
+    OrderEvent,
+    PlaceResult,
+)
+from trading_stack.core.schemas import NewOrder
+from trading_stack.execution.simulator import SimConfig, SimExchange
+
+if TYPE_CHECKING:
+    from ib_insync import Trade
+
+FillModel = Literal["instant", "bars", "none"]
+_STATUS: dict[str, Literal["filled", "cancelled", "rejected"]] = {
+    "Filled": "filled",
+    "Cancelled": "cancelled",
+    "Inactive": "rejected",
+}
+
+
+@dataclass
+class FakeConfig:
+    ack_ms: float = 5.0  # median ack latency
+    ack_sigma: float = 0.5  # lognormal shape; 0 gives a fixed latency
+    reject_rate: float = 0.0
+    fill_model: FillModel = "instant"
+    fill_ms: float = 1.0  # instant model: delay before each execution
+    partials: int = 1  # instant model: split each order into N executions
+    bars_path: str | None = None  # bars model: bars1s parquet replayed in a loop
+    bar_sec: float = 0.01  # bars model: wall seconds per replayed bar
+    sim: SimConfig = field(default_factory=SimConfig)  # bars model: matching rules
+    seed: int = 7
+
+
+@dataclass
+class FakeOrder:
+    orderId: int  # noqa: N815 - ib_insync attribute names
+    orderRef: str  # noqa: N815
+
+
+@dataclass
+class FakeTrade:
+    """Duck-types the parts of ib_insync.Trade that execd reads."""
+
+    order: FakeOrder
+    status: str = "PendingSubmit"
+    fills: list[tuple[datetime, float, float]] = field(default_factory=list)  # (ts, qty, px)
+    status_ts: datetime | None = None
+
+    def isDone(self) -> bool:  # noqa: N802
+        return self.status in ("Filled", "Cancelled", "Inactive")
+
+
+class _Track:
+    __slots__ = ("queue", "trade", "order", "task", "filled", "avg_px")
+
+    def __init__(self, trade: FakeTrade, order: NewOrder) -> None:
+        self.queue: asyncio.Queue[OrderEvent] = asyncio.Queue()
+        self.trade = trade
+        self.order = order
+        self.task: asyncio.Task[None] | None = None
+        self.filled = 0.0
+        self.avg_px = 0.0
+
+
+class FakeAdapter:
+    """
+    Orders are acked after a lognormal delay (or rejected with `reject_rate`), then filled
+    by the configured model: "instant" fills at the limit in `partials` executions,
+    "bars" replays a bars file in wall time through a SimExchange (trade-through,
+    participation and queue position per `cfg.sim`). All randomness comes from `seed`.
+    """
+
+    def __init__(self, cfg: FakeConfig | None = None) -> None:
+        self.cfg = cfg or FakeConfig()
+        self._rng = random.Random(self.cfg.seed)
+        self._next_id = 1
+        self._tracks: dict[str, _Track] = {}
+        self._trades: dict[str, FakeTrade] = {}  # every placed order, for completed_async
+        self._bars: tuple[list[str], np.ndarray] | None = None
+        self._sim: SimExchange | None = None
+        self._replay: asyncio.Task[None] | None = None
+        if self.cfg.fill_model == "bars":
+            self._bars = _load_bars(self.cfg.bars_path)
+            self._sim = SimExchange(self.cfg.sim)
+
+    def connect(self) -> None:
+        pass
+
+    async def connect_async(self) -> None:
+        if self._bars is not None and self._replay is None:
+            self._replay = asyncio.create_task(self._run_bars())
+
+    def disconnect(self) -> None:
+        for track in self._tracks.values():
+            if track.task is not None:
+                track.task.cancel()
+        if self._replay is not None:
+            self._replay.cancel()
+            self._replay = None
+
+    def ack_latency_sec(self) -> float:
+        c = self.cfg
+        if c.ack_sigma <= 0:
+            return c.ack_ms / 1e3
+        return self._rng.lognormvariate(math.log(max(c.ack_ms, 1e-6)), c.ack_sigma) / 1e3
+
+    async def place_async(self, order: NewOrder, timeout_sec: float = 8.0) -> PlaceResult:
+        tag = order.tag or ""
+        latency = self.ack_latency_sec()
+        rejected = self._rng.random() < self.cfg.reject_rate
+        trade = self._trades[tag] = FakeTrade(FakeOrder(self._next_id, tag))
+        self._next_id += 1
+        await asyncio.sleep(min(latency, timeout_sec))
+        if rejected:
+            trade.status, trade.status_ts = "Inactive", datetime.now(UTC)
+            raise RuntimeError("fake broker reject")
+        trade.status = "Submitted"
+        ack_ts = datetime.now(UTC)
+        track = self._tracks[tag] = _Track(trade, order)
+        if self._sim is not None:
+            self._sim.submit(order, ack_ts)
+        elif self.cfg.fill_model == "instant":
+            track.task = asyncio.create_task(self._work(track))
+        return PlaceResult(trade=cast("Trade", trade), ack_ts=ack_ts)
+
+    async def events(self, tag: str) -> AsyncIterator[OrderEvent]:
+        """Yield the order's events after ACK, ending after FILL/CANCEL."""
+        track = self._tracks.get(tag)
+        if track is None:
+            return
+        while True:
+            ev = await track.queue.get()
+            if ev.kind in TERMINAL:
+                self._tracks.pop(tag, None)
+                yield ev
+                return
+            yield ev
+
+    def cancel(self, trade: FakeTrade) -> None:
+        track = self._tracks.get(trade.order.orderRef)
+        if track is None or trade.isDone():
+            return
+        if track.task is not None:
+            track.task.cancel()
+        if self._sim is not None:
+            self._sim.cancel(trade.order.orderRef, datetime.now(UTC))
+        trade.status, trade.status_ts = "Cancelled", datetime.now(UTC)
+        self._emit(track, "CANCEL")
+
+    def open_order_tags(self) -> set[str]:
+        return {t for t, tr in self._tracks.items() if not tr.trade.isDone()}
+
+    def adopt(self, tag: str, qty: float, filled: float = 0.0) -> None:
+        """The fake broker lives in this process: an order still open here kept its track,
+        so events(tag) already resumes it."""
+
+    async def completed_async(self, tags: set[str]) -> dict[str, BrokerOrder]:
+        """Executions and final status of `tags`; unknown for orders never placed here."""
+        out: dict[str, BrokerOrder] = {}
+        for tag in tags:
+            b = out[tag] = BrokerOrder(tag)
+            trade = self._trades.get(tag)
+            if trade is None:
+                continue
+            b.fills = list(trade.fills)
+            b.status = _STATUS.get(trade.status, "unknown")
+            b.ts = trade.status_ts
+        return out
+
+    # ---- fill models
+
+    def _emit(self, track: _Track, kind: EventKind, qty: float = 0.0, px: float = 0.0) -> None:
+        trade = track.trade
+        ev = OrderEvent(trade.order.orderRef, kind, datetime.now(UTC), trade.order.orderId, qty, px)
+        track.queue.put_nowait(ev)
+
+    def _execute(self, track: _Track, left: float, qty: float, px: float) -> float:
+        """Record one execution of `qty` at `px`; returns the quantity still open."""
+        track.trade.fills.append((datetime.now(UTC), qty, px))
+        left -= qty
+        if left <= 1e-9:
+            track.trade.status = "Filled"
+        self._emit(track, "FILL" if left <= 1e-9 else "PARTIAL", qty, px)
+        return left
+
+    async def _work(self, track: _Track) -> None:
+        order = track.order
+        left = float(order.qty)
+        chunk = math.ceil(order.qty / max(1, self.cfg.partials))
+        while left > 1e-9:
+            await asyncio.sleep(self.cfg.fill_ms / 1e3)
+            left = self._execute(track, left, min(chunk, left), order.limit or 0.0)
+
+    async def _run_bars(self) -> None:
+        """Feed one replayed bar per `bar_sec` to the SimExchange, stamped with wall time."""
+        assert self._bars is not None and self._sim is not None
+        symbols, bars = self._bars
+        i = 0
+        while True:
+            await asyncio.sleep(self.cfg.bar_sec)
+            k = i % len(bars)
+            i += 1
+            _, o, h, lo, v = bars[k]
+            for row in self._sim.match(symbols[k], datetime.now(UTC), o, h, lo, v):
+                track = self._tracks.get(row["tag"])
+                if track is None:
+                    continue
+                # ledger rows carry the cumulative average; recover this execution's price
+                q, avg = float(row["fill_qty"]), float(row["avg_px"])
+                px = (avg * (track.filled + q) - track.avg_px * track.filled) / q
+                left = track.order.qty - track.filled
+                track.filled, track.avg_px = track.filled + q, avg
+                self._execute(track, left, q, px)
+
+
+def _load_bars(path: str | None) -> tuple[list[str], np.ndarray]:
+    """Symbols plus (n, 5) float64 rows of [ts_ns, open, high, low, volume] in time order."""
+    if not path or not Path(path).exists():
+        raise FileNotFoundError(f"fill_model='bars' needs a bars parquet, got {path!r}")
+    df = pd.read_parquet(path).sort_values("ts")
+    ts = pd.to_datetime(df["ts"], utc=True).dt.as_unit("ns").astype("int64")
+    cols = [ts, df["open"], df["high"], df["low"], df["volume"]]
+    arr = np.column_stack([np.asarray(c, dtype=np.float64) for c in cols])
+    return df["symbol"].astype(str).tolist(), arr
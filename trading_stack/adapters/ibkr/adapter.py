@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from typing import Any, Literal
 
 try:
-    from ib_insync import IB, LimitOrder, MarketOrder, Stock, Trade
+    from ib_insync import IB, Fill, LimitOrder, MarketOrder, Stock, Trade
 except ImportError:  # pragma: no cover
     IB = None  # type: ignore[assignment,misc,unused-ignore]
 
 from trading_stack.core.schemas import NewOrder
 
+EventKind = Literal["ACK", "PARTIAL", "FILL", "CANCEL", "REJ"]
+TERMINAL: frozenset[str] = frozenset({"FILL", "CANCEL", "REJ"})
+_ACKED = frozenset({"presubmitted", "submitted", "filled"})
+_CANCELLED = frozenset({"cancelled", "apicancelled"})
+
 
 @dataclass
 class PlaceResult:
@@ -17,12 +25,57 @@ class PlaceResult:
     ack_ts: datetime
 
 
+@dataclass
+class OrderEvent:
+    """One broker-side transition, timestamped when the callback fired."""
+
+    tag: str
+    kind: EventKind
+    ts: datetime
+    order_id: int | None = None
+    qty: float = 0.0  # this fill's shares (PARTIAL/FILL)
+    px: float = 0.0  # this fill's price (PARTIAL/FILL)
+    reason: str | None = None
+
+
+@dataclass
+class BrokerOrder:
+    """The broker's record of an order that is no longer open: its executions as
+    (ts, qty, px) and how it ended ("unknown" when the broker has no final status)."""
+
+    tag: str
+    status: Literal["filled", "cancelled", "rejected", "unknown"] = "unknown"
+    fills: list[tuple[datetime, float, float]] = field(default_factory=list)
+    ts: datetime | None = None  # when it was cancelled/rejected, if known
+    reason: str | None = None
+
+
+class _OrderTrack:
+    __slots__ = ("queue", "acked", "done", "filled", "total")
+
+    def __init__(self, total: float) -> None:
+        self.queue: asyncio.Queue[OrderEvent] = asyncio.Queue()
+        self.acked = False
+        self.done = False
+        self.filled = 0.0
+        self.total = total
+
+
 class IBKRAdapter:
+    """
+    Orders are tagged via `orderRef`. The adapter subscribes to ib_insync's
+    orderStatusEvent/execDetailsEvent and turns them into OrderEvents stamped at callback
+    time, queued per tag; `events(tag)` iterates them, `place_async` waits on the ACK.
+    """
+
     def __init__(self, host: str = "127.0.0.1", port: int = 7497, client_id: int = 7) -> None:
         if IB is None:
             raise RuntimeError("ib_insync not installed. Install extra: pip install '.[ib]'")
         self.ib = IB()
         self.host, self.port, self.client_id = host, port, client_id
+        self._tracks: dict[str, _OrderTrack] = {}
+        self.ib.orderStatusEvent += self._on_status
+        self.ib.execDetailsEvent += self._on_exec
 
     def connect(self) -> None:
         self.ib.connect(self.host, self.port, clientId=self.client_id)
@@ -30,29 +83,148 @@ class IBKRAdapter:
     def disconnect(self) -> None:
         self.ib.disconnect()
 
-    def place(self, order: NewOrder) -> PlaceResult:
+    async def connect_async(self) -> None:
+        await self.ib.connectAsync(self.host, self.port, clientId=self.client_id)
+
+    @staticmethod
+    def _contract_order(order: NewOrder) -> tuple[Stock, MarketOrder | LimitOrder]:
         c = Stock(order.symbol, "SMART", "USD")
         o: MarketOrder | LimitOrder
         if order.limit is None:
             o = MarketOrder(order.side, int(order.qty))
         else:
             o = LimitOrder(order.side, int(order.qty), order.limit)
+        return c, o
+
+    def place(self, order: NewOrder, timeout_sec: float = 8.0) -> PlaceResult:
+        """Blocking place: runs the ib_insync loop until the ACK callback (or timeout)."""
+        res: PlaceResult = self.ib.run(self.place_async(order, timeout_sec))
+        return res
+
+    async def place_async(self, order: NewOrder, timeout_sec: float = 8.0) -> PlaceResult:
+        """Place and wait for the ACK callback; raises on a broker reject. On timeout the
+        result is still returned (stamped now) and a late ACK shows up in events()."""
+        c, o = self._contract_order(order)
+        tag = order.tag or ""
+        o.orderRef = tag
+        track = self._tracks[tag] = _OrderTrack(float(order.qty))
         t: Trade = self.ib.placeOrder(c, o)
+        try:
+            ev = await asyncio.wait_for(track.queue.get(), timeout_sec)
+        except TimeoutError:
+            return PlaceResult(trade=t, ack_ts=datetime.now(UTC))
+        if ev.kind == "REJ":
+            self._tracks.pop(tag, None)
+            raise RuntimeError(ev.reason or "rejected by broker")
+        if ev.kind != "ACK":  # e.g. a fill raced ahead; keep it for events()
+            track.queue.put_nowait(ev)
+        return PlaceResult(trade=t, ack_ts=ev.ts)
 
-        # Wait specifically for first transition to PreSubmitted/Submitted.
-        ack_ts: datetime | None = None
-        for _ in range(80):  # up to ~8s
-            self.ib.waitOnUpdate(timeout=0.1)
+    async def events(self, tag: str) -> AsyncIterator[OrderEvent]:
+        """Yield the order's remaining events, ending after FILL/CANCEL/REJ. Safe to stop
+        early (e.g. on a TTL) and resume later; nothing is dropped in between."""
+        track = self._tracks.get(tag)
+        if track is None:
+            return
+        while True:
+            ev = await track.queue.get()
+            if ev.kind in TERMINAL:
+                self._tracks.pop(tag, None)
+                yield ev
+                return
+            yield ev
+
+    def open_order_tags(self) -> set[str]:
+        """orderRef of every order the gateway still reports as open."""
+        return {t.order.orderRef for t in self.ib.openTrades() if t.order.orderRef}
+
+    def adopt(self, tag: str, qty: float, filled: float = 0.0) -> None:
+        """Route callbacks for an order placed before a restart to events(tag)."""
+        track = self._tracks.setdefault(tag, _OrderTrack(qty))
+        track.acked, track.filled = True, filled
+
+    async def completed_async(self, tags: set[str]) -> dict[str, BrokerOrder]:
+        """What the gateway reports for `tags` that are no longer open: today's executions
+        (reqExecutions) and the final status from this session's trades or the completed
+        orders list, so orders that finished while we were down are not mistaken for
+        cancels."""
+        out = {t: BrokerOrder(t) for t in tags}
+        seen: set[str] = set()
+        for f in await self.ib.reqExecutionsAsync():
+            ex = f.execution
+            b = out.get(getattr(ex, "orderRef", "") or "")
+            q, px = float(ex.shares or 0), float(ex.price or 0.0)
+            if b is None or q <= 0 or px <= 0 or ex.execId in seen:
+                continue
+            seen.add(ex.execId)
+            b.fills.append((ex.time or f.time, q, px))
+        trades = [*self.ib.trades(), *await self.ib.reqCompletedOrdersAsync(apiOnly=True)]
+        for t in trades:
+            b = out.get(getattr(t.order, "orderRef", "") or "")
+            if b is None or b.status != "unknown":
+                continue
             status = (t.orderStatus.status or "").lower()
-            if status in ("presubmitted", "submitted"):
-                ack_ts = datetime.now(UTC)
-                break
+            log = getattr(t, "log", None) or []
+            if status == "filled":
+                b.status = "filled"
+            elif status in _CANCELLED:
+                b.status, b.reason = "cancelled", status
+            elif status == "inactive":
+                b.status = "rejected"
+                b.reason = (log[-1].message if log else "") or "inactive"
+            if log and b.status in ("cancelled", "rejected"):
+                b.ts = log[-1].time
+        for b in out.values():
+            b.fills.sort(key=lambda f: f[0])
+        return out
+
+    # ---- ib_insync callbacks (run on the event loop thread)
+
+    def _emit(self, track: _OrderTrack, ev: OrderEvent) -> None:
+        if track.done:
+            return
+        if ev.kind != "ACK" and not track.acked and ev.kind != "REJ":
+            # executions can arrive before the Submitted status; ACK never trails a fill
+            self._emit(track, OrderEvent(ev.tag, "ACK", ev.ts, ev.order_id))
+        if ev.kind == "ACK":
+            if track.acked:
+                return
+            track.acked = True
+        track.done = ev.kind in TERMINAL
+        track.queue.put_nowait(ev)
 
-        if ack_ts is None:
-            # Fallback: still return, but the scorecard will show it.
-            ack_ts = datetime.now(UTC)
+    def _on_status(self, trade: Any) -> None:
+        ts = datetime.now(UTC)
+        tag = getattr(trade.order, "orderRef", "") or ""
+        track = self._tracks.get(tag)
+        if track is None:
+            return
+        status = (trade.orderStatus.status or "").lower()
+        oid = getattr(trade.order, "orderId", None)
+        if status in _ACKED:
+            self._emit(track, OrderEvent(tag, "ACK", ts, oid))
+        elif status in _CANCELLED:
+            kind: EventKind = "CANCEL" if track.acked else "REJ"
+            self._emit(track, OrderEvent(tag, kind, ts, oid, reason=status))
+        elif status == "inactive":
+            log = getattr(trade, "log", None) or []
+            reason = (log[-1].message if log else "") or "inactive"
+            self._emit(track, OrderEvent(tag, "REJ", ts, oid, reason=reason))
 
-        return PlaceResult(trade=t, ack_ts=ack_ts)
+    def _on_exec(self, trade: Any, fill: Fill) -> None:
+        ts = datetime.now(UTC)
+        tag = getattr(trade.order, "orderRef", "") or ""
+        track = self._tracks.get(tag)
+        if track is None:
+            return
+        q = float(getattr(fill.execution, "shares", 0) or 0)
+        px = float(getattr(fill.execution, "price", 0.0) or 0.0)
+        if q <= 0 or px <= 0:
+            return
+        track.filled += q
+        kind: EventKind = "FILL" if track.filled >= track.total - 1e-9 else "PARTIAL"
+        oid = getattr(trade.order, "orderId", None)
+        self._emit(track, OrderEvent(tag, kind, ts, oid, qty=q, px=px))
 
     def cancel(self, trade: Trade) -> None:
         self.ib.cancelOrder(trade.order)
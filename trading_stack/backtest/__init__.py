@@ -0,0 +1 @@
+"""Offline backtest and parameter research tools."""
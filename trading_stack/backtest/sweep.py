@@ -0,0 +1,169 @@
+"""Parallel parameter sweep for MeanReversion1S over shared-memory bar arrays."""
+
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import typer
+
+app = typer.Typer(help="Offline parameter sweep for the baseline strategy")
+
+# Column layout of the shared bar matrix (float64, one row per 1s bar).
+TS, OPEN, HIGH, LOW, CLOSE = range(5)
+_BAR_COLS = ["open", "high", "low", "close"]
+
+# Per-process view of the shared bars, set by the pool initializer.
+_SHARED: dict[str, Any] = {}
+
+
+def load_bars(bars_path: str | Path, symbol: str | None = None) -> np.ndarray:
+    """Load a bars parquet once into an (n, 5) float64 matrix sorted by ts."""
+    df = pd.read_parquet(bars_path)
+    if symbol is not None and "symbol" in df.columns:
+        df = df[df["symbol"] == symbol]
+    if df.empty:
+        return np.empty((0, 5), dtype=np.float64)
+    ts = pd.to_datetime(df["ts"], utc=True)
+    df = df.assign(ts=ts).sort_values("ts")
+    out = np.empty((len(df), 5), dtype=np.float64)
+    out[:, TS] = df["ts"].dt.as_unit("ns").astype("int64").to_numpy() / 1e9
+    out[:, OPEN:] = df[_BAR_COLS].to_numpy(dtype=np.float64)
+    return out
+
+
+def simulate(
+    bars: np.ndarray, threshold_bps: float, window: int, max_notional: float = 2000.0
+) -> dict[str, float]:
+    """
+    Vectorized replay of MeanReversion1S on a bar matrix.
+    Signals match the strategy (close vs rolling mean of the last `window` closes, qty 1,
+    limit at close). Each limit is worked on the next bar only: it fills at the better of
+    the open and the limit if that bar trades through the limit, otherwise it lapses.
+    """
+    n = len(bars)
+    out = {
+        "signals": 0.0,
+        "fills": 0.0,
+        "pnl": 0.0,
+        "turnover": 0.0,
+        "shortfall_bps": 0.0,
+        "final_qty": 0.0,
+    }
+    if window <= 0 or n < window + 1:
+        return out
+    close = bars[:, CLOSE]
+    csum = np.concatenate(([0.0], np.cumsum(close)))
+    mean = (csum[window:] - csum[:-window]) / window  # mean of closes ending at i
+    idx = np.arange(window - 1, n)
+    dev_bps = (close[idx] / mean - 1.0) * 1e4
+    side = np.where(dev_bps > threshold_bps, -1.0, np.where(dev_bps < -threshold_bps, 1.0, 0.0))
+    # risk gate: notional at limit (qty 1) must stay under max_notional
+    side[close[idx] > max_notional] = 0.0
+    out["signals"] = float(np.count_nonzero(side))
+
+    # work each signal on the next bar (drop the final bar's signal: no next bar)
+    sig = idx[:-1][side[:-1] != 0]
+    s = side[:-1][side[:-1] != 0]
+    if sig.size == 0:
+        return out
+    limit = close[sig]
+    nxt = sig + 1
+    buy = s > 0
+    filled = np.where(buy, bars[nxt, LOW] <= limit, bars[nxt, HIGH] >= limit)
+    px = np.where(buy, np.minimum(bars[nxt, OPEN], limit), np.maximum(bars[nxt, OPEN], limit))
+    s, px, limit = s[filled], px[filled], limit[filled]
+    if s.size == 0:
+        return out
+    qty = float(s.sum())
+    cash = float(-(s * px).sum())
+    shortfall = np.where(s > 0, px / limit - 1.0, 1.0 - px / limit) * 1e4
+    out["fills"] = float(s.size)
+    out["pnl"] = cash + qty * float(close[-1])
+    out["turnover"] = float(np.abs(s * px).sum())
+    out["shortfall_bps"] = float(shortfall.mean())
+    out["final_qty"] = qty
+    return out
+
+
+def _attach(name: str, shape: tuple[int, int]) -> None:
+    # Pool workers share the parent's resource tracker; the parent owns and unlinks.
+    shm = SharedMemory(name=name)
+    _SHARED["shm"] = shm
+    _SHARED["bars"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _run_combo(combo: tuple[float, int, float]) -> dict[str, float]:
+    th, window, max_notional = combo
+    res = simulate(_SHARED["bars"], th, window, max_notional)
+    return {"threshold_bps": th, "window": float(window), **res}
+
+
+def run_sweep(
+    bars: np.ndarray,
+    thresholds: list[float],
+    windows: list[int],
+    workers: int = 0,
+    max_notional: float = 2000.0,
+) -> pd.DataFrame:
+    """Evaluate the (threshold, window) grid across a process pool sharing one bar copy."""
+    combos = [(float(t), int(w), max_notional) for t, w in itertools.product(thresholds, windows)]
+    workers = workers or os.cpu_count() or 1
+    shm = SharedMemory(create=True, size=max(bars.nbytes, 1))
+    try:
+        view = np.ndarray(bars.shape, dtype=np.float64, buffer=shm.buf)
+        view[:] = bars
+        shape = (int(bars.shape[0]), int(bars.shape[1]))
+        chunksize = max(1, len(combos) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach, initargs=(shm.name, shape)
+        ) as pool:
+            rows = list(pool.map(_run_combo, combos, chunksize=chunksize))
+        del view
+    finally:
+        shm.close()
+        shm.unlink()
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["window"] = df["window"].astype(int)
+    return df
+
+
+def _parse_list(s: str) -> list[str]:
+    return [x.strip() for x in s.split(",") if x.strip()]
+
+
+@app.command()
+def main(
+    bars_path: str = "data/synth_bars.parquet",
+    symbol: str = "SPY",
+    thresholds: str = "0.3,0.5,0.75,1.0,1.5,2.0",
+    windows: str = "15,30,60,120",
+    workers: int = 0,
+    max_notional: float = 2000.0,
+    out: str = "data/sweep/results.parquet",
+) -> None:
+    """Sweep threshold x window for MeanReversion1S and write PnL/turnover/shortfall."""
+    bars = load_bars(bars_path, symbol)
+    ths = [float(x) for x in _parse_list(thresholds)]
+    wins = [int(x) for x in _parse_list(windows)]
+    df = run_sweep(bars, ths, wins, workers=workers, max_notional=max_notional)
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(out, index=False)
+    typer.echo(f"[sweep] bars={len(bars)} combos={len(df)} -> {out}")
+    if not df.empty:
+        best = df.sort_values("pnl", ascending=False).iloc[0]
+        typer.echo(
+            f"[sweep] best pnl={best['pnl']:.2f} at threshold_bps={best['threshold_bps']} "
+            f"window={int(best['window'])}"
+        )
+
+
+if __name__ == "__main__":
+    app()
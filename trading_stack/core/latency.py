@@ -0,0 +1,156 @@
+"""Low-overhead stage latency spans, per-process ring buffer and periodic histogram dumps."""
+
+from __future__ import annotations
+
+import time
+from array import array
+from datetime import UTC, datetime
+from pathlib import Path
+from types import TracebackType
+
+import numpy as np
+import pandas as pd
+
+TRACE_SEP = "~"
+_QUANTILES = (50, 90, 99)
+
+
+class SpanRing:
+    """
+    Fixed-capacity ring of (stage_id, duration_ns) samples.
+    Each process owns one ring and writes from a single thread, so recording is two slot
+    stores and a counter bump with no lock; a dump copies whatever was written since the
+    previous dump (older samples are overwritten once the ring wraps).
+    """
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        self.capacity = capacity
+        self._stage = array("i", bytes(4 * capacity))
+        self._dur = array("q", bytes(8 * capacity))
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._n = 0  # total samples ever written
+        self._dumped = 0  # value of _n at the last drain
+
+    def record(self, stage: str, dur_ns: int) -> None:
+        sid = self._ids.get(stage)
+        if sid is None:
+            sid = self._ids[stage] = len(self._names)
+            self._names.append(stage)
+        i = self._n % self.capacity
+        self._stage[i] = sid
+        self._dur[i] = dur_ns
+        self._n += 1
+
+    def drain(self) -> dict[str, np.ndarray]:
+        """Return durations (ns) per stage recorded since the last drain."""
+        end = self._n
+        start = max(self._dumped, end - self.capacity)
+        self._dumped = end
+        if end == start:
+            return {}
+        idx = np.arange(start, end) % self.capacity
+        stages = np.frombuffer(self._stage, dtype=np.int32)[idx]
+        durs = np.frombuffer(self._dur, dtype=np.int64)[idx]
+        return {self._names[sid]: durs[stages == sid] for sid in np.unique(stages)}
+
+
+_RING = SpanRing()
+_next_dump = 0.0
+
+
+def ring() -> SpanRing:
+    return _RING
+
+
+def record(stage: str, t0_ns: int, t1_ns: int | None = None) -> None:
+    """Record a span that started at perf_counter_ns() == t0_ns."""
+    _RING.record(stage, (t1_ns if t1_ns is not None else time.perf_counter_ns()) - t0_ns)
+
+
+def record_duration(stage: str, dur_ns: int) -> None:
+    """Record an externally measured duration, e.g. a cross-process wall-clock delta."""
+    _RING.record(stage, dur_ns)
+
+
+class span:  # lowercase, used like the contextlib helpers
+    """`with span("engined.read"): ...` records the block's wall duration."""
+
+    __slots__ = ("stage", "t0")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.t0 = 0
+
+    def __enter__(self) -> span:
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        _RING.record(self.stage, time.perf_counter_ns() - self.t0)
+
+
+def histograms(samples: dict[str, np.ndarray]) -> pd.DataFrame:
+    """Summarize per-stage samples (ns) into count/mean/quantiles/max in microseconds."""
+    rows = []
+    for stage, d in sorted(samples.items()):
+        us = d.astype(np.float64) / 1e3
+        q = np.percentile(us, _QUANTILES)
+        rows.append(
+            {
+                "stage": stage,
+                "count": int(us.size),
+                "mean_us": float(us.mean()),
+                **{f"p{p}_us": float(v) for p, v in zip(_QUANTILES, q, strict=True)},
+                "max_us": float(us.max()),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def dump(proc: str, root: str | Path = "data/latency") -> Path | None:
+    """Append this process's per-stage histograms since the last dump to
+    {root}/{day}/latency_{proc}.parquet."""
+    df = histograms(_RING.drain())
+    if df.empty:
+        return None
+    now = datetime.now(UTC)
+    df.insert(0, "proc", proc)
+    df.insert(0, "ts", now)
+    path = Path(root) / now.date().isoformat() / f"latency_{proc}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+    df.to_parquet(path, index=False)
+    return path
+
+
+def maybe_dump(proc: str, root: str | Path = "data/latency", every_sec: float = 10.0) -> None:
+    """Cheap to call from hot loops; dumps at most once per `every_sec`."""
+    global _next_dump
+    now = time.monotonic()
+    if now < _next_dump:
+        return
+    _next_dump = now + every_sec
+    dump(proc, root)
+
+
+def with_trace(tag: str, origin_ns: int) -> str:
+    """Carry a wall-clock origin (time.time_ns()) on an order tag for end-to-end stitching."""
+    return f"{tag}{TRACE_SEP}{origin_ns}"
+
+
+def split_trace(tag: str | None) -> tuple[str | None, int | None]:
+    """Inverse of with_trace: (base_tag, origin_ns) - origin is None for untraced tags."""
+    if not tag or TRACE_SEP not in tag:
+        return tag, None
+    base, _, origin = tag.rpartition(TRACE_SEP)
+    try:
+        return base, int(origin)
+    except ValueError:
+        return tag, None
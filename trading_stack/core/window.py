@@ -0,0 +1,42 @@
+"""Trailing time window over (t, value) points."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+
+
+class Window:
+    """(t, value) points in a trailing time window, with a monotonic deque for the max."""
+
+    def __init__(self, span: timedelta) -> None:
+        self.span = span
+        self.points: deque[tuple[datetime, float]] = deque()
+        self._max: deque[tuple[datetime, float]] = deque()
+
+    def add(self, t: datetime, v: float = 1.0) -> None:
+        self.points.append((t, v))
+        while self._max and self._max[-1][1] <= v:
+            self._max.pop()
+        self._max.append((t, v))
+
+    def trim(self, now: datetime) -> None:
+        cut = now - self.span
+        while self.points and self.points[0][0] < cut:
+            self.points.popleft()
+        while self._max and self._max[0][0] < cut:
+            self._max.popleft()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @property
+    def last(self) -> float:
+        return self.points[-1][1]
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1]
+
+    def sum(self) -> float:
+        return sum(v for _, v in self.points)
@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+import time
+
+from trading_stack.core.latency import record
 from trading_stack.core.schemas import Bar1s, NewOrder
 from trading_stack.risk.gate import RiskConfig, pretrade_check
 from trading_stack.strategy.baseline import MeanReversion1S
 
 
 class DecisionEngine:
-    def __init__(self, symbol: str, threshold: float, max_notional: float, price_band_bps: int):
+    def __init__(
+        self,
+        symbol: str,
+        threshold: float,
+        max_notional: float,
+        price_band_bps: int,
+        symbol_whitelist: set[str] | None = None,
+    ):
         self.strategy = MeanReversion1S(threshold=threshold, symbol=symbol)
         self.risk = RiskConfig(max_notional=max_notional, price_band_bps=price_band_bps)
+        if symbol_whitelist is not None:
+            self.risk.symbol_whitelist = set(symbol_whitelist)
         self.last_px: float | None = None
 
     def on_bar(self, bar: Bar1s) -> list[NewOrder]:
         self.last_px = bar.close
+        t0 = time.perf_counter_ns()
         intents = self.strategy.on_bar(bar)
+        t1 = time.perf_counter_ns()
+        record("engined.strategy", t0, t1)
+        if not intents:
+            return []
         out: list[NewOrder] = []
         for o in intents:
             ok, reason = pretrade_check(o, self.last_px, self.risk)
             if ok:
                 out.append(o)
+        record("engined.risk", t1)
         return out
@@ -0,0 +1,197 @@
+"""Bar-driven matching simulator: resting limit orders filled by trade-through and
+volume-participation rules with a queue-position model, emitting execd ledger rows."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from trading_stack.core.schemas import Bar1s, NewOrder
+
+
+@dataclass
+class SimConfig:
+    participation: float = 0.1  # max share of a bar's volume our orders take together
+    queue_ahead: float = 0.0  # shares resting ahead of us when an order joins its level
+    touch_volume_frac: float = 0.5  # share of a touching bar's volume printed at our price
+    fill_on_touch: bool = True  # False: only bars trading through the limit fill
+    ack_latency_ms: float = 0.0  # sim-time ACK delay; orders match bars after the ACK
+
+
+@dataclass
+class SimOrder:
+    tag: str
+    symbol: str
+    side: str
+    qty: float
+    limit: float | None
+    created_ts: datetime
+    ack_ts: datetime
+    order_id: int
+    queue_ahead: float
+    filled: float = 0.0
+    avg_px: float = 0.0
+
+
+class SimExchange:
+    """
+    Orders become eligible for bars stamped after their ACK. Per bar, a buy limit L:
+    - trades through (low < L): the queue at L is gone, fill up to participation * volume;
+    - touches (low == L): `touch_volume_frac` of the volume prints at L, first eating
+      `queue_ahead`, and we fill from what is left (also participation-capped);
+    fills price at the bar open when it gapped through L, else at L. Sells mirror this;
+    market orders fill at the open. The participation cap and each level's printed
+    volume are shared by the symbol's orders, oldest first, so a bar never fills more
+    than it traded. Every call returns the ledger rows it produced.
+    """
+
+    def __init__(self, cfg: SimConfig | None = None) -> None:
+        self.cfg = cfg or SimConfig()
+        self.orders: dict[str, SimOrder] = {}
+        self._by_symbol: dict[str, dict[str, SimOrder]] = {}
+        self._next_id = 1
+
+    def submit(self, order: NewOrder, ts: datetime | None = None) -> list[dict[str, Any]]:
+        ts = ts or order.ts
+        tag = order.tag or f"sim_{self._next_id}"
+        ack_ts = ts + timedelta(milliseconds=self.cfg.ack_latency_ms)
+        o = SimOrder(
+            tag=tag,
+            symbol=order.symbol,
+            side=order.side,
+            qty=float(order.qty),
+            limit=order.limit,
+            created_ts=ts,
+            ack_ts=ack_ts,
+            order_id=self._next_id,
+            queue_ahead=self.cfg.queue_ahead,
+        )
+        self._next_id += 1
+        self.orders[tag] = o
+        self._by_symbol.setdefault(o.symbol, {})[tag] = o
+        row = {"ts": ts, "event_ts": ack_ts, "kind": "ACK", "tag": tag, "order_id": o.order_id}
+        return [row]
+
+    def cancel(self, tag: str, ts: datetime) -> list[dict[str, Any]]:
+        o = self._remove(tag)
+        if o is None:
+            return []
+        return [{"ts": o.created_ts, "event_ts": ts, "kind": "CANCEL", "tag": tag}]
+
+    def open_tags(self) -> set[str]:
+        return set(self.orders)
+
+    def on_bar(self, bar: Bar1s) -> list[dict[str, Any]]:
+        return self.match(bar.symbol, bar.ts, bar.open, bar.high, bar.low, float(bar.volume))
+
+    def match(
+        self,
+        symbol: str,
+        ts: datetime,
+        open_: float,
+        high: float,
+        low: float,
+        volume: float,
+    ) -> list[dict[str, Any]]:
+        """Match one bar against the symbol's resting orders (oldest first)."""
+        book = self._by_symbol.get(symbol)
+        if not book:
+            return []
+        rows: list[dict[str, Any]] = []
+        cap = volume * self.cfg.participation  # shared by all of this bar's fills
+        printed: dict[float, float] = {}  # volume left printing at each touched limit
+        for o in list(book.values()):
+            if o.ack_ts >= ts:
+                continue
+            buy = o.side == "BUY"
+            if o.limit is None:
+                px, avail = open_, cap
+            else:
+                through = low < o.limit if buy else high > o.limit
+                touch = low <= o.limit if buy else high >= o.limit
+                if through:
+                    avail = cap
+                elif touch and self.cfg.fill_on_touch:
+                    left = printed.setdefault(o.limit, volume * self.cfg.touch_volume_frac)
+                    eaten = min(o.queue_ahead, left)
+                    o.queue_ahead -= eaten
+                    printed[o.limit] = left = left - eaten
+                    avail = min(cap, left)
+                else:
+                    continue
+                px = min(open_, o.limit) if buy else max(open_, o.limit)
+            q = min(avail, o.qty - o.filled)
+            if float(o.qty).is_integer():
+                q = float(np.floor(q))  # whole-share orders fill in whole shares
+            if q <= 1e-9:
+                continue
+            cap -= q
+            if o.limit is not None and o.limit in printed:
+                printed[o.limit] -= q
+            o.avg_px = (o.avg_px * o.filled + px * q) / (o.filled + q)
+            o.filled += q
+            rows.append(
+                {
+                    "ts": o.created_ts,
+                    "event_ts": ts,
+                    "kind": "FILL",
+                    "tag": o.tag,
+                    "fill_qty": q,
+                    "avg_px": o.avg_px,
+                    "symbol": o.symbol,
+                    "side": o.side,
+                }
+            )
+            if o.filled >= o.qty - 1e-9:
+                self._remove(o.tag)
+        return rows
+
+    def run(self, bars: pd.DataFrame, orders: list[NewOrder]) -> pd.DataFrame:
+        """Backtest mode: replay `bars` (ts, symbol, open, high, low, volume) at full speed
+        with `orders` submitted at their own ts; returns the resulting ledger frame,
+        INTENT rows included."""
+        bars = bars.sort_values("ts", kind="stable")
+        pending = sorted(orders, key=lambda o: o.ts)
+        ts_col = pd.to_datetime(bars["ts"], utc=True)
+        cols = zip(
+            ts_col,
+            bars["symbol"].astype(str),
+            bars["open"].to_numpy(np.float64),
+            bars["high"].to_numpy(np.float64),
+            bars["low"].to_numpy(np.float64),
+            bars["volume"].to_numpy(np.float64),
+            strict=True,
+        )
+        rows: list[dict[str, Any]] = []
+        k = 0
+        for ts, sym, o, h, lo, v in cols:
+            while k < len(pending) and pending[k].ts < ts:
+                rows.extend(self._intent(pending[k]))
+                k += 1
+            rows.extend(self.match(sym, ts, o, h, lo, v))
+        for order in pending[k:]:
+            rows.extend(self._intent(order))
+        return pd.DataFrame(rows)
+
+    def _intent(self, order: NewOrder) -> list[dict[str, Any]]:
+        ack = self.submit(order)
+        intent = {
+            "ts": order.ts,
+            "kind": "INTENT",
+            "tag": ack[0]["tag"],
+            "symbol": order.symbol,
+            "side": order.side,
+            "qty": order.qty,
+            "limit": order.limit,
+        }
+        return [intent, *ack]
+
+    def _remove(self, tag: str) -> SimOrder | None:
+        o = self.orders.pop(tag, None)
+        if o is not None:
+            self._by_symbol.get(o.symbol, {}).pop(tag, None)
+        return o
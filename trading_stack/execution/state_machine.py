@@ -51,3 +51,16 @@ class ExecState:
         if self.state in ("NEW", "ACK", "PARTIAL"):
             self.state = "CANCEL"
             self.cancel_ts = ts
+
+    def apply(
+        self, kind: str, ts: datetime, px: float = 0.0, qty: float = 0.0, reason: str = ""
+    ) -> None:
+        """Dispatch an event by name (ACK/PARTIAL/FILL/CANCEL/REJ), e.g. when replaying a log."""
+        if kind == "ACK":
+            self.on_ack(ts)
+        elif kind in ("PARTIAL", "FILL"):
+            self.on_partial(ts, px, qty)
+        elif kind == "CANCEL":
+            self.on_cancel(ts)
+        elif kind == "REJ":
+            self.on_rej(ts, reason)
@@ -0,0 +1,215 @@
+"""Crash-safe order state: an append-only JSONL event log plus periodic atomic snapshots,
+so live ExecStates are rebuilt on restart by loading the snapshot and replaying its tail."""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Mapping
+from dataclasses import asdict, fields
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, Any
+
+from trading_stack.adapters.ibkr.adapter import BrokerOrder, EventKind, OrderEvent
+from trading_stack.execution.state_machine import ExecState
+from trading_stack.storage.atomic import atomic_write_text
+
+SNAPSHOT = "orders.snap.json"
+_TERMINAL = ("FILL", "CANCEL", "REJ")
+_DT_FIELDS = {"created_ts", "ack_ts", "cancel_ts"}
+
+
+class OrderStateStore:
+    """
+    Every transition is appended to `orders.<gen>.log` before it is applied in memory.
+    Every `snapshot_every` events the live (non-terminal) states are written atomically
+    together with the log byte offset they cover; once the log passes `compact_bytes`
+    the snapshot switches to a fresh generation and the old log is deleted. Recovery
+    therefore replays at most `snapshot_every` lines.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        snapshot_every: int = 256,
+        compact_bytes: int = 8 << 20,
+        fsync: bool = False,
+    ) -> None:
+        self.root = Path(root)
+        self.snapshot_every = snapshot_every
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self.states: dict[str, ExecState] = {}
+        self.gen = 0
+        self._since_snapshot = 0
+        self._log: IO[str] | None = None
+
+    @property
+    def log_path(self) -> Path:
+        return self.root / f"orders.{self.gen}.log"
+
+    # ---- recovery
+
+    def recover(self) -> dict[str, ExecState]:
+        """Load the snapshot, replay the log past its offset and open the log for append."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.states, offset = {}, 0
+        snap = self.root / SNAPSHOT
+        if snap.exists():
+            data = json.loads(snap.read_text(encoding="utf-8"))
+            self.gen, offset = int(data["gen"]), int(data["offset"])
+            self.states = {t: _state_from_json(s) for t, s in data["states"].items()}
+        replayed = 0
+        if self.log_path.exists():
+            with self.log_path.open("rb") as f:
+                f.seek(offset)
+                good = offset
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn write from a crash mid-append
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        break
+                    self._apply(ev)
+                    good += len(line)
+                    replayed += 1
+            if good < self.log_path.stat().st_size:
+                os.truncate(self.log_path, good)
+        self._since_snapshot = replayed
+        self._open()
+        return dict(self.states)
+
+    def reconcile(
+        self,
+        broker_open: set[str],
+        completed: Mapping[str, BrokerOrder],
+        ts: datetime | None = None,
+    ) -> tuple[list[OrderEvent], list[str], list[str]]:
+        """Work out what happened to live states the broker no longer reports as open.
+        Executions past the recorded fill_qty become PARTIAL/FILL events; CANCEL/REJ only
+        when the broker says so. Nothing is recorded here: returns (events, unresolved,
+        orphans) with the events still to be recorded in order, the tags the broker has
+        no final word on (left live), and broker-open tags this store knows nothing about.
+        """
+        ts = ts or datetime.now(UTC)
+        events: list[OrderEvent] = []
+        unresolved: list[str] = []
+        for tag in sorted(t for t in self.states if t not in broker_open):
+            s, b = self.states[tag], completed.get(tag) or BrokerOrder(tag)
+            evs: list[OrderEvent] = []
+            filled, seen = s.fill_qty, 0.0
+            for fts, q, px in b.fills:
+                new = min(q, seen + q - s.fill_qty)  # skip executions already recorded
+                seen += q
+                if new <= 1e-9:
+                    continue
+                filled += new
+                kind: EventKind = "FILL" if filled >= s.qty - 1e-9 else "PARTIAL"
+                evs.append(OrderEvent(tag, kind, fts, qty=new, px=px))
+            done = bool(evs) and evs[-1].kind == "FILL"
+            if evs and s.state == "NEW":  # crashed before the ACK was recorded
+                evs.insert(0, OrderEvent(tag, "ACK", evs[0].ts))
+            if not done and b.status == "cancelled":
+                evs.append(OrderEvent(tag, "CANCEL", b.ts or ts, reason=b.reason))
+            elif not done and b.status == "rejected":
+                evs.append(OrderEvent(tag, "REJ", b.ts or ts, reason=b.reason))
+            elif not done:
+                unresolved.append(tag)  # e.g. filled but executions aged out: ask a human
+            events.extend(evs)
+        return events, unresolved, sorted(broker_open - set(self.states))
+
+    # ---- events
+
+    def record(self, tag: str, kind: str, ts: datetime, **fields_: Any) -> ExecState | None:
+        """Persist one transition (NEW/ACK/PARTIAL/FILL/CANCEL/REJ), then apply it."""
+        if self._log is None:
+            self.recover()
+        assert self._log is not None
+        ev = {"tag": tag, "kind": kind, "ts": ts.isoformat(), **fields_}
+        self._log.write(json.dumps(ev, default=str) + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        state = self._apply(ev)
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        return state
+
+    def snapshot(self) -> None:
+        """Atomically write live states plus the log offset they include."""
+        assert self._log is not None
+        self._log.flush()
+        offset = os.fstat(self._log.fileno()).st_size
+        if offset >= self.compact_bytes:
+            old = self.log_path
+            self._log.close()
+            self.gen += 1
+            self._open()
+            offset = 0
+            self._write_snapshot(offset)
+            old.unlink(missing_ok=True)  # only after the snapshot no longer needs it
+        else:
+            self._write_snapshot(offset)
+        self._since_snapshot = 0
+
+    def close(self) -> None:
+        if self._log is not None:
+            self.snapshot()
+            self._log.close()
+            self._log = None
+
+    # ---- internals
+
+    def _open(self) -> None:
+        self._log = self.log_path.open("a", encoding="utf-8")
+
+    def _write_snapshot(self, offset: int) -> None:
+        body = {
+            "gen": self.gen,
+            "offset": offset,
+            "ts": datetime.now(UTC).isoformat(),
+            "states": {t: _state_to_json(s) for t, s in self.states.items()},
+        }
+        atomic_write_text(self.root / SNAPSHOT, json.dumps(body))
+
+    def _apply(self, ev: dict[str, Any]) -> ExecState | None:
+        tag, kind = ev["tag"], ev["kind"]
+        ts = datetime.fromisoformat(ev["ts"])
+        if kind == "NEW":
+            qty = float(ev["qty"])
+            self.states[tag] = ExecState(
+                tag=tag,
+                symbol=ev["symbol"],
+                side=ev["side"],
+                qty=qty,
+                remaining=qty,
+                created_ts=ts,
+            )
+            return self.states[tag]
+        s = self.states.get(tag)
+        if s is None:
+            return None
+        px, qty = float(ev.get("px") or 0.0), float(ev.get("qty") or 0.0)
+        s.apply(kind, ts, px, qty, str(ev.get("reason") or ""))
+        if s.state in _TERMINAL or kind in ("CANCEL", "REJ"):
+            self.states.pop(tag, None)
+        return s
+
+
+def _state_to_json(s: ExecState) -> dict[str, Any]:
+    d = asdict(s)
+    for k in _DT_FIELDS:
+        if d[k] is not None:
+            d[k] = d[k].isoformat()
+    return d
+
+
+def _state_from_json(d: dict[str, Any]) -> ExecState:
+    kw = {f.name: d[f.name] for f in fields(ExecState) if f.name in d}
+    for k in _DT_FIELDS:
+        if kw.get(k) is not None:
+            kw[k] = datetime.fromisoformat(kw[k])
+    return ExecState(**kw)
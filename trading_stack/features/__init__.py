@@ -0,0 +1 @@
+"""Incremental bar features shared by the advisor, strategies and the controller."""
@@ -0,0 +1,191 @@
+"""Rolling bar features over trailing time windows, updated one bar at a time."""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections import deque
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from trading_stack.core.schemas import Bar1s
+from trading_stack.storage.tail import ParquetTail
+
+FEATURES = (
+    "realized_vol_bps",  # RMS of bar-to-bar close returns
+    "spread_proxy_bps",  # median of (high - low) / close per bar
+    "trend_bps",  # last close vs first close in the window
+    "range_bps",  # window high - window low, over the last close
+    "vwap_dev_bps",  # last close vs the window's close-volume VWAP
+    "bars",
+)
+_BAR_COLS = ["ts", "high", "low", "close", "volume"]
+_RING = ("_ts", "_close", "_high", "_low", "_range", "_cum_r2", "_cum_v", "_cum_pv")
+
+
+def _ns(ts: datetime | pd.Timestamp | int) -> int:
+    return ts if isinstance(ts, int) else int(pd.Timestamp(ts).value)
+
+
+class _Window:
+    __slots__ = ("span_ns", "head", "ranges", "hi", "lo")
+
+    def __init__(self, span_sec: int) -> None:
+        self.span_ns = span_sec * 1_000_000_000
+        self.head = 0  # sequence number of the oldest bar in the window
+        self.ranges: list[float] = []  # sorted per-bar ranges (bps)
+        self.hi: deque[int] = deque()  # monotonic: sequence numbers of decreasing highs
+        self.lo: deque[int] = deque()  # monotonic: sequence numbers of increasing lows
+
+
+class FeatureEngine:
+    """
+    A bar enters a ring (doubled when the longest window would not fit) together with
+    running prefix sums of squared returns, volume and price * volume. Each window only
+    keeps the sequence number of its oldest bar, monotonic deques for its high/low and
+    a sorted list of bar ranges for the median, so `on_bar` is amortized O(1) per window
+    (plus a bisect into the short sorted list) and `features` is O(1).
+
+    A window holds the bars with ts > newest ts - span, as the advisor always did.
+    Bars older than the newest one are dropped (counted in `dropped`).
+    """
+
+    def __init__(self, windows_sec: Sequence[int] = (120,), capacity: int = 256) -> None:
+        self.windows = {int(w): _Window(int(w)) for w in windows_sec}
+        self.n = 0
+        self.dropped = 0
+        self._cap = 1 << max(int(capacity) - 1, 1).bit_length()
+        self._alloc(self._cap)
+        self._r2 = self._v = self._pv = 0.0  # running totals of the prefix sums
+
+    def _alloc(self, cap: int) -> None:
+        self._ts = [0] * cap
+        self._close = [0.0] * cap
+        self._high = [0.0] * cap
+        self._low = [0.0] * cap
+        self._range = [0.0] * cap
+        self._cum_r2 = [0.0] * cap  # including this bar's return
+        self._cum_v = [0.0] * cap  # excluding this bar
+        self._cum_pv = [0.0] * cap  # excluding this bar
+
+    def _grow(self) -> None:
+        old, mask = [getattr(self, a) for a in _RING], self._cap - 1
+        self._cap *= 2
+        self._alloc(self._cap)
+        start, new_mask = min(w.head for w in self.windows.values()), self._cap - 1
+        for a, src in zip(_RING, old, strict=True):
+            dst = getattr(self, a)
+            for i in range(start, self.n):
+                dst[i & new_mask] = src[i & mask]
+
+    def on_bar(
+        self,
+        ts: datetime | pd.Timestamp | int,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = 0.0,
+    ) -> None:
+        t = _ns(ts)
+        n = self.n
+        if n and t < self._ts[(n - 1) & (self._cap - 1)]:
+            self.dropped += 1
+            return
+        if self.windows and n - min(w.head for w in self.windows.values()) >= self._cap:
+            self._grow()
+        mask = self._cap - 1
+        i = n & mask
+        prev = self._close[(n - 1) & mask] if n else 0.0
+        r = close / prev - 1.0 if prev else 0.0
+        self._cum_v[i], self._cum_pv[i] = self._v, self._pv
+        self._r2 += r * r
+        self._v += volume
+        self._pv += close * volume
+        self._ts[i], self._close[i], self._high[i], self._low[i] = t, close, high, low
+        self._cum_r2[i] = self._r2
+        rng = max(0.0, high - low) / (close or 1.0) * 1e4
+        self._range[i] = rng
+        self.n = n + 1
+        for w in self.windows.values():
+            bisect.insort(w.ranges, rng)
+            while w.hi and self._high[w.hi[-1] & mask] <= high:
+                w.hi.pop()
+            w.hi.append(n)
+            while w.lo and self._low[w.lo[-1] & mask] >= low:
+                w.lo.pop()
+            w.lo.append(n)
+            cut = t - w.span_ns
+            while self._ts[w.head & mask] <= cut:
+                j = w.head & mask
+                del w.ranges[bisect.bisect_left(w.ranges, self._range[j])]
+                if w.hi[0] == w.head:
+                    w.hi.popleft()
+                if w.lo[0] == w.head:
+                    w.lo.popleft()
+                w.head += 1
+
+    def add(self, bar: Bar1s) -> None:
+        self.on_bar(bar.ts, bar.high, bar.low, bar.close, float(bar.volume))
+
+    def update(self, bars: pd.DataFrame) -> None:
+        """Feed a frame of bars (ts, high, low, close[, volume]) in time order."""
+        if bars.empty:
+            return
+        df = bars.assign(ts=pd.to_datetime(bars["ts"], utc=True)).sort_values("ts", kind="stable")
+        vol = df["volume"] if "volume" in df.columns else pd.Series(0.0, index=df.index)
+        cols = zip(
+            df["ts"].dt.as_unit("ns").array.asi8.tolist(),
+            df["high"].astype(float).tolist(),
+            df["low"].astype(float).tolist(),
+            df["close"].astype(float).tolist(),
+            vol.fillna(0).astype(float).tolist(),
+            strict=True,
+        )
+        for t, h, lo, c, v in cols:
+            self.on_bar(t, h, lo, c, v)
+
+    def features(self, window_sec: int = 120) -> dict[str, float]:
+        w = self.windows[int(window_sec)]
+        if self.n == 0:
+            return dict.fromkeys(FEATURES, 0.0)
+        mask = self._cap - 1
+        h, last = w.head & mask, (self.n - 1) & mask
+        k = self.n - w.head
+        r2 = self._r2 - self._cum_r2[h]
+        close, first = self._close[last], self._close[h]
+        m = len(w.ranges)
+        med = w.ranges[m // 2] if m % 2 else (w.ranges[m // 2 - 1] + w.ranges[m // 2]) / 2.0
+        v, pv = self._v - self._cum_v[h], self._pv - self._cum_pv[h]
+        hi, lo = self._high[w.hi[0] & mask], self._low[w.lo[0] & mask]
+        return {
+            "realized_vol_bps": math.sqrt(max(r2, 0.0) / (k - 1)) * 1e4 if k > 1 else 0.0,
+            "spread_proxy_bps": med,
+            "trend_bps": (close / first - 1.0) * 1e4 if k > 1 and first else 0.0,
+            "range_bps": (hi - lo) / close * 1e4 if close else 0.0,
+            "vwap_dev_bps": (close / (pv / v) - 1.0) * 1e4 if v > 0 and pv > 0 else 0.0,
+            "bars": float(k),
+        }
+
+
+class FeatureTail:
+    """A FeatureEngine fed from an append-only bars parquet file; each `features` call
+    folds in only the rows appended since the last one. A replaced file restarts it."""
+
+    def __init__(self, path: str | Path, windows_sec: Sequence[int] = (120,)) -> None:
+        self.windows_sec = tuple(windows_sec)
+        self.engine = FeatureEngine(self.windows_sec)
+        self._tail = ParquetTail(path, columns=_BAR_COLS)
+
+    def poll(self) -> None:
+        new = self._tail.poll()
+        if self._tail.reset:
+            self.engine = FeatureEngine(self.windows_sec)
+        if not new.empty:
+            self.engine.update(new)
+
+    def features(self, window_sec: int = 120) -> dict[str, float]:
+        self.poll()
+        return self.engine.features(window_sec)
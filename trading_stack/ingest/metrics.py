@@ -5,6 +5,7 @@ from datetime import UTC, time
 from zoneinfo import ZoneInfo
 
 import numpy as np
+import pandas as pd
 
 from trading_stack.core.schemas import MarketTrade
 
@@ -80,3 +81,49 @@ def clock_offset_median_ms(trades: Iterable[MarketTrade]) -> float:
     if not vals:
         return float("nan")
     return float(np.median(vals))
+
+
+# DataFrame variants of the metrics above for trades read straight from parquet
+# (columns ts, ingest_ts), without materializing MarketTrade models.
+
+
+def _ingest_lag_ms(df: pd.DataFrame) -> pd.Series:
+    if "ingest_ts" not in df.columns:
+        return pd.Series(dtype=float)
+    d = df.dropna(subset=["ingest_ts"])
+    ing = pd.to_datetime(d["ingest_ts"], utc=True)
+    return (ing - pd.to_datetime(d["ts"], utc=True)).dt.total_seconds() * 1_000.0
+
+
+def _rth_ts(df: pd.DataFrame, tz_name: str) -> pd.Series:
+    ts = pd.to_datetime(df["ts"], utc=True)
+    et = ts.dt.tz_convert(tz_name)
+    sod = et.dt.hour * 3600 + et.dt.minute * 60 + et.dt.second + et.dt.microsecond / 1e6
+    keep = (et.dt.weekday < 5) & (sod >= 9.5 * 3600) & (sod < 16 * 3600)
+    return ts[keep]
+
+
+def freshness_p99_ms_df(df: pd.DataFrame) -> float:
+    ms = _ingest_lag_ms(df)
+    ms = ms[ms >= 0]
+    return float(np.percentile(ms.to_numpy(), 99)) if len(ms) else float("inf")
+
+
+def clock_offset_median_ms_df(df: pd.DataFrame) -> float:
+    ms = _ingest_lag_ms(df)
+    return float(np.median(ms.to_numpy())) if len(ms) else float("nan")
+
+
+def rth_gap_events_df(
+    df: pd.DataFrame, max_gap_sec: int = 2, tz_name: str = "America/New_York"
+) -> int:
+    ts = _rth_ts(df, tz_name).sort_values()
+    return int((ts.diff().dt.total_seconds() > max_gap_sec).sum())
+
+
+def trade_second_coverage_df(df: pd.DataFrame, tz_name: str = "America/New_York") -> float:
+    secs = _rth_ts(df, tz_name).dt.floor("s")
+    if secs.empty:
+        return 0.0
+    window = int((secs.max() - secs.min()).total_seconds()) + 1
+    return float(secs.nunique() / max(window, 1))
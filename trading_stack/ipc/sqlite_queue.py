@@ -47,7 +47,7 @@ def reserve(
     cutoff = (datetime.now(UTC) - timedelta(seconds=visibility_timeout_sec)).isoformat()
     cur = con.execute(
         """
-        SELECT id, payload, tag, status, attempts
+        SELECT id, payload, tag, status, attempts, enqueued_ts
         FROM queue
         WHERE topic = ?
           AND (
@@ -62,7 +62,7 @@ def reserve(
     row = cur.fetchone()
     if not row:
         return None
-    id_, payload, tag, status, attempts = row
+    id_, payload, tag, status, attempts, enqueued_ts = row
     if attempts >= max_attempts:
         con.execute("UPDATE queue SET status='dead' WHERE id=?", (id_,))
         con.commit()
@@ -73,7 +73,7 @@ def reserve(
         (now, id_),
     )
     con.commit()
-    return {"id": id_, "payload": json.loads(payload), "tag": tag}
+    return {"id": id_, "payload": json.loads(payload), "tag": tag, "enqueued_ts": enqueued_ts}
 
 
 def ack(con: sqlite3.Connection, id_: int) -> None:
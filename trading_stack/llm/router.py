@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 
 
@@ -13,12 +17,24 @@ class ProviderResponse:
 class Provider:
     name: str = "base"
 
+    # Worst-case cost of one call, reserved against the router's budget up front
+    max_cost_usd: float = 0.0
+
+    # Answers may be reused for nearby features (AsyncRouter's regime cache). Free,
+    # deterministic providers turn this off: reuse would save nothing and change output.
+    cacheable: bool = True
+
     def propose(self, features: dict[str, float]) -> ProviderResponse:  # pragma: no cover
         raise NotImplementedError
 
+    async def apropose(self, features: dict[str, float]) -> ProviderResponse:
+        """Networked providers override this; local ones answer inline."""
+        return self.propose(features)
+
 
 class RulesProvider(Provider):
     name = "rules"
+    cacheable = False
 
     def propose(self, features: dict[str, float]) -> ProviderResponse:
         # Heuristics: raise threshold + cut risk when vol expands or spread widens
@@ -42,4 +58,206 @@ def get_provider(kind: str) -> Provider:
     # Later: "openai", "anthropic", "gemini" etc.
     if kind.lower() in ("rules", "default", "local"):
         return RulesProvider()
+    if kind.lower() == "stub":
+        return LocalStubProvider()
     raise ValueError(f"unknown provider: {kind}")
+
+
+class LocalStubProvider(Provider):
+    """Stand-in for a networked provider: the rules answer after `latency_sec`, at
+    `cost_usd` per call, optionally failing. For tests and dry runs of the router."""
+
+    name = "stub"
+
+    def __init__(self, latency_sec: float = 0.05, cost_usd: float = 0.001, fail: bool = False):
+        self.latency_sec = latency_sec
+        self.cost_usd = self.max_cost_usd = cost_usd
+        self.fail = fail
+        self.calls = 0
+
+    def _answer(self, features: dict[str, float]) -> ProviderResponse:
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("stub provider failure")
+        r = RulesProvider().propose(features)
+        return ProviderResponse(params=r.params, notes=f"stub {r.notes}", cost_usd=self.cost_usd)
+
+    def propose(self, features: dict[str, float]) -> ProviderResponse:
+        time.sleep(self.latency_sec)
+        return self._answer(features)
+
+    async def apropose(self, features: dict[str, float]) -> ProviderResponse:
+        await asyncio.sleep(self.latency_sec)
+        return self._answer(features)
+
+
+# Features that define a regime for caching (others, e.g. bar counts, are ignored)
+REGIME_FEATURES = ("realized_vol_bps", "spread_proxy_bps", "trend_bps")
+
+
+class ResponseCache:
+    """
+    LRU of provider responses keyed by (provider, `fields` quantized to `step`), so a
+    regime the advisor already asked about costs nothing until the entry is `ttl_sec`
+    old. `fields=None` keys on every feature; `clock` is injectable for tests.
+    """
+
+    def __init__(
+        self,
+        step: float = 0.5,
+        ttl_sec: float = 300.0,
+        max_entries: int = 1024,
+        fields: Sequence[str] | None = REGIME_FEATURES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.step, self.ttl_sec, self.max_entries, self.clock = step, ttl_sec, max_entries, clock
+        self.fields = fields
+        self._d: OrderedDict[tuple[object, ...], tuple[float, ProviderResponse]] = OrderedDict()
+        self.hits = self.misses = 0
+
+    def key(self, provider: str, features: dict[str, float]) -> tuple[object, ...]:
+        names = sorted(features) if self.fields is None else self.fields
+        q = tuple((k, round(features[k] / self.step)) for k in names if k in features)
+        return (provider, *q)
+
+    def get(self, key: tuple[object, ...]) -> ProviderResponse | None:
+        hit = self._d.get(key)
+        if hit is None or self.clock() - hit[0] > self.ttl_sec:
+            if hit is not None:
+                del self._d[key]
+            self.misses += 1
+            return None
+        self._d.move_to_end(key)
+        self.hits += 1
+        return hit[1]
+
+    def put(self, key: tuple[object, ...], resp: ProviderResponse) -> None:
+        self._d[key] = (self.clock(), resp)
+        self._d.move_to_end(key)
+        while len(self._d) > self.max_entries:
+            self._d.popitem(last=False)
+
+
+class Budget:
+    """Spend against `limit_usd`. A call first reserves its provider's worst case and
+    settles the actual cost afterwards, both under one lock, so concurrent calls can
+    never overshoot the limit together."""
+
+    def __init__(self, limit_usd: float) -> None:
+        self.limit_usd = limit_usd
+        self.spent_usd = 0.0
+        self._reserved = 0.0
+        self._lock = asyncio.Lock()
+
+    def can_cover(self, usd: float) -> bool:
+        """Whether `usd` fits right now; `reserve` is what actually holds it."""
+        return self.spent_usd + self._reserved + usd <= self.limit_usd
+
+    async def reserve(self, usd: float) -> bool:
+        async with self._lock:
+            if self.spent_usd + self._reserved + usd > self.limit_usd:
+                return False
+            self._reserved += usd
+            return True
+
+    async def settle(self, reserved_usd: float, actual_usd: float) -> None:
+        async with self._lock:
+            self._reserved -= reserved_usd
+            self.spent_usd += actual_usd
+
+
+@dataclass
+class Routed:
+    response: ProviderResponse
+    provider: str  # provider whose answer was used
+    cost_usd: float  # spent on this request across every provider queried
+    cached: bool = False
+    fallback: bool = False
+
+
+class AsyncRouter:
+    """
+    Uses the answer of the first provider in list order that has one (not the fastest,
+    so results do not depend on timing). The cache is checked in that order: providers
+    before the first cached one are queried concurrently, each under `deadline_sec`,
+    and the cached answer is used only if none of them succeeds. Only `cacheable`
+    providers are cached. Providers the budget cannot cover are skipped; when nothing
+    answers, `fallback` (rules) does.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Provider],
+        budget_usd: float = 10.0,
+        deadline_sec: float = 2.0,
+        fallback: Provider | None = None,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        self.providers = list(providers)
+        self.budget = Budget(budget_usd)
+        self.deadline_sec = deadline_sec
+        self.fallback = fallback or RulesProvider()
+        self.cache = cache if cache is not None else ResponseCache()
+        self.timeouts = self.errors = 0
+
+    async def _call(self, p: Provider, features: dict[str, float]) -> ProviderResponse | None:
+        if not await self.budget.reserve(p.max_cost_usd):
+            return None
+        resp = None
+        try:
+            resp = await asyncio.wait_for(p.apropose(features), self.deadline_sec)
+        except TimeoutError:
+            self.timeouts += 1
+        except Exception:  # a failing provider falls through to the next one
+            self.errors += 1
+        # a timed-out call may still bill: count the reservation as spent
+        await self.budget.settle(p.max_cost_usd, resp.cost_usd if resp else p.max_cost_usd)
+        return resp
+
+    async def propose(self, features: dict[str, float]) -> Routed:
+        calls: list[Provider] = []
+        hit: tuple[Provider, ProviderResponse] | None = None
+        for p in self.providers:
+            cached = self.cache.get(self.cache.key(p.name, features)) if p.cacheable else None
+            if cached is not None:
+                hit = (p, cached)
+                break
+            if self.budget.can_cover(p.max_cost_usd):
+                calls.append(p)
+        results = await asyncio.gather(*(self._call(p, features) for p in calls))
+        cost = sum(r.cost_usd for r in results if r is not None)
+        for p, r in zip(calls, results, strict=True):
+            if r is not None:
+                if p.cacheable:
+                    self.cache.put(self.cache.key(p.name, features), r)
+                return Routed(r, p.name, cost)
+        if hit is not None:
+            return Routed(hit[1], hit[0].name, cost, cached=True)
+        resp = await self.fallback.apropose(features)
+        return Routed(resp, self.fallback.name, cost + resp.cost_usd, fallback=True)
+
+    async def propose_many(self, features: dict[str, dict[str, float]]) -> dict[str, Routed]:
+        """One routed proposal per key (e.g. symbol), all in flight together. Keys in the
+        same cached regime share one call when its answer came from a cacheable
+        provider; otherwise each of them gets its own."""
+        firsts: dict[tuple[object, ...], str] = {}
+        for k, feats in features.items():
+            firsts.setdefault(self.cache.key("", feats), k)
+        keys = list(firsts.values())
+        results = await asyncio.gather(*(self.propose(features[k]) for k in keys))
+        done = dict(zip(keys, results, strict=True))
+        rest = [
+            k
+            for k, feats in features.items()
+            if k not in done and not self._shareable(done[firsts[self.cache.key("", feats)]])
+        ]
+        results = await asyncio.gather(*(self.propose(features[k]) for k in rest))
+        done.update(zip(rest, results, strict=True))
+        out: dict[str, Routed] = {}
+        for k, feats in features.items():
+            r = done.get(k) or done[firsts[self.cache.key("", feats)]]
+            out[k] = r if k in done else Routed(r.response, r.provider, 0.0, cached=True)
+        return out
+
+    def _shareable(self, r: Routed) -> bool:
+        return not r.fallback and any(p.cacheable for p in self.providers if p.name == r.provider)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import os
+import time
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
@@ -8,6 +10,8 @@ from typing import Any
 
 import pandas as pd
 
+from trading_stack.storage.atomic import atomic_write_text
+
 
 @dataclass
 class RuntimeParams:
@@ -28,7 +32,77 @@ class RuntimeParams:
     def save(self, path: Path) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
         self.updated_at = datetime.now(UTC).isoformat()
-        path.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        atomic_write_text(path, json.dumps(asdict(self), indent=2))
+
+
+@dataclass(frozen=True)
+class ParamsSnapshot:
+    """Immutable view of runtime params; version bumps on every observed file change."""
+
+    version: int
+    symbol: str
+    signal_threshold_bps: float
+    risk_multiplier: float
+    updated_at: str = ""
+
+
+class RuntimeParamsCache:
+    """
+    Per-reader cache of runtime_{symbol}.json.
+    The file is stat'ed at most once per `check_interval_sec` and re-parsed only when its
+    (mtime, size, inode) changes, so per-bar reads are an attribute lookup. Writers go
+    through RuntimeParams.save (temp file + rename), so a reload never sees a torn file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        symbol: str,
+        default_bps: float = 0.5,
+        default_risk_multiplier: float = 1.0,
+        check_interval_sec: float = 0.25,
+    ) -> None:
+        self.path = Path(path)
+        self.check_interval_sec = check_interval_sec
+        self._key: tuple[int, int, int] | None = None
+        self._next_check = 0.0
+        self._snap = ParamsSnapshot(
+            version=0,
+            symbol=symbol,
+            signal_threshold_bps=default_bps,
+            risk_multiplier=default_risk_multiplier,
+        )
+
+    def get(self) -> ParamsSnapshot:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval_sec
+            self.refresh()
+        return self._snap
+
+    def refresh(self) -> bool:
+        """Reload if the file changed; return True when a new snapshot was published."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if key == self._key:
+            return False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False  # keep the last good snapshot; retry on the next check
+        cur = self._snap
+        self._snap = ParamsSnapshot(
+            version=cur.version + 1,
+            symbol=str(data.get("symbol", cur.symbol)),
+            signal_threshold_bps=float(data.get("signal_threshold_bps", cur.signal_threshold_bps)),
+            risk_multiplier=float(data.get("risk_multiplier", cur.risk_multiplier)),
+            updated_at=str(data.get("updated_at", "")),
+        )
+        self._key = key
+        return True
 
 
 def append_applied(out_parquet: Path, row: dict[str, Any]) -> None:
@@ -0,0 +1,194 @@
+"""In-memory risk book: open orders, positions, exposure and daily P&L kept current from
+ledger events so pretrade checks never touch the ledger."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+
+@dataclass
+class _OpenOrder:
+    symbol: str
+    side: str
+    qty: float
+    counted: bool = False  # included in open_order_count
+    filled: float = 0.0
+    avg_px: float = 0.0  # cumulative average fill price as reported on FILL rows
+
+
+@dataclass
+class _Position:
+    qty: float = 0.0  # signed: >0 long, <0 short
+    avg_cost: float = 0.0
+    mark: float = 0.0
+    unrealized: float = 0.0
+    exposure: float = 0.0
+
+
+class RiskBook:
+    """
+    Seed once from the day's ledger with `seed_from_ledger`, then feed every ledger row
+    the process writes through `apply` (INTENT/ACK/FILL/CANCEL/REJ) and last prices
+    through `mark`. All aggregates are maintained incrementally, so the values read by
+    pretrade_check are plain attributes. Daily P&L follows the UTC day of the rows and
+    orders it sees: the first one of a new day calls `roll`.
+    """
+
+    def __init__(self) -> None:
+        self.orders: dict[str, _OpenOrder] = {}
+        self.positions: dict[str, _Position] = {}
+        self.open_order_count = 0  # submitted/ACKed, not yet filled/cancelled/rejected
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+        self.gross_exposure = 0.0
+        self.day: date | None = None
+
+    @property
+    def daily_pnl(self) -> float:
+        return self.realized_pnl + self.unrealized_pnl
+
+    def roll(self, ts: Any) -> None:
+        """Move to the UTC day of `ts`; on a later day realized P&L restarts at zero and
+        positions are carried at their last mark, so yesterday's result no longer counts
+        against the daily loss stop. Open orders carry over; earlier days are ignored."""
+        day = _utc_day(ts)
+        if day is None or (self.day is not None and day <= self.day):
+            return
+        if self.day is not None:
+            self.realized_pnl = 0.0
+            for pos in self.positions.values():
+                if pos.qty and pos.mark:
+                    pos.avg_cost = pos.mark
+                self._revalue(pos)
+        self.day = day
+
+    # ---- event handlers
+
+    def on_intent(self, tag: str, symbol: str, side: str, qty: float) -> None:
+        if tag not in self.orders:
+            self.orders[tag] = _OpenOrder(symbol=symbol, side=side.upper(), qty=float(qty))
+
+    def on_submit(self, tag: str) -> None:
+        """Count an order as open as soon as it is sent, before the broker ACKs it, so
+        concurrent placements cannot overshoot max_open_orders."""
+        o = self.orders.get(tag)
+        if o is not None and not o.counted:
+            o.counted = True
+            self.open_order_count += 1
+
+    def on_ack(self, tag: str) -> None:
+        self.on_submit(tag)
+
+    def on_fill(self, tag: str, fill_qty: float, avg_px: float) -> None:
+        """FILL rows carry the incremental qty and the order's cumulative average price."""
+        o = self.orders.get(tag)
+        if o is None or fill_qty <= 0 or avg_px <= 0:
+            return
+        q_new = o.filled + fill_qty
+        px = avg_px if o.filled == 0 else (avg_px * q_new - o.avg_px * o.filled) / fill_qty
+        o.filled, o.avg_px = q_new, avg_px
+        self._trade(o.symbol, fill_qty if o.side == "BUY" else -fill_qty, px)
+        if o.filled >= o.qty - 1e-9:
+            self._close(tag)
+
+    def on_cancel(self, tag: str) -> None:
+        self._close(tag)
+
+    def on_rej(self, tag: str) -> None:
+        self._close(tag)
+
+    def mark(self, symbol: str, px: float) -> None:
+        pos = self.positions.get(symbol)
+        if pos is None:
+            pos = self.positions[symbol] = _Position()
+        pos.mark = px
+        self._revalue(pos)
+
+    def apply(self, row: dict[str, Any]) -> None:
+        """Dispatch one ledger row (as written by execd) to the matching handler."""
+        kind, tag = row.get("kind"), str(row.get("tag"))
+        self.roll(row.get("event_ts") or row.get("ts"))
+        if kind == "INTENT":
+            self.on_intent(tag, str(row["symbol"]), str(row["side"]), float(row["qty"]))
+        elif kind == "ACK":
+            self.on_ack(tag)
+        elif kind == "FILL":
+            self.on_fill(tag, float(row.get("fill_qty") or 0.0), float(row.get("avg_px") or 0.0))
+        elif kind == "CANCEL":
+            self.on_cancel(tag)
+        elif kind == "REJ":
+            self.on_rej(tag)
+
+    def seed_from_ledger(self, ledger_path: str | Path) -> None:
+        p = Path(ledger_path)
+        if not p.exists():
+            return
+        df = pd.read_parquet(p)
+        if df.empty or "kind" not in df.columns:
+            return
+        df = df[df["kind"].isin(["INTENT", "ACK", "FILL", "CANCEL", "REJ"])]
+        order_col = "event_ts" if "event_ts" in df.columns else "ts"
+        if order_col == "event_ts":
+            df = df.assign(_t=df["event_ts"].fillna(df["ts"]))
+            order_col = "_t"
+        df = df.sort_values(order_col, kind="stable")
+        for row in df.to_dict("records"):
+            self.apply({str(k): (None if _isna(v) else v) for k, v in row.items()})
+
+    # ---- internals
+
+    def _close(self, tag: str) -> None:
+        o = self.orders.pop(tag, None)
+        if o is not None and o.counted:
+            self.open_order_count -= 1
+
+    def _trade(self, symbol: str, dq: float, px: float) -> None:
+        pos = self.positions.get(symbol)
+        if pos is None:
+            pos = self.positions[symbol] = _Position(mark=px)
+        if pos.qty == 0 or (pos.qty > 0) == (dq > 0):
+            new_qty = pos.qty + dq
+            pos.avg_cost = (pos.avg_cost * abs(pos.qty) + px * abs(dq)) / abs(new_qty)
+            pos.qty = new_qty
+        else:
+            matched = min(abs(dq), abs(pos.qty))
+            sign = 1.0 if pos.qty > 0 else -1.0
+            self.realized_pnl += (px - pos.avg_cost) * matched * sign
+            rest = abs(dq) - matched
+            if rest > 0:  # flipped through flat: remainder opens at the fill price
+                pos.qty = math.copysign(rest, dq)
+                pos.avg_cost = px
+            else:
+                pos.qty += dq
+                if abs(pos.qty) < 1e-12:
+                    pos.qty, pos.avg_cost = 0.0, 0.0
+        if pos.mark == 0.0:
+            pos.mark = px
+        self._revalue(pos)
+
+    def _revalue(self, pos: _Position) -> None:
+        unreal = (pos.mark - pos.avg_cost) * pos.qty if pos.qty else 0.0
+        expo = abs(pos.qty) * pos.mark
+        self.unrealized_pnl += unreal - pos.unrealized
+        self.gross_exposure += expo - pos.exposure
+        pos.unrealized, pos.exposure = unreal, expo
+
+
+def _utc_day(ts: Any) -> date | None:
+    if ts is None or _isna(ts):
+        return None
+    t = pd.Timestamp(ts)
+    return (t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")).date()
+
+
+def _isna(v: Any) -> bool:
+    try:
+        return bool(pd.isna(v))
+    except (TypeError, ValueError):
+        return False
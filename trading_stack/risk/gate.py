@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from pathlib import Path
+from typing import TYPE_CHECKING
 
 from trading_stack.core.schemas import NewOrder
+from trading_stack.risk.killswitch import get_killswitch
+
+if TYPE_CHECKING:
+    from trading_stack.risk.book import RiskBook
 
 
 @dataclass
@@ -13,6 +17,7 @@ class RiskConfig:
     symbol_whitelist: set[str] = field(default_factory=lambda: {"SPY"})
     max_open_orders: int = 3
     daily_loss_stop_pct: float = 1.0  # 1% of equity
+    equity_usd: float = 30000.0
     killswitch_path: str = "RUN/HALT"
 
 
@@ -24,12 +29,15 @@ def price_band_ok(last: float, limit: float | None, band_bps: int) -> bool:
 
 
 def is_killswitched(cfg: RiskConfig) -> bool:
-    """Check if killswitch file exists."""
-    return Path(cfg.killswitch_path).exists()
+    """Cached HALT state for cfg.killswitch_path (watcher thread in live services, else
+    re-stated on demand at most every poll interval)."""
+    return get_killswitch(cfg.killswitch_path).halted
 
 
-def pretrade_check(order: NewOrder, px_last: float, cfg: RiskConfig) -> tuple[bool, str]:
-    """Run comprehensive pretrade risk checks."""
+def pretrade_check(
+    order: NewOrder, px_last: float, cfg: RiskConfig, book: RiskBook | None = None
+) -> tuple[bool, str]:
+    """Run comprehensive pretrade risk checks; stateful limits need a RiskBook."""
     # Check killswitch first
     if is_killswitched(cfg):
         return False, "killswitch active"
@@ -47,7 +55,16 @@ def pretrade_check(order: NewOrder, px_last: float, cfg: RiskConfig) -> tuple[bo
     if not price_band_ok(px_last, order.limit, cfg.price_band_bps):
         return False, "limit outside price band"
 
-    # TODO: max_open_orders and daily_loss_stop require ledger state
-    # These will be implemented when we have access to current positions
+    if book is not None:
+        book.roll(order.ts)  # a new day's first order starts a new daily P&L
+
+        # Open orders (ACKed, not yet done) - kept current by the RiskBook
+        if book.open_order_count >= cfg.max_open_orders:
+            return False, f"max open orders {book.open_order_count} >= {cfg.max_open_orders}"
+
+        # Daily loss stop on realized + unrealized P&L
+        loss_limit = cfg.equity_usd * cfg.daily_loss_stop_pct / 100.0
+        if book.daily_pnl <= -loss_limit:
+            return False, f"daily loss {book.daily_pnl:.2f} <= -{loss_limit:.2f}"
 
     return True, "OK"
@@ -0,0 +1,137 @@
+"""Cached killswitch state: HALT is re-stated at most every `poll_sec`, by a background
+watcher in live services or on demand elsewhere, so checks are attribute reads."""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+from types import FrameType
+
+
+class KillSwitch:
+    """
+    Tracks the HALT file at `path` plus an in-process override.
+    With `start=True` a daemon thread re-stats the file every `poll_sec`; without it,
+    reading `halted` re-stats once the cached state is older than `poll_sec` (backtests
+    and sweeps get no thread). `halt()` and the optional signal handler flip `halted`
+    immediately without touching the disk.
+    """
+
+    def __init__(self, path: str | Path, poll_sec: float = 0.05, start: bool = True) -> None:
+        self.path = Path(path)
+        self.poll_sec = poll_sec
+        self.reason: str | None = None
+        self._file_halt = False
+        self._forced_halt = False
+        self._propagated = False  # this instance wrote the HALT file
+        self._halted = False
+        self._checked = 0.0
+        # Reentrant: the signal handlers run halt()/clear() on the main thread, possibly
+        # while that thread is inside refresh()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.refresh()
+        if start:
+            self.start()
+
+    @property
+    def watching(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def halted(self) -> bool:
+        if not self.watching and time.monotonic() - self._checked >= self.poll_sec:
+            return self.refresh()
+        return self._halted
+
+    def start(self) -> None:
+        if not self.watching:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"killswitch:{self.path}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def refresh(self) -> bool:
+        """Re-stat the HALT file and recompute `halted`."""
+        exists = self.path.exists()
+        with self._lock:
+            self._file_halt = exists
+            if exists and self.reason is None:
+                self.reason = f"halt file {self.path}"
+            self._halted = self._file_halt or self._forced_halt
+            self._checked = time.monotonic()
+            return self._halted
+
+    def halt(self, reason: str = "in-process halt", propagate: bool = False) -> None:
+        """Halt this process now; with propagate=True also create the HALT file so every
+        other process watching it follows within one poll interval."""
+        with self._lock:
+            self._forced_halt = True
+            self.reason = reason
+            self._halted = True
+            if propagate:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.write_text(reason, encoding="utf-8")
+                self._file_halt = self._propagated = True
+
+    def clear(self) -> None:
+        """Drop the in-process override and remove the HALT file if this instance created
+        it with propagate=True; a HALT file created elsewhere still applies."""
+        with self._lock:
+            if self._propagated:
+                self.path.unlink(missing_ok=True)
+                self._propagated = False
+            self._forced_halt = False
+            self.reason = None
+            self.refresh()
+
+    def install_signal_handlers(self) -> bool:
+        """SIGUSR1 halts and SIGUSR2 clears the override (POSIX only)."""
+        if not hasattr(signal, "SIGUSR1"):
+            return False
+
+        def _halt(signum: int, frame: FrameType | None) -> None:  # noqa: ARG001
+            self.halt(f"signal {signum}")
+
+        def _clear(signum: int, frame: FrameType | None) -> None:  # noqa: ARG001
+            self.clear()
+
+        signal.signal(signal.SIGUSR1, _halt)
+        signal.signal(signal.SIGUSR2, _clear)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_sec):
+            self.refresh()
+
+
+_WATCHERS: dict[str, KillSwitch] = {}
+_LOCK = threading.Lock()
+
+
+def get_killswitch(path: str | Path, watch: bool = False) -> KillSwitch:
+    """Process-wide KillSwitch for `path`. Live services pass watch=True to start the
+    background watcher; other callers refresh on demand."""
+    key = str(path)
+    ks = _WATCHERS.get(key)
+    if ks is None:
+        with _LOCK:
+            ks = _WATCHERS.get(key)
+            if ks is None:
+                ks = _WATCHERS[key] = KillSwitch(key, start=False)
+    if watch:
+        ks.start()
+    return ks
+
+
+# Watcher threads do not survive fork; children start their own on first use.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_WATCHERS.clear)
@@ -0,0 +1,371 @@
+"""Scorecard check groups. Each group reads only the preloaded ScorecardContext and
+returns its rows, so groups are independent and can run concurrently."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from trading_stack.accounting.realized import drawdown_pct_last_window, realized_pnl_from_ledger
+from trading_stack.core.schemas import Bar1s
+from trading_stack.ingest.metrics import (
+    clock_offset_median_ms_df,
+    freshness_p99_ms_df,
+    rth_gap_events_df,
+    trade_second_coverage_df,
+)
+from trading_stack.scorecard.context import ScorecardContext
+from trading_stack.storage.parquet_store import read_events, write_events
+
+Row = tuple[str, str, bool]  # (check, value, passed)
+CheckGroup = Callable[[ScorecardContext], list[Row]]
+
+SAMPLE_DATA = (
+    Path("sample_data/events_spy_2024-09-10.parquet"),
+    Path("sample_data/events_spy_2024-09-10.csv"),
+)
+RISK_REASONS = ["killswitch", "whitelist", "notional", "price band", "max open", "daily loss"]
+
+
+def ack_threshold_ms() -> float:
+    env = os.environ.get("EXEC_ENV", "paper").lower()
+    default_thresh = 1000.0 if env == "paper" else 400.0
+    return float(os.environ.get("ACK_P95_MS", str(default_thresh if env != "paper" else 1200.0)))
+
+
+# Pass condition of every gate, as shown next to its value (ack latency is env-driven).
+THRESHOLDS: dict[str, str] = {
+    "storage_roundtrip_count": "== 1",
+    "determinism_hash": "12 hex chars",
+    "sample_data_present": "True",
+    "clock_skew_ms": "== 0",
+    "live_day_dir_present": "True",
+    "live_trades_present": "True",
+    "clock_offset_median_ms": "abs < 1000",
+    "freshness_p99_ms": "< 750",
+    "trade_sec_coverage": "> 35%",
+    "rth_gap_events": "== 0",
+    "ledger_integrity": "ledger present",
+    "cancel_success": "== 100%",
+    "shortfall_median_bps": "< 4.0",
+    "markout_5s_median_bps": "informational",
+    "realized_points_30m": ">= 10",
+    "pnl_drawdown_30m_pct": "> -0.5%",
+    "queue_depth": "== 0",
+    "dead_letter_count": "== 0",
+    "intents_enqueued_last_15m": ">= 1",
+    "engine_coverage_last_15m": ">= 95%",
+    "blocked_orders_last_15m": "== 0",
+    "daily_stop_triggered": "False",
+    "uptime_rth": "> 99%",
+    "llm_day_dir_present": "True",
+    "llm_proposals_present": "True",
+    "llm_schema_conformance": "100%",
+    "llm_shadow_events_15m": ">= 6",
+    "llm_cost_per_day_usd": "<= 10.00",
+    "llm_proposals_seen_15m": ">= 6",
+    "llm_proposals_applied_15m": "<= 2",
+    "llm_accept_rate_15m": "<= 30%",
+    "llm_param_bounds_ok": "0.3 <= threshold_bps <= 3.0",
+    "llm_freeze_active": "False",
+}
+
+
+def threshold_for(gate: str) -> str:
+    if gate == "ack_latency_p95_ms":
+        return f"< {ack_threshold_ms():.0f}"
+    return THRESHOLDS.get(gate.split(" ", 1)[0], "")
+
+
+def core_checks(ctx: ScorecardContext) -> list[Row]:
+    rows: list[Row] = []
+    # 1) Storage round-trip on sample Bar1s
+    now = ctx.now.replace(microsecond=0)
+    bars = [Bar1s(ts=now, symbol="SPY", open=500, high=501, low=499, close=500.5, volume=100)]
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d) / "bars.parquet"
+        write_events(tmp, bars)
+        back = read_events(tmp, Bar1s)
+    rows.append(("storage_roundtrip_count", str(len(back)), len(back) == 1))
+
+    # 2) Determinism hash (serialize to json-friendly payload and hash)
+    payload = [b.model_dump(mode="json") for b in back]  # ensures ts -> ISO8601 string
+    s = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    h = hashlib.sha256(s).hexdigest()[:12]
+    rows.append(("determinism_hash", h, len(h) == 12))
+
+    # 3) Sample data presence
+    exists = any(p.exists() for p in SAMPLE_DATA)
+    rows.append(("sample_data_present", str(exists), exists))
+
+    # 4) Clock sanity: in scaffold we assert no skew; real check uses feed vs system
+    rows.append(("clock_skew_ms", "0", True))
+    return rows
+
+
+def feed_checks(ctx: ScorecardContext) -> list[Row]:
+    if ctx.live_day is None:
+        return [("live_day_dir_present", "False", False)]
+    trades = ctx.trades
+    if trades is None:
+        return [("live_trades_present", "False", False)]
+    rows: list[Row] = []
+    with_ing = trades.dropna(subset=["ingest_ts"]) if "ingest_ts" in trades else trades.iloc[:0]
+    sample_n = len(with_ing)
+
+    # Clock offset
+    offs = clock_offset_median_ms_df(with_ing) if sample_n else float("nan")
+    offs_ok = (abs(offs) < 1000.0) if sample_n else False
+    rows.append(("clock_offset_median_ms", f"{offs:.1f}" if sample_n else "NA", offs_ok))
+
+    # Freshness only when offset is sane and we have enough samples
+    if offs_ok and sample_n >= 20:
+        f99 = freshness_p99_ms_df(with_ing)
+        rows.append(("freshness_p99_ms", f"{f99:.1f}", f99 < 750.0))
+    else:
+        rows.append(("freshness_p99_ms", "skipped (clock skew or small sample)", False))
+
+    # IEX vs SIP gating
+    srcs = set(trades["source"].fillna("").astype(str)) if "source" in trades else set()
+    feed = next((s for s in srcs if s.startswith("alpaca:")), "alpaca:unknown")
+    if feed.startswith("alpaca:v2/iex"):
+        cov = trade_second_coverage_df(trades)
+        rows.append(("trade_sec_coverage", f"{cov:.0%}", cov > 0.35))  # strictly >
+    else:
+        gaps = rth_gap_events_df(trades, max_gap_sec=2)
+        rows.append(("rth_gap_events", str(gaps), gaps == 0))
+    return rows
+
+
+def exec_checks(ctx: ScorecardContext) -> list[Row]:
+    if ctx.exec_day is None:
+        return [
+            ("ledger_integrity", "no exec dir", False),
+            ("realized_points_30m", "0", False),
+            ("pnl_drawdown_30m_pct", "NA", True),
+        ]
+    df = ctx.ledger
+    if df is None:
+        return [
+            ("ledger_integrity", "missing", False),
+            ("realized_points_30m", "0", False),
+            ("pnl_drawdown_30m_pct", "NA", True),
+        ]
+    rows: list[Row] = []
+    kind = df["kind"]
+    # ack_latency: compute per tag (ACK.event_ts - INTENT.ts)
+    intents = df.loc[kind == "INTENT", ["tag", "ts"]].rename(columns={"ts": "t_intent"})
+    acks_df = df[kind == "ACK"]
+    if not acks_df.empty and "event_ts" in acks_df.columns:
+        acks = acks_df[["tag", "event_ts"]].rename(columns={"event_ts": "t_ack"})
+    else:
+        acks = pd.DataFrame(columns=["tag", "t_ack"])
+    m = intents.merge(acks, on="tag", how="inner")
+    if not m.empty:
+        m["ack_ms"] = (m["t_ack"] - m["t_intent"]).dt.total_seconds() * 1000.0
+        ack_p95 = float(m["ack_ms"].quantile(0.95))
+        rows.append(("ack_latency_p95_ms", f"{ack_p95:.1f}", ack_p95 < ack_threshold_ms()))
+    else:
+        rows.append(("ack_latency_p95_ms", "NA", False))
+
+    # cancel_success (sanity_* tags only)
+    sanity_window_min = ctx.sanity_window_min
+    cut = ctx.now - timedelta(minutes=sanity_window_min)
+    name = f"cancel_success (sanity {sanity_window_min}m, acked)"
+    sanity = df.loc[
+        (kind == "INTENT") & df["tag"].astype(str).str.startswith("sanity_"), ["tag", "ts"]
+    ]
+    sanity = sanity[sanity["ts"] >= cut]
+    if not sanity.empty:
+        # only ACKed sanity intents
+        acked = df.loc[kind == "ACK", ["tag"]].drop_duplicates()
+        fills = df.loc[kind == "FILL", ["tag"]].drop_duplicates().assign(has_fill=True)
+        cancels = df.loc[kind == "CANCEL", ["tag"]].drop_duplicates().assign(has_cancel=True)
+        m = sanity[["tag"]].merge(acked, on="tag", how="inner")
+        m = m.merge(cancels, on="tag", how="left").merge(fills, on="tag", how="left")
+        m["ok_cancel"] = m["has_cancel"].fillna(False) & m["has_fill"].isna()
+        rate = m["ok_cancel"].sum() / len(m) if len(m) else 0.0
+        rows.append((name, f"{rate:.0%}", bool(rate == 1.0)))
+    else:
+        rows.append((name, "NA", False))
+
+    # TCA shortfall median (bps): batch TCA file for the day when present (all fills),
+    # else PNL_SNAPSHOT.shortfall_bps written by one-shot orders
+    tca = ctx.tca
+    pnl = df[kind == "PNL_SNAPSHOT"]
+    if "arrival_shortfall_bps" in tca.columns and tca["arrival_shortfall_bps"].notna().any():
+        med = float(tca["arrival_shortfall_bps"].median())
+        rows.append(("shortfall_median_bps", f"{med:.1f}", med < 4.0))
+        mo = tca["markout_5s_bps"].median() if "markout_5s_bps" in tca.columns else None
+        mo_s = f"{mo:.1f}" if mo is not None and pd.notna(mo) else "NA"
+        rows.append(("markout_5s_median_bps", mo_s, True))  # informational for now
+    elif not pnl.empty and "shortfall_bps" in pnl.columns:
+        med = float(pnl["shortfall_bps"].median())
+        rows.append(("shortfall_median_bps", f"{med:.1f}", med < 4.0))
+    else:
+        rows.append(("shortfall_median_bps", "NA", False))
+
+    # Ledger integrity & realized P&L checks
+    tsdf = realized_pnl_from_ledger(df, ctx.symbol)
+    eq = float(os.environ.get("EQUITY_USD", "30000"))
+    points_30m = 0
+    if not tsdf.empty:
+        tsdf = tsdf.sort_values("event_ts")
+        cut30 = pd.Timestamp(ctx.now) - pd.Timedelta(minutes=30)
+        points_30m = int(tsdf[tsdf["event_ts"] >= cut30].shape[0])
+    rows.append(("realized_points_30m", str(points_30m), points_30m >= 10))
+    ddpct = (
+        drawdown_pct_last_window(tsdf, equity_usd=eq, window_min=30) if points_30m >= 10 else 0.0
+    )
+    rows.append(("pnl_drawdown_30m_pct", f"{ddpct:.2f}%", ddpct > -0.5))
+    return rows
+
+
+def engine_checks(ctx: ScorecardContext) -> list[Row]:
+    rows: list[Row] = []
+    # Queue depth and dead letters from the queue database
+    if ctx.queue is not None:
+        queue_d, dead_count = ctx.queue
+        rows.append(("queue_depth", str(queue_d), queue_d == 0))
+        rows.append(("dead_letter_count", str(dead_count), dead_count == 0))
+
+    # Engine coverage by comparing shadow intents to bars
+    if ctx.ledger is None or ctx.bars_ts is None:
+        return rows
+    shadow = ctx.ledger[ctx.ledger["kind"] == "INTENT_SHADOW"]
+    if shadow.empty:
+        rows.append(("intents_enqueued_last_15m", "0", False))
+        rows.append(("engine_coverage_last_15m", "0%", False))
+        return rows
+    cut = ctx.now - timedelta(minutes=15)
+    intent_count = int((shadow["ts"] >= cut).sum())
+    rows.append(("intents_enqueued_last_15m", str(intent_count), intent_count >= 1))
+    if (ctx.bars_ts >= cut).any():
+        # Engine coverage = processed bars / total bars (shadow intents as proxy):
+        # for now, assume the engine processed all bars if it generated intents
+        coverage = 1.0 if intent_count > 0 else 0.0
+        rows.append(("engine_coverage_last_15m", f"{coverage:.0%}", coverage >= 0.95))
+    else:
+        rows.append(("engine_coverage_last_15m", "NA", False))
+    return rows
+
+
+def risk_checks(ctx: ScorecardContext) -> list[Row]:
+    df = ctx.ledger
+    if df is None:
+        return []
+    # Blocked orders in last 15 minutes (risk-related rejections only)
+    cut = ctx.now - timedelta(minutes=15)
+    recent_rej = df[(df["kind"] == "REJ") & (df["ts"] >= cut)]
+    if "reason" in recent_rej.columns:
+        pattern = "|".join(RISK_REASONS)
+        blocked = int(recent_rej["reason"].str.contains(pattern, case=False, na=False).sum())
+    else:
+        blocked = 0
+    return [
+        ("blocked_orders_last_15m", str(blocked), blocked == 0),
+        ("daily_stop_triggered", str(ctx.halt_exists), not ctx.halt_exists),
+    ]
+
+
+def ops_checks(ctx: ScorecardContext) -> list[Row]:
+    # Uptime via heartbeat files modified in the last 60s (current state only)
+    if ctx.heartbeats is None:
+        return [("uptime_rth", "NA", False)]
+    t = ctx.now.timestamp()
+    all_up = all(m is not None and t - m < 60 for m in ctx.heartbeats.values())
+    uptime = 100.0 if all_up else 0.0
+    return [("uptime_rth", f"{uptime:.0f}%", uptime > 99.0)]
+
+
+def llm_checks(ctx: ScorecardContext) -> list[Row]:
+    if ctx.llm_day is None:
+        return [
+            ("llm_day_dir_present", "False", False),
+            ("llm_proposals_seen_15m", "0", False),
+            ("llm_proposals_applied_15m", "0", True),
+            ("llm_accept_rate_15m", "0%", True),
+            ("llm_param_bounds_ok", "NA", False),
+            ("llm_freeze_active", "NA", True),
+        ]
+    rows: list[Row] = []
+    cut15 = pd.Timestamp(ctx.now) - pd.Timedelta(minutes=15)
+    dfp = ctx.proposals
+    seen15 = 0
+    # Shadow SLOs
+    if dfp is not None:
+        seen15 = int((dfp["ts"] >= cut15).sum())
+        cost = float(dfp["cost_usd"].sum()) if "cost_usd" in dfp.columns else 0.0
+        # schema conformance is ensured at write time; still assert required columns
+        required = {"ts", "symbol", "signal.threshold_bps", "risk.multiplier", "provider"}
+        schema_ok = required.issubset(ctx.proposal_cols)
+        rows.append(("llm_schema_conformance", "100%" if schema_ok else "0%", schema_ok))
+        # >= 6 proposals in last 15m (~every 2-3 min minimum)
+        rows.append(("llm_shadow_events_15m", str(seen15), seen15 >= 6))
+        rows.append(("llm_cost_per_day_usd", f"{cost:.2f}", cost <= 10.0))
+    else:
+        rows.append(("llm_proposals_present", "False", False))
+
+    # Applied SLOs
+    rows.append(("llm_proposals_seen_15m", str(seen15), seen15 >= 6))
+    dfa = ctx.applied
+    if dfa is None:  # applied file doesn't exist yet: 0 applied is fine, NA is not frozen
+        rows.append(("llm_proposals_applied_15m", "0", True))
+        rows.append(("llm_accept_rate_15m", "0%", True))
+        rows.append(("llm_param_bounds_ok", "NA", False))
+        rows.append(("llm_freeze_active", "NA", True))
+    elif dfa.empty:
+        rows.append(("llm_proposals_applied_15m", "0", False))
+        rows.append(("llm_accept_rate_15m", "0%", True))
+        rows.append(("llm_param_bounds_ok", "NA", False))
+        rows.append(("llm_freeze_active", "NA", False))
+    else:
+        a15 = dfa[dfa["ts"] >= cut15]
+        applied15 = int((a15["delta_bps"].abs() > 0).sum())
+        rate = applied15 / seen15 if seen15 > 0 else 0.0
+        rows.append(("llm_proposals_applied_15m", str(applied15), applied15 <= 2))
+        rows.append(("llm_accept_rate_15m", f"{rate:.0%}", rate <= 0.30))
+        if ctx.threshold_bps is not None:
+            bounds_ok = 0.3 <= ctx.threshold_bps <= 3.0
+            rows.append(("llm_param_bounds_ok", str(bounds_ok), bounds_ok))
+        freeze_active = (
+            bool(a15["freeze"].iloc[-1]) if "freeze" in a15.columns and not a15.empty else False
+        )
+        rows.append(("llm_freeze_active", str(freeze_active), not freeze_active))
+    return rows
+
+
+# Display order of the groups; rows within a group keep their own order.
+GROUPS: tuple[tuple[str, CheckGroup], ...] = (
+    ("core", core_checks),
+    ("feed", feed_checks),
+    ("exec", exec_checks),
+    ("engine", engine_checks),
+    ("risk", risk_checks),
+    ("ops", ops_checks),
+    ("llm", llm_checks),
+)
+
+
+def run_groups(
+    ctx: ScorecardContext, groups: tuple[tuple[str, CheckGroup], ...] = GROUPS
+) -> dict[str, list[Row]]:
+    """Run every group concurrently; rows per group name, in `groups` order."""
+    with ThreadPoolExecutor(max_workers=max(len(groups), 1)) as pool:
+        futures = [(name, pool.submit(fn, ctx)) for name, fn in groups]
+        return {name: f.result() for name, f in futures}
+
+
+def run_checks(
+    ctx: ScorecardContext, groups: tuple[tuple[str, CheckGroup], ...] = GROUPS
+) -> list[Row]:
+    """Run every group concurrently; rows come back in `groups` order regardless."""
+    return [row for rows in run_groups(ctx, groups).values() for row in rows]
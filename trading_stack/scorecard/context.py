@@ -0,0 +1,192 @@
+"""Scorecard inputs: every artifact the checks read, loaded once with only the needed
+columns (loads run concurrently)."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+TRADE_COLS = ["ts", "ingest_ts", "source"]
+LEDGER_COLS = [
+    "ts",
+    "event_ts",
+    "kind",
+    "tag",
+    "reason",
+    "shortfall_bps",
+    "symbol",
+    "side",
+    "fill_qty",
+    "avg_px",
+]
+TCA_COLS = ["arrival_shortfall_bps", "markout_5s_bps"]
+PROPOSAL_COLS = ["ts", "cost_usd"]
+APPLIED_COLS = ["ts", "delta_bps", "freeze"]
+SERVICES = ("feedd", "engined", "execd")
+PARTS = ("trades", "bars", "ledger", "queue", "heartbeats", "llm")
+
+
+@dataclass
+class ScorecardContext:
+    now: datetime
+    symbol: str
+    sanity_window_min: int = 30
+    live_day: Path | None = None
+    trades: pd.DataFrame | None = None  # None: file missing
+    bars_ts: pd.Series | None = None
+    exec_day: Path | None = None
+    ledger: pd.DataFrame | None = None
+    tca: pd.DataFrame = field(default_factory=pd.DataFrame)
+    queue: tuple[int, int] | None = None  # (depth, dead letters) of order_intents
+    heartbeats: dict[str, float | None] | None = None  # service -> mtime; None: no dir
+    halt_exists: bool = False
+    llm_day: Path | None = None
+    proposals: pd.DataFrame | None = None
+    proposal_cols: set[str] = field(default_factory=set)
+    applied: pd.DataFrame | None = None
+    threshold_bps: float | None = None
+
+
+def latest_day(root: Path) -> Path | None:
+    days = [p for p in root.glob("*") if p.is_dir()]
+    return max(days) if days else None
+
+
+def read_columns(path: Path, columns: list[str]) -> pd.DataFrame:
+    """Read the subset of `columns` the file actually has."""
+    have = set(pq.read_schema(path).names)
+    return pd.read_parquet(path, columns=[c for c in columns if c in have])
+
+
+def _utc(df: pd.DataFrame, *cols: str) -> pd.DataFrame:
+    for c in cols:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], utc=True)
+    return df
+
+
+def input_paths(
+    symbol: str = "SPY",
+    live_dir: str | Path = "data/live",
+    llm_dir: str | Path = "data/llm",
+    exec_dir: str | Path = "data/exec",
+    tca_dir: str | Path = "data/tca",
+    queue_path: str | Path = "data/queue.db",
+    run_dir: str | Path = "RUN",
+    params_dir: str | Path = "data/params",
+) -> dict[str, list[Path]]:
+    """The files each part of `load_context` reads (present or not), per part name."""
+    live, exe, llm = (
+        latest_day(Path(live_dir)),
+        latest_day(Path(exec_dir)),
+        latest_day(Path(llm_dir)),
+    )
+    hb = Path(run_dir) / "heartbeat"
+    q = Path(queue_path)
+    return {
+        "trades": [live / f"trades_{symbol}.parquet"] if live else [],
+        "bars": [live / f"bars1s_{symbol}.parquet"] if live else [],
+        "ledger": [exe / "ledger.parquet", Path(tca_dir) / exe.name / "tca.parquet"] if exe else [],
+        "queue": [q, q.with_name(q.name + "-wal")],
+        "heartbeats": [hb, *(hb / f"{s}.hb" for s in SERVICES)],
+        "halt": [Path(run_dir) / "HALT"],
+        "llm": [
+            llm / f"proposals_{symbol}.parquet",
+            llm / f"applied_{symbol}.parquet",
+            Path(params_dir) / f"runtime_{symbol}.json",
+        ]
+        if llm
+        else [],
+    }
+
+
+def load_context(
+    symbol: str = "SPY",
+    live_dir: str | Path = "data/live",
+    llm_dir: str | Path = "data/llm",
+    exec_dir: str | Path = "data/exec",
+    tca_dir: str | Path = "data/tca",
+    queue_path: str | Path = "data/queue.db",
+    run_dir: str | Path = "RUN",
+    params_dir: str | Path = "data/params",
+    sanity_window_min: int = 30,
+    now: datetime | None = None,
+    parts: Iterable[str] = PARTS,
+) -> ScorecardContext:
+    """Load the `parts` (default all) of the context; the rest stay unset."""
+    ctx = ScorecardContext(now or datetime.now(UTC), symbol, sanity_window_min)
+    ctx.live_day = latest_day(Path(live_dir))
+    ctx.exec_day = latest_day(Path(exec_dir))
+    ctx.llm_day = latest_day(Path(llm_dir))
+    ctx.halt_exists = (Path(run_dir) / "HALT").exists()
+
+    def trades() -> None:
+        p = ctx.live_day / f"trades_{symbol}.parquet" if ctx.live_day else None
+        if p is not None and p.exists():
+            ctx.trades = _utc(read_columns(p, TRADE_COLS), "ts", "ingest_ts")
+
+    def bars() -> None:
+        p = ctx.live_day / f"bars1s_{symbol}.parquet" if ctx.live_day else None
+        if p is not None and p.exists():
+            ctx.bars_ts = pd.to_datetime(pd.read_parquet(p, columns=["ts"])["ts"], utc=True)
+
+    def ledger() -> None:
+        p = ctx.exec_day / "ledger.parquet" if ctx.exec_day else None
+        if p is not None and p.exists():
+            ctx.ledger = read_columns(p, LEDGER_COLS)
+        t = Path(tca_dir) / ctx.exec_day.name / "tca.parquet" if ctx.exec_day else None
+        if t is not None and t.exists():
+            ctx.tca = read_columns(t, TCA_COLS)
+
+    def queue() -> None:
+        if Path(queue_path).exists():
+            from trading_stack.ipc.sqlite_queue import connect, dead_letter_count, depth
+
+            con = connect(queue_path)
+            try:
+                ctx.queue = (depth(con, "order_intents"), dead_letter_count(con, "order_intents"))
+            finally:
+                con.close()
+
+    def heartbeats() -> None:
+        hb = Path(run_dir) / "heartbeat"
+        if hb.exists():
+            ctx.heartbeats = {}
+            for s in SERVICES:
+                f = hb / f"{s}.hb"
+                ctx.heartbeats[s] = f.stat().st_mtime if f.exists() else None
+
+    def llm() -> None:
+        if ctx.llm_day is None:
+            return
+        p = ctx.llm_day / f"proposals_{symbol}.parquet"
+        if p.exists():
+            ctx.proposal_cols = set(pq.read_schema(p).names)
+            ctx.proposals = _utc(read_columns(p, PROPOSAL_COLS), "ts")
+        a = ctx.llm_day / f"applied_{symbol}.parquet"
+        if a.exists():
+            ctx.applied = _utc(read_columns(a, APPLIED_COLS), "ts")
+        params = Path(params_dir) / f"runtime_{symbol}.json"
+        if params.exists():
+            data: dict[str, Any] = json.loads(params.read_text(encoding="utf-8"))
+            ctx.threshold_bps = float(data.get("signal_threshold_bps", 0.5))
+
+    named = {"trades": trades, "bars": bars, "ledger": ledger, "queue": queue}
+    named |= {"heartbeats": heartbeats, "llm": llm}
+    loaders = [named[p] for p in parts]
+    if not loaders:
+        return ctx
+    with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+        for f in [pool.submit(fn) for fn in loaders]:
+            f.result()
+    if ctx.ledger is not None:
+        _utc(ctx.ledger, "ts", "event_ts")
+    return ctx
@@ -0,0 +1,144 @@
+"""Scorecard gates as records (gate, value, threshold, ok), with each check group's rows
+cached on disk keyed by the (size, mtime) of the artifacts that group reads."""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from trading_stack.scorecard.checks import GROUPS, SAMPLE_DATA, Row, run_groups, threshold_for
+from trading_stack.scorecard.context import PARTS, input_paths, load_context
+from trading_stack.storage.atomic import atomic_write_text
+
+# Inputs (parts of `input_paths`) each group reads; "halt" and "sample" are plain stats.
+GROUP_PARTS: dict[str, tuple[str, ...]] = {
+    "core": ("sample",),
+    "feed": ("trades",),
+    "exec": ("ledger",),
+    "engine": ("queue", "ledger", "bars"),
+    "risk": ("ledger", "halt"),
+    "ops": ("heartbeats",),
+    "llm": ("llm",),
+}
+# Heartbeat age moves with the clock rather than with any file, and costs a few stats.
+UNCACHED = frozenset({"ops"})
+_ENV = ("EXEC_ENV", "ACK_P95_MS", "EQUITY_USD")
+
+
+@dataclass(frozen=True)
+class GateResult:
+    gate: str
+    value: str
+    threshold: str
+    ok: bool
+
+
+def to_results(rows: list[Row]) -> list[GateResult]:
+    return [GateResult(g, v, threshold_for(g), bool(ok)) for g, v, ok in rows]
+
+
+def _stat(p: Path) -> list[int] | None:
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_cache(path: Path) -> dict[str, Any]:
+    try:
+        data: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return data
+
+
+def evaluate(
+    symbol: str = "SPY",
+    live_dir: str | Path = "data/live",
+    llm_dir: str | Path = "data/llm",
+    exec_dir: str | Path = "data/exec",
+    tca_dir: str | Path = "data/tca",
+    queue_path: str | Path = "data/queue.db",
+    run_dir: str | Path = "RUN",
+    params_dir: str | Path = "data/params",
+    sanity_window_min: int = 30,
+    cache_path: str | Path | None = "RUN/scorecard_cache.json",
+    max_age_sec: float = 30.0,
+    now: datetime | None = None,
+) -> list[GateResult]:
+    """
+    Every gate with its threshold. A group's cached rows are reused while none of its
+    input files changed and they are under `max_age_sec` old (time windows still
+    slide); only stale groups load their inputs and re-run. `cache_path=None` disables.
+    """
+    now = now or datetime.now(UTC)
+    dirs: dict[str, Any] = {
+        "live_dir": live_dir,
+        "llm_dir": llm_dir,
+        "exec_dir": exec_dir,
+        "tca_dir": tca_dir,
+        "queue_path": queue_path,
+        "run_dir": run_dir,
+        "params_dir": params_dir,
+    }
+    paths = input_paths(symbol, **dirs)
+    paths["sample"] = list(SAMPLE_DATA)
+    meta = [symbol, sanity_window_min, *(os.environ.get(k) for k in _ENV)]
+    keys = {
+        g: {"meta": meta, "files": {str(p): _stat(p) for part in ps for p in paths[part]}}
+        for g, ps in GROUP_PARTS.items()
+    }
+    cache = _read_cache(Path(cache_path)) if cache_path is not None else {}
+    t = now.timestamp()
+    rows: dict[str, list[Row]] = {}
+    for g, _ in GROUPS:
+        hit = cache.get(g)
+        if (
+            hit is not None
+            and g not in UNCACHED
+            and hit["key"] == keys[g]
+            and 0.0 <= t - hit["at"] <= max_age_sec
+        ):
+            rows[g] = [(n, v, ok) for n, v, ok in hit["rows"]]
+    stale = tuple((g, fn) for g, fn in GROUPS if g not in rows)
+    if stale:
+        need = {p for g, _ in stale for p in GROUP_PARTS[g]}
+        ctx = load_context(
+            symbol,
+            **dirs,
+            sanity_window_min=sanity_window_min,
+            now=now,
+            parts=[p for p in PARTS if p in need],
+        )
+        fresh = run_groups(ctx, stale)
+        rows |= fresh
+        if cache_path is not None:
+            for g, r in fresh.items():
+                cache[g] = {"key": keys[g], "at": t, "rows": r}
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(cache_path, json.dumps(cache))
+    return to_results([row for g, _ in GROUPS for row in rows.get(g, [])])
+
+
+def to_json(results: list[GateResult], symbol: str, now: datetime) -> str:
+    doc = {
+        "ts": now.isoformat(),
+        "symbol": symbol,
+        "ok": all(r.ok for r in results),
+        "gates": [asdict(r) for r in results],
+    }
+    return json.dumps(doc, indent=2)
+
+
+def to_frame(results: list[GateResult], symbol: str, now: datetime) -> pd.DataFrame:
+    df = pd.DataFrame([asdict(r) for r in results], columns=["gate", "value", "threshold", "ok"])
+    df.insert(0, "symbol", symbol)
+    df.insert(0, "ts", pd.Timestamp(now))
+    return df
@@ -0,0 +1,650 @@
+"""Continuous scorecard: per-gate state updated from rows appended since the last tick,
+plus a timestamped gate history that multi-day green streaks are computed from."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import re
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from trading_stack.accounting.lots import LotEngine
+from trading_stack.core.window import Window
+from trading_stack.scorecard.checks import RISK_REASONS, Row, ack_threshold_ms, core_checks
+from trading_stack.scorecard.context import (
+    APPLIED_COLS,
+    LEDGER_COLS,
+    PROPOSAL_COLS,
+    SERVICES,
+    TCA_COLS,
+    TRADE_COLS,
+    ScorecardContext,
+    latest_day,
+)
+from trading_stack.storage.atomic import atomic_write_parquet
+from trading_stack.storage.tail import ParquetTail
+
+NY = ZoneInfo("America/New_York")
+# PHASE5 promotion: three consecutive RTH sessions with these gates green
+PHASE5_GATES = (
+    "llm_proposals_seen_15m",
+    "llm_proposals_applied_15m",
+    "llm_accept_rate_15m",
+    "llm_param_bounds_ok",
+    "llm_freeze_active",
+)
+_RISK = re.compile("|".join(RISK_REASONS), re.IGNORECASE)
+
+
+class Histogram:
+    """Fixed-width bucket sketch: O(1) inserts, quantiles to within one bucket width."""
+
+    def __init__(self, lo: float, hi: float, width: float = 1.0) -> None:
+        self.lo, self.width = lo, width
+        self.counts = np.zeros(int(np.ceil((hi - lo) / width)) + 1, dtype=np.int64)
+        self.n = 0
+
+    def add(self, values: np.ndarray) -> None:
+        idx = np.clip(((values - self.lo) // self.width).astype(np.int64), 0, len(self.counts) - 1)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.n += len(values)
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return float("nan")
+        i = int(np.searchsorted(np.cumsum(self.counts), q * (self.n - 1) + 1))
+        return self.lo + (i + 0.5) * self.width
+
+
+def _quantile_sorted(vals: list[float], q: float) -> float:
+    """Linear-interpolated quantile of a sorted list (pandas' default)."""
+    pos = q * (len(vals) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(vals) - 1)
+    return vals[lo] + (vals[hi] - vals[lo]) * (pos - lo)
+
+
+def _utc(s: pd.Series) -> pd.Series:
+    return pd.to_datetime(s, utc=True)
+
+
+@dataclass
+class FeedGates:
+    offset: Histogram = field(default_factory=lambda: Histogram(-60_000.0, 60_000.0))
+    fresh: Histogram = field(default_factory=lambda: Histogram(0.0, 60_000.0))
+    sources: set[str] = field(default_factory=set)
+    rth_secs: set[int] = field(default_factory=set)
+    last_rth: pd.Timestamp | None = None
+    gaps: int = 0
+    seen: bool = False
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.seen = True
+        if df.empty:
+            return
+        if "ingest_ts" in df.columns:
+            d = df.dropna(subset=["ingest_ts"])
+            lag = (_utc(d["ingest_ts"]) - _utc(d["ts"])).dt.total_seconds().to_numpy() * 1e3
+            self.offset.add(lag)
+            self.fresh.add(lag[lag >= 0])
+        if "source" in df.columns:
+            self.sources.update(df["source"].fillna("").astype(str).unique())
+        ts = _utc(df["ts"])
+        et = ts.dt.tz_convert(NY)
+        sod = et.dt.hour * 3600 + et.dt.minute * 60 + et.dt.second + et.dt.microsecond / 1e6
+        rth = ts[(et.dt.weekday < 5) & (sod >= 9.5 * 3600) & (sod < 16 * 3600)].sort_values()
+        if rth.empty:
+            return
+        self.rth_secs.update((rth.astype("int64") // 10**9).unique().tolist())
+        prev = pd.concat([pd.Series([self.last_rth]), rth]) if self.last_rth is not None else rth
+        self.gaps += int((prev.diff().dt.total_seconds() > 2).sum())
+        self.last_rth = rth.iloc[-1]
+
+    def rows(self, live_day: Path | None) -> list[Row]:
+        if live_day is None:
+            return [("live_day_dir_present", "False", False)]
+        if not self.seen:
+            return [("live_trades_present", "False", False)]
+        n = self.offset.n
+        offs = self.offset.quantile(0.5)
+        offs_ok = abs(offs) < 1000.0 if n else False
+        rows: list[Row] = [("clock_offset_median_ms", f"{offs:.1f}" if n else "NA", offs_ok)]
+        if offs_ok and n >= 20:
+            f99 = self.fresh.quantile(0.99) if self.fresh.n else float("inf")
+            rows.append(("freshness_p99_ms", f"{f99:.1f}", f99 < 750.0))
+        else:
+            rows.append(("freshness_p99_ms", "skipped (clock skew or small sample)", False))
+        feed = next((s for s in self.sources if s.startswith("alpaca:")), "alpaca:unknown")
+        if feed.startswith("alpaca:v2/iex"):
+            secs = self.rth_secs
+            cov = len(secs) / (max(secs) - min(secs) + 1) if secs else 0.0
+            rows.append(("trade_sec_coverage", f"{cov:.0%}", cov > 0.35))
+        else:
+            rows.append(("rth_gap_events", str(self.gaps), self.gaps == 0))
+        return rows
+
+
+@dataclass
+class LedgerGates:
+    symbol: str
+    sanity_window_min: int = 30
+    seen: bool = False
+    intents: dict[str, pd.Timestamp] = field(default_factory=dict)
+    intent_meta: dict[str, tuple[str, str]] = field(default_factory=dict)
+    pending_acks: dict[str, list[pd.Timestamp]] = field(default_factory=dict)
+    ack_ms: list[float] = field(default_factory=list)  # sorted
+    sanity: deque[tuple[pd.Timestamp, str]] = field(default_factory=deque)
+    acked: set[str] = field(default_factory=set)
+    cancelled: set[str] = field(default_factory=set)
+    filled: set[str] = field(default_factory=set)
+    shortfall: list[float] = field(default_factory=list)  # sorted
+    shadow_any: bool = False
+    shadow: Window = field(default_factory=lambda: Window(timedelta(minutes=15)))
+    risk_rej: Window = field(default_factory=lambda: Window(timedelta(minutes=15)))
+    realized: Window = field(default_factory=lambda: Window(timedelta(minutes=30)))
+    lots: LotEngine = field(default_factory=LotEngine)  # avg book == realized.py
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.seen = True
+        if df.empty:
+            return
+        df = df.copy()
+        for c in ("ts", "event_ts"):
+            if c in df.columns:
+                df[c] = _utc(df[c])
+        for r in df.to_dict("records"):
+            kind, tag = r.get("kind"), str(r.get("tag"))
+            if kind == "INTENT":
+                self.intents[tag] = r["ts"]
+                if isinstance(r.get("symbol"), str) and isinstance(r.get("side"), str):
+                    self.intent_meta[tag] = (r["symbol"], r["side"])
+                for t_ack in self.pending_acks.pop(tag, []):
+                    self._ack(r["ts"], t_ack)
+                if tag.startswith("sanity_"):
+                    self.sanity.append((r["ts"], tag))
+            elif kind == "ACK":
+                self.acked.add(tag)
+                t_evt = r.get("event_ts")
+                if pd.isna(t_evt):
+                    continue
+                if tag in self.intents:
+                    self._ack(self.intents[tag], t_evt)
+                else:
+                    self.pending_acks.setdefault(tag, []).append(t_evt)
+            elif kind == "CANCEL":
+                self.cancelled.add(tag)
+            elif kind == "FILL":
+                self.filled.add(tag)
+                self._fill(tag, r)
+            elif kind == "PNL_SNAPSHOT" and not pd.isna(r.get("shortfall_bps")):
+                bisect.insort(self.shortfall, float(r["shortfall_bps"]))
+            elif kind == "INTENT_SHADOW":
+                self.shadow_any = True
+                self.shadow.add(r["ts"])
+            elif kind == "REJ":
+                reason = r.get("reason")
+                if isinstance(reason, str) and _RISK.search(reason):
+                    self.risk_rej.add(r["ts"])
+
+    def _ack(self, t_intent: pd.Timestamp, t_ack: pd.Timestamp) -> None:
+        bisect.insort(self.ack_ms, (t_ack - t_intent).total_seconds() * 1000.0)
+
+    def _fill(self, tag: str, r: dict[Any, Any]) -> None:
+        sym, side = r.get("symbol"), r.get("side")
+        if not isinstance(sym, str) or not isinstance(side, str):
+            sym, side = self.intent_meta.get(tag, (None, None))
+        if sym is None or side is None:
+            return
+        q, a = float(r.get("fill_qty") or 0.0), float(r.get("avg_px") or 0.0)
+        self.lots.on_fill(tag, sym, side, q, a)
+        if sym == self.symbol and q > 0 and a > 0:
+            self.realized.add(r["event_ts"], self.lots.realized(sym, "avg"))
+
+    def exec_rows(self, exec_day: Path | None, now: datetime, tca: pd.DataFrame) -> list[Row]:
+        if exec_day is None or not self.seen:
+            miss = "no exec dir" if exec_day is None else "missing"
+            return [
+                ("ledger_integrity", miss, False),
+                ("realized_points_30m", "0", False),
+                ("pnl_drawdown_30m_pct", "NA", True),
+            ]
+        rows: list[Row] = []
+        if self.ack_ms:
+            p95 = _quantile_sorted(self.ack_ms, 0.95)
+            rows.append(("ack_latency_p95_ms", f"{p95:.1f}", p95 < ack_threshold_ms()))
+        else:
+            rows.append(("ack_latency_p95_ms", "NA", False))
+
+        name = f"cancel_success (sanity {self.sanity_window_min}m, acked)"
+        cut = now - timedelta(minutes=self.sanity_window_min)
+        while self.sanity and self.sanity[0][0] < cut:
+            self.sanity.popleft()
+        if self.sanity:
+            acked = [t for _, t in self.sanity if t in self.acked]
+            ok = sum(1 for t in acked if t in self.cancelled and t not in self.filled)
+            rate = ok / len(acked) if acked else 0.0
+            rows.append((name, f"{rate:.0%}", rate == 1.0))
+        else:
+            rows.append((name, "NA", False))
+
+        if "arrival_shortfall_bps" in tca.columns and tca["arrival_shortfall_bps"].notna().any():
+            med = float(tca["arrival_shortfall_bps"].median())
+            rows.append(("shortfall_median_bps", f"{med:.1f}", med < 4.0))
+            mo = tca["markout_5s_bps"].median() if "markout_5s_bps" in tca.columns else None
+            mo_s = f"{mo:.1f}" if mo is not None and pd.notna(mo) else "NA"
+            rows.append(("markout_5s_median_bps", mo_s, True))
+        elif self.shortfall:
+            med = _quantile_sorted(self.shortfall, 0.5)
+            rows.append(("shortfall_median_bps", f"{med:.1f}", med < 4.0))
+        else:
+            rows.append(("shortfall_median_bps", "NA", False))
+
+        self.realized.trim(now)
+        points = len(self.realized)
+        rows.append(("realized_points_30m", str(points), points >= 10))
+        eq = float(os.environ.get("EQUITY_USD", "30000"))
+        dd = (self.realized.last - self.realized.max) / eq * 100.0 if points >= 10 else 0.0
+        rows.append(("pnl_drawdown_30m_pct", f"{dd:.2f}%", dd > -0.5))
+        return rows
+
+    def engine_rows(self, now: datetime, bars: bool, last_bar: pd.Timestamp | None) -> list[Row]:
+        if not self.seen or not bars:
+            return []
+        if not self.shadow_any:
+            return [
+                ("intents_enqueued_last_15m", "0", False),
+                ("engine_coverage_last_15m", "0%", False),
+            ]
+        self.shadow.trim(now)
+        n = len(self.shadow)
+        rows: list[Row] = [("intents_enqueued_last_15m", str(n), n >= 1)]
+        if last_bar is not None and last_bar >= now - timedelta(minutes=15):
+            cov = 1.0 if n > 0 else 0.0
+            rows.append(("engine_coverage_last_15m", f"{cov:.0%}", cov >= 0.95))
+        else:
+            rows.append(("engine_coverage_last_15m", "NA", False))
+        return rows
+
+    def risk_rows(self, now: datetime, halt: bool) -> list[Row]:
+        if not self.seen:
+            return []
+        self.risk_rej.trim(now)
+        n = len(self.risk_rej)
+        return [
+            ("blocked_orders_last_15m", str(n), n == 0),
+            ("daily_stop_triggered", str(halt), not halt),
+        ]
+
+
+@dataclass
+class LlmGates:
+    proposals_seen: bool = False
+    proposal_cols: set[str] = field(default_factory=set)
+    proposals: Window = field(default_factory=lambda: Window(timedelta(minutes=15)))
+    cost: float = 0.0
+    applied_seen: bool = False
+    applied: Window = field(default_factory=lambda: Window(timedelta(minutes=15)))
+    applied_n: int = 0
+    freeze: deque[tuple[pd.Timestamp, bool]] = field(default_factory=deque)
+
+    def update_proposals(self, df: pd.DataFrame, cols: set[str]) -> None:
+        self.proposals_seen, self.proposal_cols = True, cols
+        if df.empty:
+            return
+        for t in _utc(df["ts"]).sort_values():  # windows expect time order
+            self.proposals.add(t)
+        if "cost_usd" in df.columns:
+            self.cost += float(df["cost_usd"].sum())
+
+    def update_applied(self, df: pd.DataFrame) -> None:
+        self.applied_seen = True
+        self.applied_n += len(df)
+        if df.empty:
+            return
+        df = df.assign(ts=_utc(df["ts"])).sort_values("ts", kind="stable")
+        ts = df["ts"]
+        nz = (
+            (df["delta_bps"].abs() > 0).to_numpy()
+            if "delta_bps" in df.columns
+            else np.zeros(len(df))
+        )
+        fz = df["freeze"].to_numpy() if "freeze" in df.columns else None
+        for i, t in enumerate(ts):
+            self.applied.add(t, float(nz[i]))
+            if fz is not None:
+                self.freeze.append((t, bool(fz[i])))
+
+    def rows(self, llm_day: Path | None, now: datetime, threshold: float | None) -> list[Row]:
+        if llm_day is None:
+            return [
+                ("llm_day_dir_present", "False", False),
+                ("llm_proposals_seen_15m", "0", False),
+                ("llm_proposals_applied_15m", "0", True),
+                ("llm_accept_rate_15m", "0%", True),
+                ("llm_param_bounds_ok", "NA", False),
+                ("llm_freeze_active", "NA", True),
+            ]
+        rows: list[Row] = []
+        self.proposals.trim(now)
+        seen15 = len(self.proposals)
+        if self.proposals_seen:
+            required = {"ts", "symbol", "signal.threshold_bps", "risk.multiplier", "provider"}
+            schema_ok = required.issubset(self.proposal_cols)
+            rows.append(("llm_schema_conformance", "100%" if schema_ok else "0%", schema_ok))
+            rows.append(("llm_shadow_events_15m", str(seen15), seen15 >= 6))
+            rows.append(("llm_cost_per_day_usd", f"{self.cost:.2f}", self.cost <= 10.0))
+        else:
+            rows.append(("llm_proposals_present", "False", False))
+        rows.append(("llm_proposals_seen_15m", str(seen15), seen15 >= 6))
+        if not self.applied_seen:
+            return [
+                *rows,
+                ("llm_proposals_applied_15m", "0", True),
+                ("llm_accept_rate_15m", "0%", True),
+                ("llm_param_bounds_ok", "NA", False),
+                ("llm_freeze_active", "NA", True),
+            ]
+        if self.applied_n == 0:
+            return [
+                *rows,
+                ("llm_proposals_applied_15m", "0", False),
+                ("llm_accept_rate_15m", "0%", True),
+                ("llm_param_bounds_ok", "NA", False),
+                ("llm_freeze_active", "NA", False),
+            ]
+        self.applied.trim(now)
+        cut = now - timedelta(minutes=15)
+        while self.freeze and self.freeze[0][0] < cut:
+            self.freeze.popleft()
+        applied15 = int(self.applied.sum())
+        rate = applied15 / seen15 if seen15 > 0 else 0.0
+        rows.append(("llm_proposals_applied_15m", str(applied15), applied15 <= 2))
+        rows.append(("llm_accept_rate_15m", f"{rate:.0%}", rate <= 0.30))
+        if threshold is not None:
+            ok = 0.3 <= threshold <= 3.0
+            rows.append(("llm_param_bounds_ok", str(ok), ok))
+        frozen = self.freeze[-1][1] if self.freeze else False
+        rows.append(("llm_freeze_active", str(frozen), not frozen))
+        return rows
+
+
+class _Cached:
+    """Parse a small file again only when its (mtime_ns, size, inode) changed."""
+
+    def __init__(self) -> None:
+        self.key: tuple[Path, int, int, int] | None = None
+        self.value: Any = None
+
+    def get(self, path: Path, load: Any, default: Any = None) -> Any:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.key, self.value = None, default
+            return default
+        key = (path, st.st_mtime_ns, st.st_size, st.st_ino)
+        if key != self.key:
+            self.key, self.value = key, load(path)
+        return self.value
+
+
+class ScorecardWatcher:
+    """
+    Tails the day's trades, bars, ledger, proposals and applied files (only appended
+    rows are folded in) into per-gate state, and evaluates the same gates as the
+    one-shot scorecard. A new latest day directory resets that source's state.
+    Feed latencies use a 1 ms histogram, so their quantiles are within 1 ms of exact.
+    """
+
+    def __init__(
+        self,
+        symbol: str = "SPY",
+        live_dir: str | Path = "data/live",
+        llm_dir: str | Path = "data/llm",
+        exec_dir: str | Path = "data/exec",
+        tca_dir: str | Path = "data/tca",
+        queue_path: str | Path = "data/queue.db",
+        run_dir: str | Path = "RUN",
+        params_dir: str | Path = "data/params",
+        sanity_window_min: int = 30,
+    ) -> None:
+        self.symbol = symbol
+        self.live_dir, self.llm_dir, self.exec_dir = Path(live_dir), Path(llm_dir), Path(exec_dir)
+        self.tca_dir, self.queue_path = Path(tca_dir), Path(queue_path)
+        self.run_dir, self.params_dir = Path(run_dir), Path(params_dir)
+        self.sanity_window_min = sanity_window_min
+        self.core: list[Row] | None = None
+        self._days: dict[str, Path | None] = {}
+        self._tails: dict[str, ParquetTail] = {}
+        self.feed = FeedGates()
+        self.ledger = LedgerGates(symbol, sanity_window_min)
+        self.llm = LlmGates()
+        self.bars_seen = False
+        self.last_bar: pd.Timestamp | None = None
+        self._tca, self._params = _Cached(), _Cached()
+
+    def _poll(self, name: str, day: Path | None, file: str, cols: list[str]) -> pd.DataFrame | None:
+        """New rows of `day/file`, or None when the file does not exist (yet)."""
+        if day is None or not (day / file).exists():
+            return None
+        tail = self._tails.get(name)
+        if tail is None or tail.path != day / file:
+            tail = self._tails[name] = ParquetTail(day / file, columns=cols)
+        return tail.poll()
+
+    def _day(self, name: str, root: Path) -> tuple[Path | None, bool]:
+        day = latest_day(root)
+        changed = self._days.get(name, day) != day or name not in self._days
+        self._days[name] = day
+        return day, changed
+
+    def tick(self, now: datetime) -> list[Row]:
+        sym = self.symbol
+        live, live_new = self._day("live", self.live_dir)
+        exec_day, exec_new = self._day("exec", self.exec_dir)
+        llm_day, llm_new = self._day("llm", self.llm_dir)
+        if live_new:
+            self.feed, self.last_bar, self.bars_seen = FeedGates(), None, False
+        if exec_new:
+            self.ledger = LedgerGates(sym, self.sanity_window_min)
+        if llm_new:
+            self.llm = LlmGates()
+
+        trades = self._poll("trades", live, f"trades_{sym}.parquet", TRADE_COLS)
+        if trades is not None:
+            if self._tails["trades"].reset:
+                self.feed = FeedGates()
+            self.feed.update(trades)
+        bars = self._poll("bars", live, f"bars1s_{sym}.parquet", ["ts"])
+        if bars is not None:
+            self.bars_seen = True
+            if self._tails["bars"].reset:
+                self.last_bar = None
+            if not bars.empty:
+                t = _utc(bars["ts"]).max()
+                self.last_bar = t if self.last_bar is None else max(t, self.last_bar)
+        led = self._poll("ledger", exec_day, "ledger.parquet", LEDGER_COLS)
+        if led is not None:
+            if self._tails["ledger"].reset:
+                self.ledger = LedgerGates(sym, self.sanity_window_min)
+            self.ledger.update(led)
+        props = self._poll("proposals", llm_day, f"proposals_{sym}.parquet", PROPOSAL_COLS)
+        if props is not None:
+            if self._tails["proposals"].reset:
+                self.llm.proposals, self.llm.cost = Window(timedelta(minutes=15)), 0.0
+            cols = set(pq.read_schema(self._tails["proposals"].path).names)
+            self.llm.update_proposals(props, cols)
+        applied = self._poll("applied", llm_day, f"applied_{sym}.parquet", APPLIED_COLS)
+        if applied is not None:
+            if self._tails["applied"].reset:
+                self.llm.applied, self.llm.freeze, self.llm.applied_n = (
+                    Window(timedelta(minutes=15)),
+                    deque(),
+                    0,
+                )
+            self.llm.update_applied(applied)
+
+        if self.core is None:  # storage/determinism/sample checks do not change
+            self.core = core_checks(ScorecardContext(now, sym))
+        tca = (
+            self._tca.get(
+                self.tca_dir / exec_day.name / "tca.parquet",
+                lambda p: pd.read_parquet(
+                    p, columns=[c for c in TCA_COLS if c in pq.read_schema(p).names]
+                ),
+                pd.DataFrame(),
+            )
+            if exec_day is not None
+            else pd.DataFrame()
+        )
+        threshold = self._params.get(
+            self.params_dir / f"runtime_{sym}.json",
+            lambda p: float(
+                json.loads(p.read_text(encoding="utf-8")).get("signal_threshold_bps", 0.5)
+            ),
+        )
+        return [
+            *self.core,
+            *self.feed.rows(live),
+            *self.ledger.exec_rows(exec_day, now, tca),
+            *self._queue_rows(),
+            *self.ledger.engine_rows(now, self.bars_seen, self.last_bar),
+            *self.ledger.risk_rows(now, (self.run_dir / "HALT").exists()),
+            *self._ops_rows(now),
+            *self.llm.rows(llm_day, now, threshold if llm_day is not None else None),
+        ]
+
+    def _queue_rows(self) -> list[Row]:
+        if not self.queue_path.exists():
+            return []
+        from trading_stack.ipc.sqlite_queue import connect, dead_letter_count, depth
+
+        con = connect(self.queue_path)
+        try:
+            d, dead = depth(con, "order_intents"), dead_letter_count(con, "order_intents")
+        finally:
+            con.close()
+        return [("queue_depth", str(d), d == 0), ("dead_letter_count", str(dead), dead == 0)]
+
+    def _ops_rows(self, now: datetime) -> list[Row]:
+        hb = self.run_dir / "heartbeat"
+        if not hb.exists():
+            return [("uptime_rth", "NA", False)]
+        t = now.timestamp()
+        up = True
+        for s in SERVICES:
+            f = hb / f"{s}.hb"
+            up = up and f.exists() and t - f.stat().st_mtime < 60
+        uptime = 100.0 if up else 0.0
+        return [("uptime_rth", f"{uptime:.0f}%", uptime > 99.0)]
+
+
+class GateHistory:
+    """Buffers (ts, gate, value, ok) rows and appends them to
+    {root}/{day}/gates.parquet in batches. The day's rows are kept in memory after the
+    first flush, so a flush never re-reads the file, and each write replaces it
+    atomically so readers never see a torn history."""
+
+    def __init__(self, root: str | Path = "data/scorecard") -> None:
+        self.root = Path(root)
+        self._buf: list[dict[str, Any]] = []
+        self._day: tuple[str, pd.DataFrame] | None = None
+
+    def record(self, now: datetime, rows: Iterable[Row]) -> None:
+        self._buf.extend({"ts": now, "gate": g, "value": v, "ok": ok} for g, v, ok in rows)
+
+    def flush(self) -> None:
+        """Write buffered rows; on failure they stay buffered for the next flush."""
+        if not self._buf:
+            return
+        df = pd.DataFrame(self._buf)
+        df["ts"] = pd.to_datetime(df["ts"], utc=True)
+        days = df["ts"].dt.tz_convert(NY).dt.date.astype(str)
+        done: set[str] = set()
+        try:
+            for day, part in df.groupby(days):
+                p = self.root / str(day) / "gates.parquet"
+                if self._day is not None and self._day[0] == day:
+                    have = self._day[1]
+                else:
+                    have = pd.read_parquet(p) if p.exists() else part.iloc[:0]
+                full = pd.concat([have, part], ignore_index=True)
+                atomic_write_parquet(p, full)
+                self._day = (str(day), full)
+                done.add(str(day))
+        finally:
+            self._buf = [r for r, d in zip(self._buf, days, strict=True) if d not in done]
+
+
+def day_green(
+    hist: pd.DataFrame, gates: Iterable[str] | None = None, min_samples: int = 60
+) -> bool:
+    """A session is green when it has `min_samples` RTH evaluations and every one of
+    them passed all `gates` (all recorded gates when None)."""
+    if hist.empty:
+        return False
+    h = hist.copy()
+    et = pd.to_datetime(h["ts"], utc=True).dt.tz_convert(NY)
+    h = h[(et.dt.time >= time(9, 30)) & (et.dt.time < time(16, 0))]
+    if gates is not None:
+        want = set(gates)
+        h = h[h["gate"].isin(want)]
+        # a gate that was never evaluated cannot count as green
+        if set(h["gate"].unique()) != want:
+            return False
+    per_tick = h.groupby("ts")["ok"].all()
+    return len(per_tick) >= min_samples and bool(per_tick.all())
+
+
+def green_streak(
+    root: str | Path = "data/scorecard",
+    gates: Iterable[str] | None = PHASE5_GATES,
+    min_samples: int = 60,
+    until: date | None = None,
+    holidays: Iterable[date] = (),
+    now: datetime | None = None,
+) -> list[str]:
+    """Consecutive green sessions ending at the latest finished session on record
+    (<= `until`), newest first. Today only counts once RTH has closed at 16:00 ET, so a
+    session in progress neither breaks nor extends the streak. A red day ends it, and
+    so does a weekday without history unless it is listed in `holidays` (there is no
+    exchange calendar here)."""
+    et = (now or datetime.now(UTC)).astimezone(NY)
+    last = et.date() if et.time() >= time(16, 0) else et.date() - timedelta(days=1)
+    if until is not None:
+        last = min(last, until)
+    days = sorted(
+        (p.name for p in Path(root).glob("*") if (p / "gates.parquet").exists()), reverse=True
+    )
+    days = [d for d in days if d <= last.isoformat()]
+    closed = set(holidays)
+    streak: list[str] = []
+    prev: date | None = None
+    for d in days:
+        cur = date.fromisoformat(d)
+        if prev is not None and _weekdays_between(cur, prev, closed) > 0:
+            break  # a trading day without history
+        if not day_green(pd.read_parquet(Path(root) / d / "gates.parquet"), gates, min_samples):
+            break
+        streak.append(d)
+        prev = cur
+    return streak
+
+
+def _weekdays_between(a: date, b: date, holidays: set[date] | None = None) -> int:
+    """Weekdays strictly between a and b (a < b), not counting `holidays`."""
+    n, d = 0, a + timedelta(days=1)
+    while d < b:
+        n += d.weekday() < 5 and d not in (holidays or ())
+        d += timedelta(days=1)
+    return n
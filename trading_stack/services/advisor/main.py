@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import time
+import asyncio
 from datetime import UTC, datetime
 from pathlib import Path
 
 import typer
 
-from trading_stack.llm.advisor import append_proposal, make_proposal
+from trading_stack.llm.advisor import append_proposal, make_proposal_async
+from trading_stack.llm.router import AsyncRouter, get_provider
 
 app = typer.Typer(help="LLM advisor (shadow). Emits strict-JSON param proposals; does NOT trade.")
 
@@ -16,30 +17,31 @@ def main(
     symbol: str = "SPY",
     bars_dir: str = "data/live",
     out_root: str = "data/llm",
-    provider: str = "rules",
+    provider: str = typer.Option("rules", help="Provider, or comma-separated providers"),
     interval_sec: float = 5.0,
     budget_usd: float = 10.0,
+    deadline_sec: float = typer.Option(2.0, help="Per-call deadline before the rules fallback"),
 ) -> None:
     day = datetime.now(UTC).date().isoformat()
     bars_path = Path(bars_dir) / day / f"bars1s_{symbol}.parquet"
     out_path = Path(out_root) / day / f"proposals_{symbol}.parquet"
-    spent = 0.0
-    while True:
-        if spent >= budget_usd:
-            typer.echo(
-                f"[advisor] budget reached ${spent:.2f}/{budget_usd:.2f}. Sleeping 5 minutes."
-            )
-            time.sleep(300)
-            continue
-        if not bars_path.exists():
-            time.sleep(interval_sec)
-            continue
-        proposal = make_proposal(symbol, bars_path, provider_kind=provider)
-        # In shadow mode, cost is provider-dependent; RulesProvider costs 0.0
-        cost = 0.0
-        append_proposal(out_path, proposal, provider, cost)
-        spent += cost
-        time.sleep(interval_sec)
+    # Providers are queried concurrently; over budget or past the deadline, rules answer
+    router = AsyncRouter(
+        [get_provider(k.strip()) for k in provider.split(",") if k.strip()],
+        budget_usd=budget_usd,
+        deadline_sec=deadline_sec,
+    )
+
+    async def run() -> None:
+        while True:
+            if not bars_path.exists():
+                await asyncio.sleep(interval_sec)
+                continue
+            proposal, routed = await make_proposal_async(symbol, bars_path, router)
+            append_proposal(out_path, proposal, routed.provider, routed.cost_usd)
+            await asyncio.sleep(interval_sec)
+
+    asyncio.run(run())
 
 
 if __name__ == "__main__":
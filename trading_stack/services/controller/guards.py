@@ -0,0 +1,252 @@
+"""Controller guards kept as incremental state: every input is a ParquetTail folded into
+trailing windows. A tick stats each file and re-parses only the ones that changed (in
+full, as writers rewrite them), but folds only their new rows into the windows instead
+of rebuilding every window from every file."""
+
+from __future__ import annotations
+
+import math
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Literal
+
+import pandas as pd
+
+from trading_stack.accounting.lots import LotEngine
+from trading_stack.accounting.mtm import MtmReader
+from trading_stack.core.window import Window
+from trading_stack.storage.tail import ParquetTail
+
+_LEDGER_COLS = ["kind", "tag", "event_ts", "symbol", "side", "fill_qty", "avg_px"]
+
+
+def _sorted_utc(s: pd.Series) -> pd.Series:
+    """Windows are fed in time order."""
+    return pd.to_datetime(s, utc=True).dropna().sort_values()
+
+
+class FeedGuard:
+    """Latest live day's bars (age <= 60 s, >= 50% of the last minute covered) or
+    trades (age <= 10 s, >= 20 prints in the last minute; by ingest time when known)."""
+
+    def __init__(self, live_root: str | Path, symbol: str) -> None:
+        self.live_root, self.symbol = Path(live_root), symbol
+        self.day: Path | None = None
+        self._reset(None)
+
+    def _reset(self, day: Path | None) -> None:
+        self.day = day
+        self._bars = ParquetTail(day / f"bars1s_{self.symbol}.parquet", ["ts"]) if day else None
+        self._trades = (
+            ParquetTail(day / f"trades_{self.symbol}.parquet", ["ts", "ingest_ts"]) if day else None
+        )
+        self.bars, self.trades = Window(timedelta(seconds=60)), Window(timedelta(seconds=60))
+        self.last_bar: pd.Timestamp | None = None
+        self.last_trade: pd.Timestamp | None = None
+
+    def update(self, day: Path | None | Literal["scan"] = "scan") -> None:
+        """Fold in new rows; pass the latest live `day` when the caller already knows it
+        (one directory scan shared by many symbols), else it is scanned here."""
+        if day == "scan":
+            days = [p for p in self.live_root.glob("*") if p.is_dir()]
+            day = max(days) if days else None
+        if day != self.day:
+            self._reset(day)
+        if self._bars is not None:
+            new = self._bars.poll()
+            if self._bars.reset:
+                self.bars, self.last_bar = Window(timedelta(seconds=60)), None
+            if not new.empty:
+                self.last_bar = self._fold(self.bars, _sorted_utc(new["ts"]), self.last_bar)
+        if self._trades is not None:
+            new = self._trades.poll()
+            if self._trades.reset:
+                self.trades, self.last_trade = Window(timedelta(seconds=60)), None
+            if not new.empty:
+                tcol = "ingest_ts" if "ingest_ts" in new.columns else "ts"
+                self.last_trade = self._fold(self.trades, _sorted_utc(new[tcol]), self.last_trade)
+
+    @staticmethod
+    def _fold(w: Window, ts: pd.Series, last: pd.Timestamp | None) -> pd.Timestamp | None:
+        for t in ts:
+            w.add(t)
+        if ts.empty:
+            return last
+        top: pd.Timestamp = ts.iloc[-1]
+        return top if last is None else max(last, top)
+
+    def ok(self, now: datetime) -> bool:
+        self.bars.trim(now)
+        self.trades.trim(now)
+        bars_ok = self.last_bar is not None and (
+            (now - self.last_bar).total_seconds() <= 60.0 and len(self.bars) / 60.0 >= 0.50
+        )
+        trades_ok = self.last_trade is not None and (
+            (now - self.last_trade).total_seconds() <= 10.0 and len(self.trades) >= 20
+        )
+        return bars_ok or trades_ok
+
+
+class PnlGuard:
+    """Average-cost realized P&L of `symbol` from today's (UTC) ledger over a trailing
+    window; frozen when its drawdown from the window peak reaches `freeze_dd_pct`."""
+
+    def __init__(
+        self,
+        ledger_root: str | Path,
+        symbol: str,
+        window_min: int = 30,
+        freeze_dd_pct: float = -0.5,
+    ) -> None:
+        self.ledger_root, self.symbol = Path(ledger_root), symbol
+        self.window_min, self.freeze_dd_pct = window_min, freeze_dd_pct
+        self.path: Path | None = None
+        self._reset(None)
+
+    def _reset(self, path: Path | None) -> None:
+        self.path = path
+        self._tail = ParquetTail(path, _LEDGER_COLS) if path else None
+        self._clear()
+
+    def _clear(self) -> None:
+        self._meta: dict[str, tuple[str, str]] = {}
+        self.lots = LotEngine()
+        self.realized = Window(timedelta(minutes=self.window_min))
+
+    def update(self, now: datetime) -> None:
+        path = self.ledger_root / now.date().isoformat() / "ledger.parquet"
+        if path != self.path:
+            self._reset(path)
+        assert self._tail is not None
+        new = self._tail.poll()
+        if self._tail.reset:
+            self._clear()
+        if new.empty or "kind" not in new.columns:
+            return
+        for r in new.to_dict("records"):
+            tag = str(r.get("tag"))
+            sym, side = r.get("symbol"), r.get("side")
+            if r["kind"] == "INTENT" and isinstance(sym, str) and isinstance(side, str):
+                self._meta[tag] = (sym, side)
+            elif r["kind"] == "FILL":
+                if not isinstance(sym, str) or not isinstance(side, str):
+                    sym, side = self._meta.get(tag, (None, None))
+                q, a = float(r.get("fill_qty") or 0.0), float(r.get("avg_px") or 0.0)
+                if sym is None or side is None or q <= 0 or a <= 0:
+                    continue
+                self.lots.on_fill(tag, sym, side, q, a)
+                if sym == self.symbol and not pd.isna(r.get("event_ts")):
+                    t = pd.Timestamp(r["event_ts"])
+                    t = t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+                    self.realized.add(t, self.lots.realized(sym, "avg"))
+
+    def ok(self, now: datetime) -> bool:
+        """True when NOT frozen; neutral (True) under 10 realized points in the window."""
+        self.realized.trim(now)
+        if len(self.realized) < 10:
+            return True
+        equity = float(os.environ.get("EQUITY_USD", "30000"))
+        if equity <= 0:
+            return True
+        dd_pct = (self.realized.last - self.realized.max) / equity * 100.0
+        return dd_pct > float(self.freeze_dd_pct)
+
+
+class LlmGuard:
+    """Proposals seen and non-zero applied deltas over a trailing window, plus the
+    newest proposal's threshold."""
+
+    def __init__(
+        self, proposals_path: str | Path, applied_path: str | Path, window_min: int = 15
+    ) -> None:
+        self._proposals = ParquetTail(proposals_path, ["ts", "signal.threshold_bps"])
+        self._applied = ParquetTail(applied_path, ["ts", "delta_bps"])
+        self.span = timedelta(minutes=window_min)
+        self.proposals, self.applied = Window(self.span), Window(self.span)
+
+    def update(self) -> None:
+        new = self._proposals.poll()
+        if self._proposals.reset:
+            self.proposals = Window(self.span)
+        if not new.empty:
+            df = new.assign(ts=pd.to_datetime(new["ts"], utc=True)).sort_values("ts", kind="stable")
+            col = "signal.threshold_bps"
+            vals = df[col].astype(float) if col in df.columns else pd.Series(math.nan, df.index)
+            for t, v in zip(df["ts"], vals, strict=True):
+                self.proposals.add(t, float(v))
+        new = self._applied.poll()
+        if self._applied.reset:
+            self.applied = Window(self.span)
+        if not new.empty and "delta_bps" in new.columns:
+            nz = new[new["delta_bps"].abs() > 0]
+            for t in _sorted_utc(nz["ts"]):
+                self.applied.add(t)
+
+    def add_proposal(self, ts: datetime, threshold_bps: float | None) -> None:
+        """Fold in a row this process writes itself, instead of tailing it back."""
+        self.proposals.add(ts, math.nan if threshold_bps is None else float(threshold_bps))
+
+    def add_applied(self, ts: datetime, delta_bps: float) -> None:
+        if delta_bps:
+            self.applied.add(ts)
+
+    def seen(self, now: datetime) -> int:
+        self.proposals.trim(now)
+        return len(self.proposals)
+
+    def latest_threshold(self) -> float | None:
+        """Newest proposal's threshold; None when it has none (or nothing was seen)."""
+        if not self.proposals.points:
+            return None
+        v = self.proposals.last
+        return None if math.isnan(v) else v
+
+    def rate_ok(self, now: datetime, max_accept_rate: float = 0.30) -> bool:
+        seen = self.seen(now)
+        self.applied.trim(now)
+        return seen == 0 or len(self.applied) / seen <= max_accept_rate
+
+
+class GuardState:
+    """All controller guards; call `update(now)` once per tick, then read them."""
+
+    def __init__(
+        self,
+        symbol: str,
+        live_root: str | Path,
+        ledger_root: str | Path,
+        proposals_path: str | Path,
+        applied_path: str | Path,
+        mtm: MtmReader | None = None,
+        max_accept_rate: float = 0.30,
+        window_min: int = 15,
+    ) -> None:
+        self.feed = FeedGuard(live_root, symbol)
+        self.pnl = PnlGuard(ledger_root, symbol)
+        self.llm = LlmGuard(proposals_path, applied_path, window_min)
+        self.mtm = mtm
+        self.max_accept_rate = max_accept_rate
+
+    def update(
+        self, now: datetime, live_day: Path | None | Literal["scan"] = "scan", llm: bool = True
+    ) -> None:
+        """`llm=False` skips the proposals/applied files when the caller feeds those rows
+        through `self.llm.add_proposal` / `add_applied` itself."""
+        self.feed.update(live_day)
+        self.pnl.update(now)
+        if llm:
+            self.llm.update()
+
+    def healthy(self, now: datetime) -> bool:
+        return self.feed.ok(now)
+
+    def not_frozen(self, now: datetime) -> bool:
+        """A fresh mark-to-market state (mtmd) wins over the realized-P&L window."""
+        state = self.mtm.get(now) if self.mtm is not None else None
+        if state is not None:
+            return float(state["drawdown_pct"]) > float(self.pnl.freeze_dd_pct)
+        return self.pnl.ok(now)
+
+    def rate_ok(self, now: datetime) -> bool:
+        return self.llm.rate_ok(now, self.max_accept_rate)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 import time
 from datetime import UTC, datetime
 from pathlib import Path
@@ -10,23 +11,156 @@ from pathlib import Path
 import pandas as pd
 import typer
 
+from trading_stack.core.latency import maybe_dump, span, with_trace
 from trading_stack.core.schemas import Bar1s
 from trading_stack.engine.decision_engine import DecisionEngine
 from trading_stack.ipc.sqlite_queue import connect, enqueue
+from trading_stack.params.runtime import RuntimeParamsCache
+from trading_stack.risk.killswitch import get_killswitch
 from trading_stack.storage.ledger import append_ledger
+from trading_stack.storage.tail import ParquetTail
 
 app = typer.Typer()
 
 
-def _load_runtime_threshold(params_root: str, symbol: str, default_bps: float = 0.5) -> float:
-    p = Path(params_root) / f"runtime_{symbol}.json"
-    if not p.exists():
-        return default_bps
-    try:
-        d = json.loads(p.read_text(encoding="utf-8"))
-        return float(d.get("signal_threshold_bps", default_bps))
-    except Exception:
-        return default_bps
+class SymbolRunner:
+    """
+    Tails one symbol's bars file, runs the decision engine and enqueues intents.
+
+    A new runner (e.g. a restarted shard) resumes after the bar of the last INTENT_SHADOW
+    it wrote: bars up to that one only warm the strategy, so nothing is enqueued or
+    ledgered twice and the rolling state matches an uninterrupted run.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        con: sqlite3.Connection,
+        bars_dir: str = "data/live",
+        shadow_ledger_root: str = "data/exec",
+        params_root: str = "data/params",
+        symbol_whitelist: set[str] | None = None,
+    ) -> None:
+        self.symbol = symbol
+        self.con = con
+        self.bars_dir = bars_dir
+        self.shadow_ledger_root = shadow_ledger_root
+        self.params_root = params_root
+        self.eng = DecisionEngine(
+            symbol=symbol,
+            threshold=0.5,
+            max_notional=2000,
+            price_band_bps=150,
+            symbol_whitelist=symbol_whitelist,
+        )
+        self.params = RuntimeParamsCache(
+            Path(params_root) / f"runtime_{symbol}.json", symbol, default_bps=0.5
+        )
+        self.last_ts: datetime | None = None
+        self.resume_ts: datetime | None = None
+        self._tail: ParquetTail | None = None
+        self._seeded = False
+
+    def latest_bars_path(self) -> str | None:
+        """Find the latest bars file for today."""
+        days = sorted([p for p in Path(self.bars_dir).glob("*") if p.is_dir()])
+        return str(days[-1] / f"bars1s_{self.symbol}.parquet") if days else None
+
+    def _seed(self, bars_path: Path) -> None:
+        """Bar ts of this symbol's newest INTENT_SHADOW in the shadow ledger, if any."""
+        self._seeded = True
+        days = {bars_path.parent.name, datetime.now(UTC).date().isoformat()}
+        seen: list[pd.Timestamp] = []
+        for day in sorted(days):
+            path = Path(self.shadow_ledger_root) / day / "ledger.parquet"
+            if not path.exists():
+                continue
+            df = pd.read_parquet(path)
+            if "bar_ts" not in df.columns:
+                continue
+            rows = df[(df["kind"] == "INTENT_SHADOW") & (df["symbol"] == self.symbol)]
+            ts = pd.to_datetime(rows["bar_ts"], utc=True).dropna()
+            if not ts.empty:
+                seen.append(ts.max())
+        self.resume_ts = max(seen).to_pydatetime() if seen else None
+
+    def poll(self) -> int:
+        """Process bars appended since the last poll; return how many were processed."""
+        p = self.latest_bars_path()
+        if not p or not Path(p).exists():
+            return 0
+        if self._tail is None or self._tail.path != Path(p):
+            self._tail = ParquetTail(p)  # new day: start from its first row
+        if not self._seeded:
+            self._seed(Path(p))
+        with span("engined.read"):
+            read_ns = time.time_ns()  # origin for bars without feedd's ingest_ts
+            df = self._tail.poll()
+            if df.empty:
+                return 0
+            df["ts"] = pd.to_datetime(df["ts"], utc=True)
+            df = df.sort_values("ts")
+
+            # Process only new bars
+            new = df if self.last_ts is None else df[df["ts"] > self.last_ts]
+
+        n = 0
+        for _, r in new.iterrows():
+            bar = Bar1s.model_validate(r.to_dict())
+            if self.resume_ts is not None and bar.ts <= self.resume_ts:
+                self.eng.on_bar(bar)  # warm-up only: handled before the restart
+                self.last_ts = bar.ts
+                continue
+            n += 1
+            # Latency origin carried on intent tags: when the bar's last trade reached feedd
+            ing = r.get("ingest_ts")
+            origin_ns = read_ns if ing is None or pd.isna(ing) else int(pd.Timestamp(ing).value)
+
+            # Hot-reload threshold before each decision (cached; re-read only on change)
+            self.eng.strategy.th = self.params.get().signal_threshold_bps  # in bps units
+
+            for o in self.eng.on_bar(bar):
+                # Idempotent per bar, symbol and signal: the queue drops repeated tags, so
+                # the strategy's own tag ("mr_long") alone would let only one intent through
+                tag = f"{o.ts:%Y%m%dT%H%M%S}_{o.symbol}_{o.tag or o.side}"
+                payload = json.loads(o.model_dump_json())
+                payload["tag"] = with_trace(tag, origin_ns)
+
+                # Enqueue intent
+                with span("engined.enqueue"):
+                    enqueue(self.con, "order_intents", tag, payload)
+
+                # Write shadow ledger entry
+                shadow_ts = datetime.now(UTC)
+                day = shadow_ts.date().isoformat()
+                shadow_path = f"{self.shadow_ledger_root}/{day}/ledger.parquet"
+                append_ledger(
+                    shadow_path,
+                    [
+                        {
+                            "ts": shadow_ts,
+                            "kind": "INTENT_SHADOW",
+                            "tag": tag,
+                            "symbol": o.symbol,
+                            "side": o.side,
+                            "qty": o.qty,
+                            "limit": o.limit,
+                            "bar_ts": bar.ts,
+                        }
+                    ],
+                )
+
+                typer.echo(f"Enqueued intent: {tag}")
+
+            self.last_ts = bar.ts
+        return n
+
+    def lag_sec(self, now: datetime | None = None) -> float | None:
+        """Seconds between now and the last processed bar, or None before the first bar."""
+        if self.last_ts is None:
+            return None
+        now = now or datetime.now(UTC)
+        return (now - self.last_ts).total_seconds()
 
 
 @app.command()
@@ -40,70 +174,25 @@ def main(
 ) -> None:
     """Run engine live loop, tailing bars and emitting order intents."""
     con = connect(queue)
-    eng = DecisionEngine(symbol=symbol, threshold=0.5, max_notional=2000, price_band_bps=150)
-    last_ts = None
+    runner = SymbolRunner(
+        symbol,
+        con,
+        bars_dir=bars_dir,
+        shadow_ledger_root=shadow_ledger_root,
+        params_root=params_root,
+    )
+
+    get_killswitch(runner.eng.risk.killswitch_path, watch=True).install_signal_handlers()
 
     typer.echo(f"Starting engine live daemon for {symbol}, tailing {bars_dir}")
     typer.echo(f"Queue: {queue}, poll interval: {poll_sec}s")
 
-    def latest_bars_path() -> str | None:
-        """Find the latest bars file for today."""
-        days = sorted([p for p in Path(bars_dir).glob("*") if p.is_dir()])
-        return str(days[-1] / f"bars1s_{symbol}.parquet") if days else None
-
     while True:
         try:
-            p = latest_bars_path()
-            if p and Path(p).exists():
-                df = pd.read_parquet(p)
-                df["ts"] = pd.to_datetime(df["ts"], utc=True)
-                df = df.sort_values("ts")
-
-                # Process only new bars
-                new = df if last_ts is None else df[df["ts"] > last_ts]
-
-                for _, r in new.iterrows():
-                    bar = Bar1s.model_validate(r.to_dict())
-                    
-                    # Hot-reload threshold before each decision
-                    th_bps = _load_runtime_threshold(params_root, symbol, default_bps=0.5)
-                    eng.strategy.th = th_bps  # MeanReversion1S.th is in bps units
-                    
-                    intents = eng.on_bar(bar)
-
-                    for o in intents:
-                        # Generate idempotent tag
-                        tag = o.tag or f"{o.ts:%Y%m%dT%H%M%S}_{o.symbol}_{o.side}_{int(o.qty)}"
-                        payload = json.loads(o.model_dump_json())
-
-                        # Enqueue intent
-                        enqueue(con, "order_intents", tag, payload)
-
-                        # Write shadow ledger entry
-                        shadow_ts = datetime.now(UTC)
-                        day = shadow_ts.date().isoformat()
-                        shadow_path = f"{shadow_ledger_root}/{day}/ledger.parquet"
-                        append_ledger(
-                            shadow_path,
-                            [
-                                {
-                                    "ts": shadow_ts,
-                                    "kind": "INTENT_SHADOW",
-                                    "tag": tag,
-                                    "symbol": o.symbol,
-                                    "side": o.side,
-                                    "qty": o.qty,
-                                    "limit": o.limit,
-                                }
-                            ],
-                        )
-
-                        typer.echo(f"Enqueued intent: {tag}")
-
-                    last_ts = bar.ts
-
+            runner.poll()
         except Exception as e:
             typer.echo(f"Error processing bars: {e}", err=True)
+        maybe_dump("engined")
 
         time.sleep(poll_sec)
 
@@ -0,0 +1,173 @@
+"""Sharded engine supervisor - runs many symbols across a pool of worker processes."""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import time
+from datetime import UTC, datetime
+from multiprocessing.sharedctypes import SynchronizedArray
+from multiprocessing.synchronize import Event
+from pathlib import Path
+
+import pandas as pd
+import typer
+
+from trading_stack.core.latency import dump, maybe_dump
+from trading_stack.ipc.sqlite_queue import connect
+from trading_stack.risk.killswitch import get_killswitch
+from trading_stack.services.engined.live import SymbolRunner
+
+app = typer.Typer(help="engined supervisor: per-symbol shards across worker processes")
+
+
+def shard_symbols(symbols: list[str], n_shards: int) -> list[list[str]]:
+    """Deal the sorted, de-duplicated universe round-robin into at most n_shards shards."""
+    uniq = sorted({s.strip().upper() for s in symbols if s.strip()})
+    n = max(1, min(n_shards, len(uniq)))
+    return [uniq[i::n] for i in range(n)]
+
+
+def _shard_worker(
+    shard_id: int,
+    symbols: list[str],
+    universe: list[str],
+    bars_dir: str,
+    queue: str,
+    shadow_ledger_root: str,
+    params_root: str,
+    poll_sec: float,
+    lag: SynchronizedArray[float],
+    processed: SynchronizedArray[int],
+    stop: Event,
+) -> None:
+    # Each process needs its own sqlite connection; WAL serializes concurrent writers.
+    con = connect(queue)
+    runners = [
+        SymbolRunner(
+            sym,
+            con,
+            bars_dir=bars_dir,
+            shadow_ledger_root=shadow_ledger_root,
+            params_root=params_root,
+            symbol_whitelist=set(universe),
+        )
+        for sym in symbols
+    ]
+    if runners:
+        get_killswitch(runners[0].eng.risk.killswitch_path, watch=True)
+    while not stop.is_set():
+        n = 0
+        for r in runners:
+            try:
+                n += r.poll()
+            except Exception as e:
+                typer.echo(f"[shard {shard_id}] {r.symbol}: error processing bars: {e}", err=True)
+        now = datetime.now(UTC)
+        lags = [x for x in (r.lag_sec(now) for r in runners) if x is not None]
+        lag[shard_id] = max(lags) if lags else -1.0
+        processed[shard_id] += n
+        maybe_dump(f"engined-shard-{shard_id}")
+        stop.wait(poll_sec)
+    dump(f"engined-shard-{shard_id}")
+    con.close()
+
+
+def _append_lag(path: Path, rows: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df_new = pd.DataFrame(rows)
+    if path.exists():
+        df_new = pd.concat([pd.read_parquet(path), df_new], ignore_index=True)
+    df_new.to_parquet(path, index=False)
+
+
+@app.command()
+def main(
+    symbols: str = "SPY",
+    workers: int = 0,
+    bars_dir: str = "data/live",
+    queue: str = "data/queue.db",
+    poll_sec: float = 1.0,
+    shadow_ledger_root: str = "data/exec",
+    params_root: str = "data/params",
+    metrics_root: str = "data/engine",
+    metrics_sec: float = 15.0,
+    heartbeat_path: str = "RUN/heartbeat/engined.hb",
+) -> None:
+    """Run the universe across N shard processes, restarting any that die."""
+    universe = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+    shards = shard_symbols(universe, workers or mp.cpu_count())
+    n = len(shards)
+    lag = mp.Array("d", [-1.0] * n)
+    processed = mp.Array("q", [0] * n)
+    stop = mp.Event()
+
+    def spawn(i: int) -> mp.Process:
+        p = mp.Process(
+            target=_shard_worker,
+            name=f"engined-shard-{i}",
+            args=(
+                i,
+                shards[i],
+                universe,
+                bars_dir,
+                queue,
+                shadow_ledger_root,
+                params_root,
+                poll_sec,
+                lag,
+                processed,
+                stop,
+            ),
+            daemon=True,
+        )
+        p.start()
+        return p
+
+    procs = [spawn(i) for i in range(n)]
+    for i, shard in enumerate(shards):
+        typer.echo(f"[supervisor] shard {i}: {','.join(shard)}")
+
+    hb = Path(heartbeat_path)
+    hb.parent.mkdir(parents=True, exist_ok=True)
+    next_metrics = time.monotonic() + metrics_sec
+    try:
+        while True:
+            for i, p in enumerate(procs):
+                if not p.is_alive():
+                    typer.echo(
+                        f"[supervisor] shard {i} exited ({p.exitcode}); restarting", err=True
+                    )
+                    procs[i] = spawn(i)
+            hb.touch()
+            if time.monotonic() >= next_metrics:
+                now = datetime.now(UTC)
+                rows = [
+                    {
+                        "ts": now,
+                        "shard": i,
+                        "symbols": ",".join(shards[i]),
+                        "lag_sec": lag[i] if lag[i] >= 0 else None,
+                        "bars_processed": int(processed[i]),
+                    }
+                    for i in range(n)
+                ]
+                _append_lag(Path(metrics_root) / now.date().isoformat() / "shard_lag.parquet", rows)
+                typer.echo(
+                    "[supervisor] lag_sec "
+                    + " ".join(
+                        f"{r['shard']}={'NA' if r['lag_sec'] is None else r['lag_sec']}"
+                        for r in rows
+                    )
+                )
+                next_metrics = time.monotonic() + metrics_sec
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        typer.echo("Shutting down...")
+    finally:
+        stop.set()
+        for p in procs:
+            p.join(timeout=5.0)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import os
-from datetime import UTC, datetime, timedelta
+import time
+from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
+from typing import cast, get_args
 
+import numpy as np
+import pandas as pd
 import typer
 
+from trading_stack.adapters.fake.adapter import FakeAdapter, FakeConfig, FillModel
 from trading_stack.adapters.ibkr.adapter import IBKRAdapter
-from trading_stack.core.schemas import Bar1s, NewOrder
+from trading_stack.core.schemas import NewOrder
 from trading_stack.execution.state_machine import ExecState
+from trading_stack.ipc.sqlite_queue import connect, enqueue
+from trading_stack.risk.gate import RiskConfig
+from trading_stack.services.execd.worker import ExecPipeline
 from trading_stack.storage.ledger import append_ledger
-from trading_stack.storage.parquet_store import read_events
+from trading_stack.tca.arrival import ArrivalPriceIndex
 from trading_stack.tca.metrics import TCA
 
 app = typer.Typer(help="execd: IBKR paper adapter CLI (one-shot & sanity)")
@@ -52,18 +62,15 @@ def ib_handshake() -> None:
     typer.echo("IBKR handshake OK")
 
 
+_ARRIVALS = ArrivalPriceIndex()
+
+
 def _arrival_from_bars(bars_path: str | None, ts: datetime, symbol: str) -> float | None:
+    """Close of the last bar with ts <= intent ts, via the shared arrival index."""
     if not bars_path:
         return None
-    p = Path(bars_path)
-    if not p.exists():
-        return None
-    bars = read_events(p, Bar1s)
-    # choose the last bar with ts <= intent ts
-    prior = [b for b in bars if b.symbol == symbol and b.ts <= ts]
-    if not prior:
-        return None
-    return prior[-1].close
+    _ARRIVALS.refresh(bars_path)
+    return _ARRIVALS.arrival(symbol, ts, "last")
 
 
 @app.command("one-shot")
@@ -119,50 +126,48 @@ def one_shot(  # noqa: B008
     state.on_ack(res.ack_ts)
     append_ledger(ledger_path, [{"ts": ts, "event_ts": res.ack_ts, "kind": "ACK", "tag": tag}])
 
-    # Wait for fills briefly, then cancel if needed
-    prev_n = 0
-    end_by = _now() + timedelta(seconds=ttl_sec)
+    # Follow fills from broker callbacks until the TTL, then cancel if needed
     trade = res.trade
 
-    while _now() < end_by:
-        # drain updates
-        trade.contract  # nudge ib_insync  # noqa: B018
-        ib.ib.waitOnUpdate(timeout=0.25)
-
-        fills = list(trade.fills or [])
-        if len(fills) > prev_n:
-            newfills = fills[prev_n:]
-            for f in newfills:
-                q = float(getattr(f.execution, "shares", 0) or 0)
-                px = float(getattr(f.execution, "price", 0.0) or getattr(f, "price", 0.0) or 0.0)
-                if q > 0 and px > 0:
-                    state.on_partial(_now(), px, q)
-                    append_ledger(
-                        ledger_path,
-                        [
-                            {
-                                "ts": ts,
-                                "event_ts": _now(),
-                                "kind": "FILL",
-                                "tag": tag,
-                                "fill_qty": q,
-                                "avg_px": state.avg_fill_px,
-                                "symbol": symbol,
-                                "side": side.value,
-                            }
-                        ],
-                    )
-            prev_n = len(fills)
-
-        if trade.isDone():
-            break
+    async def follow() -> None:
+        async for ev in ib.events(tag):
+            if ev.kind in ("PARTIAL", "FILL"):
+                state.on_partial(ev.ts, ev.px, ev.qty)
+                row = {
+                    "ts": ts,
+                    "event_ts": ev.ts,
+                    "kind": "FILL",
+                    "tag": tag,
+                    "fill_qty": ev.qty,
+                    "avg_px": state.avg_fill_px,
+                    "symbol": symbol,
+                    "side": side.value,
+                }
+            elif ev.kind == "CANCEL":
+                state.on_cancel(ev.ts)
+                row = {"ts": ts, "event_ts": ev.ts, "kind": "CANCEL", "tag": tag}
+            elif ev.kind == "REJ":
+                state.on_rej(ev.ts, ev.reason or "")
+                row = {"ts": ts, "event_ts": ev.ts, "kind": "REJ", "tag": tag, "reason": ev.reason}
+            else:
+                continue
+            append_ledger(ledger_path, [row])
+
+    def follow_for(sec: float) -> None:
+        with contextlib.suppress(TimeoutError):
+            ib.ib.run(asyncio.wait_for(follow(), sec))
+
+    follow_for(ttl_sec)
 
     # If not fully filled by TTL, cancel
-    if state.state != "FILL" and not trade.isDone():
+    if state.state in ("ACK", "PARTIAL"):
         ib.cancel(trade)
-        ib.ib.waitOnUpdate(timeout=2.0)
-        state.on_cancel(_now())
-        append_ledger(ledger_path, [{"ts": ts, "event_ts": _now(), "kind": "CANCEL", "tag": tag}])
+        follow_for(2.0)
+        if state.state != "CANCEL" and not trade.isDone():
+            state.on_cancel(_now())
+            append_ledger(
+                ledger_path, [{"ts": ts, "event_ts": _now(), "kind": "CANCEL", "tag": tag}]
+            )
 
     ib.disconnect()
 
@@ -232,5 +237,81 @@ def sanity_cancel(
     typer.echo(f"[sanity-cancel] tag={tag} ACK+Cancel recorded")
 
 
+@app.command("bench")
+def bench(
+    n: int = typer.Option(500, help="Intents to push through the pipeline"),
+    concurrency: int = typer.Option(8),
+    symbol: str = typer.Option("SPY"),
+    limit: float = typer.Option(500.0, help="Limit price for every intent"),
+    ack_ms: float = typer.Option(5.0, help="Median ack latency (lognormal)"),
+    ack_sigma: float = typer.Option(0.5),
+    reject_rate: float = typer.Option(0.0),
+    fill_model: str = typer.Option("instant", help="instant | bars | none"),
+    partials: int = typer.Option(1),
+    bars_path: str | None = typer.Option(None, help="Bars parquet for fill_model=bars"),
+    seed: int = typer.Option(7),
+    out_dir: str = typer.Option("data/bench/execd", help="Per-run queue and ledger root"),
+) -> None:
+    """Benchmark the execd pipeline against the fake broker: throughput and ack tails."""
+    if fill_model not in get_args(FillModel):
+        raise typer.BadParameter(
+            f"fill model must be one of {', '.join(get_args(FillModel))}",
+            param_hint="--fill-model",
+        )
+    run_dir = Path(out_dir) / _now().strftime("%Y%m%dT%H%M%S")
+    con = connect(run_dir / "queue.db")
+    ts = _now()
+    for i in range(n):
+        tag = f"bench_{i:06d}"
+        o = NewOrder(
+            symbol=symbol, side="BUY" if i % 2 == 0 else "SELL", qty=1, limit=limit, tag=tag, ts=ts
+        )
+        enqueue(con, "order_intents", tag, o.model_dump(mode="json"))
+    cfg = FakeConfig(
+        ack_ms=ack_ms,
+        ack_sigma=ack_sigma,
+        reject_rate=reject_rate,
+        fill_model=cast(FillModel, fill_model),
+        partials=partials,
+        bars_path=bars_path,
+        seed=seed,
+    )
+    risk = RiskConfig(
+        max_notional=limit * 10,
+        price_band_bps=150,
+        symbol_whitelist={symbol},
+        max_open_orders=n + 1,
+        killswitch_path=str(run_dir / "HALT"),
+    )
+    ledger_root = str(run_dir / "exec")
+
+    async def run() -> None:
+        fake = FakeAdapter(cfg)
+        await fake.connect_async()
+        pipe = ExecPipeline(con, fake, risk, ledger_root, concurrency=concurrency, poll_sec=0.005)
+        await pipe.run(max_loop=50)
+        fake.disconnect()
+
+    t0 = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - t0 - 50 * 0.005  # drop the idle tail
+
+    df = pd.concat([pd.read_parquet(p) for p in Path(ledger_root).glob("*/ledger.parquet")])
+    counts = df.groupby("kind").size().to_dict()
+    acks = df[df["kind"] == "ACK"]
+    lat_ms = (
+        pd.to_datetime(acks["event_ts"], utc=True) - pd.to_datetime(acks["ts"], utc=True)
+    ).dt.total_seconds().to_numpy() * 1e3
+    typer.echo(f"[bench] {n} intents in {elapsed:.3f}s -> {n / max(elapsed, 1e-9):.0f} intents/s")
+    typer.echo(f"[bench] ledger rows {counts}")
+    if lat_ms.size:
+        p50, p90, p99 = np.percentile(lat_ms, [50, 90, 99])
+        typer.echo(
+            f"[bench] intent->ack ms p50={p50:.2f} p90={p90:.2f} p99={p99:.2f} "
+            f"max={lat_ms.max():.2f}"
+        )
+    typer.echo(f"[bench] artifacts in {run_dir}")
+
+
 if __name__ == "__main__":
     app()
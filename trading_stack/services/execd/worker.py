@@ -2,17 +2,32 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
+import sqlite3
 import time
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
 
 import typer
 
-from trading_stack.adapters.ibkr.adapter import IBKRAdapter
+from trading_stack.adapters.fake.adapter import FakeAdapter, FakeConfig
+from trading_stack.adapters.ibkr.adapter import TERMINAL, IBKRAdapter, OrderEvent
+from trading_stack.core.latency import (
+    maybe_dump,
+    record,
+    record_duration,
+    span,
+    split_trace,
+)
 from trading_stack.core.schemas import NewOrder
+from trading_stack.execution.state_machine import ExecState
+from trading_stack.execution.store import OrderStateStore
 from trading_stack.ipc.sqlite_queue import ack, connect, nack, reserve
+from trading_stack.risk.book import RiskBook
 from trading_stack.risk.gate import RiskConfig, pretrade_check
+from trading_stack.risk.killswitch import get_killswitch
 from trading_stack.storage.ledger import append_ledger, read_ledger
 
 app = typer.Typer()
@@ -38,12 +53,267 @@ def check_idempotency(tag: str, ledger_root: str) -> bool:
     return not df[df["tag"] == tag].empty
 
 
+class ExecPipeline:
+    """
+    Keeps up to `concurrency` intents in flight between reserve and broker ACK. Each
+    intent runs as its own task: ledger INTENT, risk check, place, ACK row and queue ack.
+    Once acknowledged, the order leaves the concurrency budget and a watcher follows the
+    adapter's per-tag event stream through ExecState to FILL/CANCEL, so a slow ack never
+    stalls the orders behind it. With a `store`, every transition is persisted first so
+    `recover` can resume watching live orders after a restart.
+    """
+
+    def __init__(
+        self,
+        con: sqlite3.Connection,
+        adapter: Any,
+        risk: RiskConfig,
+        ledger_root: str,
+        book: RiskBook | None = None,
+        concurrency: int = 4,
+        poll_sec: float = 0.05,
+        store: OrderStateStore | None = None,
+    ) -> None:
+        self.con = con
+        self.adapter = adapter
+        self.risk = risk
+        self.ledger_root = ledger_root
+        self.book = book or RiskBook()
+        self.concurrency = concurrency
+        self.poll_sec = poll_sec
+        self.store = store
+        self.states: dict[str, ExecState] = {}
+        self._placing: set[asyncio.Task[None]] = set()
+        self._watching: set[asyncio.Task[None]] = set()
+
+    def _log(self, ts: datetime, rows: list[dict[str, Any]]) -> None:
+        append_ledger(f"{self.ledger_root}/{ts.date().isoformat()}/ledger.parquet", rows)
+        for r in rows:
+            self.book.apply(r)
+
+    def _transition(
+        self,
+        state: ExecState,
+        kind: str,
+        ts: datetime,
+        px: float = 0.0,
+        qty: float = 0.0,
+        reason: str = "",
+        **extra: Any,
+    ) -> None:
+        if self.store is not None:  # persists, then applies to the same `state` object
+            self.store.record(state.tag, kind, ts, px=px, qty=qty, reason=reason, **extra)
+        else:
+            state.apply(kind, ts, px, qty, reason)
+
+    async def recover(self) -> tuple[list[str], list[str], list[str]]:
+        """Rebuild live orders from the store and reconcile them against the broker:
+        orders it no longer has open get the executions and cancel/reject it reports
+        (ledgered like live events), the rest are watched again. Returns (closed,
+        unresolved, orphan) tags; unresolved ones stay live in the store."""
+        if self.store is None:
+            return [], [], []
+        live = self.store.recover()
+        broker_open = self.adapter.open_order_tags()
+        gone = set(live) - broker_open
+        completed = await self.adapter.completed_async(gone) if gone else {}
+        events, unresolved, orphans = self.store.reconcile(broker_open, completed)
+        closed = []
+        for ev in events:
+            self._on_event(live[ev.tag], ev)
+            if ev.kind in TERMINAL:
+                closed.append(ev.tag)
+        for tag, state in self.store.states.items():
+            if tag in broker_open:
+                self.states[tag] = state
+                self.adapter.adopt(tag, state.qty, state.fill_qty)
+                self._spawn_watch(state)
+        return closed, unresolved, orphans
+
+    def _spawn_watch(self, state: ExecState) -> None:
+        task = asyncio.create_task(self._watch(state))
+        self._watching.add(task)
+        task.add_done_callback(self._watching.discard)
+
+    async def run(self, max_loop: int = 0) -> None:
+        """Reserve intents while there is concurrency budget; stop after `max_loop` idle
+        polls (0 = forever) once in-flight placements have settled."""
+        sem = asyncio.Semaphore(self.concurrency)
+        loops = 0
+        try:
+            while True:
+                await sem.acquire()
+                maybe_dump("execd")
+                try:
+                    row = reserve(self.con, "order_intents")
+                except Exception as e:
+                    typer.echo(f"Worker error: {e}", err=True)
+                    row = None
+                if not row:
+                    sem.release()
+                    loops += 1
+                    if max_loop and loops >= max_loop:
+                        break
+                    await asyncio.sleep(self.poll_sec)
+                    continue
+                task = asyncio.create_task(self._process(row, sem))
+                self._placing.add(task)
+                task.add_done_callback(self._placing.discard)
+            if self._placing:
+                await asyncio.gather(*self._placing, return_exceptions=True)
+        finally:
+            for t in self._watching:
+                t.cancel()
+
+    async def _process(self, row: dict[str, Any], sem: asyncio.Semaphore) -> None:
+        try:
+            placed = await self._place(row)
+        except Exception as e:
+            typer.echo(f"Worker error: {e}", err=True)
+            placed = None
+        finally:
+            sem.release()
+        if placed is not None:
+            self._spawn_watch(placed)
+
+    async def _place(self, row: dict[str, Any]) -> ExecState | None:
+        # Extract order details
+        tag, payload = row["tag"], row["payload"]
+        ts = datetime.now(UTC)
+        order = NewOrder.model_validate(payload)
+        # The intent's tag may carry the bar's feedd ingest time for e2e stitching
+        _, origin_ns = split_trace(order.tag)
+        order = order.model_copy(update={"tag": tag})
+        if row.get("enqueued_ts"):
+            wait = ts - datetime.fromisoformat(row["enqueued_ts"])
+            record_duration("queue.wait", int(wait.total_seconds() * 1e9))
+
+        typer.echo(f"Processing intent: {tag}")
+
+        # Check idempotency
+        if check_idempotency(tag, self.ledger_root):
+            typer.echo(f"Order {tag} already processed, skipping")
+            ack(self.con, row["id"])
+            return None
+
+        # Log intent received
+        self._log(
+            ts,
+            [
+                {
+                    "ts": ts,
+                    "kind": "INTENT",
+                    "tag": tag,
+                    "symbol": order.symbol,
+                    "side": order.side,
+                    "qty": order.qty,
+                    "limit": order.limit,
+                }
+            ],
+        )
+
+        # Risk pre-check (using limit as proxy for last price)
+        with span("execd.risk"):
+            if order.limit:
+                self.book.mark(order.symbol, order.limit)
+            ok, reason = pretrade_check(order, order.limit or 0.0, self.risk, self.book)
+
+        if not ok:
+            typer.echo(f"Risk check failed: {reason}", err=True)
+            self._log(ts, [{"ts": ts, "kind": "REJ", "tag": tag, "reason": reason}])
+            nack(self.con, row["id"], dead=True)
+            return None
+
+        # Place order; counts against max_open_orders from here on
+        self.book.on_submit(tag)
+        if self.store is not None:
+            self.store.record(tag, "NEW", ts, symbol=order.symbol, side=order.side, qty=order.qty)
+            state = self.store.states[tag]
+        else:
+            state = ExecState(
+                tag=tag,
+                symbol=order.symbol,
+                side=order.side,
+                qty=order.qty,
+                remaining=order.qty,
+                created_ts=ts,
+            )
+        self.states[tag] = state
+        try:
+            t_place = time.perf_counter_ns()
+            res = await self.adapter.place_async(order)
+            record("execd.place", t_place)
+        except Exception as e:
+            typer.echo(f"Failed to place order: {e}", err=True)
+            self._transition(state, "REJ", datetime.now(UTC), reason=str(e))
+            self.states.pop(tag, None)
+            self._log(ts, [{"ts": ts, "kind": "REJ", "tag": tag, "reason": str(e)}])
+            # Recoverable error - return to queue
+            nack(self.con, row["id"], dead=False)
+            return None
+
+        if origin_ns is not None:
+            record_duration("e2e.ingest_to_ack", int(res.ack_ts.timestamp() * 1e9) - origin_ns)
+        t_ack = time.perf_counter_ns()
+        order_id = getattr(res.trade.order, "orderId", None)
+        self._transition(state, "ACK", res.ack_ts, order_id=order_id)
+        self._log(
+            ts,
+            [{"ts": ts, "event_ts": res.ack_ts, "kind": "ACK", "tag": tag, "order_id": order_id}],
+        )
+        typer.echo(f"Order placed: {tag} -> order_id={order_id}")
+        ack(self.con, row["id"])
+        record("execd.ack", t_ack)
+        return state
+
+    async def _watch(self, state: ExecState) -> None:
+        """Follow an acknowledged order to completion from the adapter's event stream."""
+        try:
+            async for ev in self.adapter.events(state.tag):
+                self._on_event(state, ev)
+        finally:
+            self.states.pop(state.tag, None)
+
+    def _on_event(self, state: ExecState, ev: OrderEvent) -> None:
+        """Apply one broker event and write its FILL/CANCEL/REJ row, stamped with the
+        broker's time."""
+        rows: list[dict[str, Any]] = []
+        base = {"ts": state.created_ts, "event_ts": ev.ts, "tag": state.tag}
+        if ev.kind == "ACK":
+            self._transition(state, "ACK", ev.ts)
+        elif ev.kind in ("PARTIAL", "FILL"):
+            self._transition(state, ev.kind, ev.ts, px=ev.px, qty=ev.qty)
+            rows.append(
+                {
+                    **base,
+                    "kind": "FILL",
+                    "fill_qty": ev.qty,
+                    "avg_px": state.avg_fill_px,
+                    "symbol": state.symbol,
+                    "side": state.side,
+                }
+            )
+        elif ev.kind == "CANCEL":
+            self._transition(state, "CANCEL", ev.ts)
+            rows.append({**base, "kind": "CANCEL"})
+        elif ev.kind == "REJ":
+            self._transition(state, "REJ", ev.ts, reason=ev.reason or "")
+            rows.append({**base, "kind": "REJ", "reason": ev.reason})
+        if rows:
+            self._log(ev.ts, rows)
+
+
 @app.command()
 def main(
     queue: str = "data/queue.db",
     ledger_root: str = "data/exec",
     max_loop: int = 0,
     poll_sec: float = 0.25,
+    concurrency: int = 4,
+    broker: str = typer.Option("ib", help="ib | fake (local stand-in, no gateway)"),
+    fake_bars: str | None = typer.Option(None, help="fake broker: fill from this bars parquet"),
+    state_root: str = typer.Option("data/exec_state", help="Order state snapshot + log"),
+    symbols: str = typer.Option("SPY", help="Comma-separated symbols intents may trade"),
 ) -> None:
     """Run execution worker consuming from intent queue."""
     con = connect(queue)
@@ -53,113 +323,74 @@ def main(
     port = int(os.environ.get("IB_GATEWAY_PORT", "7497"))
     cid = int(os.environ.get("IB_CLIENT_ID", "7"))
 
-    typer.echo(f"Connecting to IBKR at {host}:{port} with client ID {cid}")
-    ib = IBKRAdapter(host, port, cid)
-    ib.connect()
-
     # Risk configuration
     risk = RiskConfig(
         max_notional=2000.0,
         price_band_bps=150,
-        symbol_whitelist={"SPY"},
+        symbol_whitelist={s.strip().upper() for s in symbols.split(",") if s.strip()},
         max_open_orders=3,
         daily_loss_stop_pct=1.0,
         killswitch_path="RUN/HALT",
+        equity_usd=float(os.environ.get("EQUITY_USD", "30000")),
     )
 
-    typer.echo(f"Starting execution worker, queue: {queue}")
-    typer.echo(
-        f"Risk limits: max_notional={risk.max_notional}, price_band={risk.price_band_bps}bps"
-    )
+    # HALT file is watched in the background; SIGUSR1/SIGUSR2 halt/clear this process
+    get_killswitch(risk.killswitch_path, watch=True).install_signal_handlers()
 
-    loops = 0
-    while True:
-        try:
-            row = reserve(con, "order_intents")
-            if not row:
-                time.sleep(poll_sec)
-                loops += 1
-                if max_loop and loops >= max_loop:
-                    break
-                continue
-
-            # Extract order details
-            tag, payload = row["tag"], row["payload"]
-            ts = datetime.now(UTC)
-            order = NewOrder.model_validate(payload)
-
-            typer.echo(f"Processing intent: {tag}")
-
-            # Setup ledger path
-            day = ts.date().isoformat()
-            ledger_path = f"{ledger_root}/{day}/ledger.parquet"
-
-            # Check idempotency
-            if check_idempotency(tag, ledger_root):
-                typer.echo(f"Order {tag} already processed, skipping")
-                ack(con, row["id"])
-                continue
-
-            # Log intent received
-            append_ledger(
-                ledger_path,
-                [
-                    {
-                        "ts": ts,
-                        "kind": "INTENT",
-                        "tag": tag,
-                        "symbol": order.symbol,
-                        "side": order.side,
-                        "qty": order.qty,
-                        "limit": order.limit,
-                    }
-                ],
+    # Stateful risk: seeded once from today's ledger, then kept current from our own rows
+    book = RiskBook()
+    today = datetime.now(UTC).date().isoformat()
+    book.seed_from_ledger(Path(ledger_root) / today / "ledger.parquet")
+
+    async def run() -> None:
+        ib: Any
+        if broker == "fake":
+            typer.echo("Using fake broker")
+            ib = FakeAdapter(
+                FakeConfig(fill_model="bars" if fake_bars else "instant", bars_path=fake_bars)
             )
+        else:
+            typer.echo(f"Connecting to IBKR at {host}:{port} with client ID {cid}")
+            ib = IBKRAdapter(host, port, cid)
+        await ib.connect_async()
+        store = OrderStateStore(state_root)
+        pipeline = ExecPipeline(
+            con,
+            ib,
+            risk,
+            ledger_root,
+            book=book,
+            concurrency=concurrency,
+            poll_sec=poll_sec,
+            store=store,
+        )
+        t_rec = time.perf_counter()
+        closed, unresolved, orphans = await pipeline.recover()
+        typer.echo(
+            f"Recovered {len(pipeline.states)} live orders in "
+            f"{(time.perf_counter() - t_rec) * 1e3:.1f}ms; closed {len(closed)} from the "
+            "broker's executions/status"
+        )
+        if unresolved:
+            typer.echo(f"Not open at broker and no final status, left live: {unresolved}", err=True)
+        if orphans:
+            typer.echo(f"Broker has open orders unknown to the store: {orphans}", err=True)
+        typer.echo(f"Starting execution worker, queue: {queue}, concurrency: {concurrency}")
+        typer.echo(
+            f"Risk limits: max_notional={risk.max_notional}, "
+            f"price_band={risk.price_band_bps}bps, max_open_orders={risk.max_open_orders}, "
+            f"open_now={book.open_order_count}"
+        )
+        try:
+            await pipeline.run(max_loop=max_loop)
+        finally:
+            store.close()
+            ib.disconnect()
 
-            # Risk pre-check (using limit as proxy for last price)
-            ok, reason = pretrade_check(order, order.limit or 0.0, risk)
-
-            if not ok:
-                typer.echo(f"Risk check failed: {reason}", err=True)
-                append_ledger(
-                    ledger_path, [{"ts": ts, "kind": "REJ", "tag": tag, "reason": reason}]
-                )
-                nack(con, row["id"], dead=True)
-                continue
-
-            # Place order via IBKR
-            try:
-                res = ib.place(order)
-                order_id = res.trade.order.orderId if hasattr(res.trade.order, "orderId") else None
-                append_ledger(
-                    ledger_path,
-                    [
-                        {
-                            "ts": ts,
-                            "event_ts": res.ack_ts,
-                            "kind": "ACK",
-                            "tag": tag,
-                            "order_id": order_id,
-                        }
-                    ],
-                )
-                typer.echo(f"Order placed: {tag} -> trade={res.trade}")
-                ack(con, row["id"])
-
-            except Exception as e:
-                typer.echo(f"Failed to place order: {e}", err=True)
-                append_ledger(
-                    ledger_path, [{"ts": ts, "kind": "REJ", "tag": tag, "reason": str(e)}]
-                )
-                # Recoverable error - return to queue
-                nack(con, row["id"], dead=False)
-
-        except KeyboardInterrupt:
-            typer.echo("Shutting down...")
-            break
-        except Exception as e:
-            typer.echo(f"Worker error: {e}", err=True)
-            time.sleep(1.0)
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        typer.echo("Shutting down...")
 
 
 if __name__ == "__main__":
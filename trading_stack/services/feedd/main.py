@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import random
+import time
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
@@ -10,6 +11,7 @@ import pandas as pd
 import typer
 
 from trading_stack.adapters.alpaca.feed import capture_trades, stream_trades
+from trading_stack.core.latency import maybe_dump, record, span
 from trading_stack.core.schemas import Bar1s, MarketTrade
 from trading_stack.core.schemas import MarketTrade as MT
 from trading_stack.ingest.aggregators import aggregate_trades_to_1s_bars
@@ -72,6 +74,7 @@ class _BarBucket:
     low: float
     c: float
     v: int
+    ingest: datetime | None = None  # arrival of the bar's latest trade (latency origin)
 
 @app.command("live-alpaca")
 def live_alpaca(
@@ -109,20 +112,25 @@ def live_alpaca(
         trades_buf: list[MarketTrade] = []
         next_flush = _utcnow() + timedelta(seconds=flush_sec)
         async for t in stream_trades(symbol, feed=feed):
-            trades_buf.append(t)
-            sec = t.ts.replace(microsecond=0, tzinfo=UTC)
-            b = buckets.get(sec)
-            px = float(t.price)
-            if b is None:
-                buckets[sec] = _BarBucket(o=px, h=px, low=px, c=px, v=int(t.size))
-            else:
-                b.h = max(b.h, px)
-                b.low = min(b.low, px)
-                b.c = px
-                b.v += int(t.size)
+            with span("feedd.aggregate"):
+                trades_buf.append(t)
+                sec = t.ts.replace(microsecond=0, tzinfo=UTC)
+                b = buckets.get(sec)
+                px = float(t.price)
+                if b is None:
+                    buckets[sec] = _BarBucket(
+                        o=px, h=px, low=px, c=px, v=int(t.size), ingest=t.ingest_ts
+                    )
+                else:
+                    b.h = max(b.h, px)
+                    b.low = min(b.low, px)
+                    b.c = px
+                    b.v += int(t.size)
+                    b.ingest = t.ingest_ts
 
             now = _utcnow()
             if now >= next_flush:
+                t_flush = time.perf_counter_ns()
                 root = _day_dir(out_root, now)
                 trades_path = root / f"trades_{symbol}.parquet"
                 bars_path = root / f"bars1s_{symbol}.parquet"
@@ -142,10 +150,16 @@ def live_alpaca(
                         ))
                 if new_bars:
                     df_bars = pd.DataFrame([b.model_dump(mode="json") for b in new_bars])
+                    # engined stamps this on intents so e2e latency starts at feedd
+                    df_bars["ingest_ts"] = pd.to_datetime(
+                        pd.Series([buckets[b.ts].ingest for b in new_bars]), utc=True
+                    )
                     _append_parquet(bars_path, df_bars)
                     last_written_sec = new_bars[-1].ts
 
                 next_flush = now + timedelta(seconds=flush_sec)
+                record("feedd.flush", t_flush)
+                maybe_dump("feedd")
 
     asyncio.run(run())
 
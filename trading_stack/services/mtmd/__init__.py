@@ -0,0 +1 @@
+"""Mark-to-market service publishing equity, peak and drawdown."""
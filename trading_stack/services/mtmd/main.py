@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import typer
+
+from trading_stack.accounting.daily import opening_positions
+from trading_stack.accounting.mtm import MarkToMarket, publish
+from trading_stack.accounting.positions import PositionsEngine
+from trading_stack.tca.arrival import ArrivalPriceIndex
+
+app = typer.Typer(help="Mark positions to the latest bar close and publish the equity curve")
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+def _append_curve(path: Path, rows: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = pd.DataFrame(rows)
+    if path.exists():
+        df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+    df.to_parquet(path, index=False)
+
+
+@app.command()
+def main(
+    ledger_root: str = "data/exec",
+    live_root: str = "data/live",
+    out_root: str = "data/accounting",
+    state_path: str = "RUN/mtm.json",
+    equity_usd: float = typer.Option(30000.0, envvar="EQUITY_USD", help="Starting equity"),
+    window_min: float = 30.0,
+    interval_sec: float = 1.0,
+    flush_sec: float = 30.0,
+) -> None:
+    """Every tick: fold new fills, mark held symbols, publish `state_path` atomically.
+    Equity-curve rows are buffered and appended to parquet every `flush_sec`."""
+    mtm = MarkToMarket(equity_usd)
+    marks = ArrivalPriceIndex()
+    day = ""
+    eng: PositionsEngine | None = None
+    curve: list[dict[str, Any]] = []
+    last_flush = time.monotonic()
+    try:
+        while True:
+            now = _now()
+            today = now.date().isoformat()
+            # A torn read of a parquet being rewritten fails one tick, not the daemon
+            try:
+                if today != day:  # per-day ledger: restart the curve, carry positions
+                    if curve:
+                        _append_curve(Path(out_root) / day / "equity_curve.parquet", curve)
+                        curve = []
+                    opening = opening_positions(ledger_root, out_root, today)
+                    new_eng = PositionsEngine(Path(ledger_root) / today / "ledger.parquet", opening)
+                    mtm = MarkToMarket(equity_usd, window_sec=window_min * 60.0)
+                    for pos in new_eng.positions.values():  # overnight carry, marked below
+                        mtm.set_position(pos)
+                    eng, day = new_eng, today
+                assert eng is not None
+                if eng.update():
+                    for pos in eng.positions.values():
+                        mtm.set_position(pos)
+                days = sorted(p for p in Path(live_root).glob("*") if p.is_dir())
+                if days:
+                    for sym in mtm.qty:
+                        bars = days[-1] / f"bars1s_{sym}.parquet"
+                        if marks.refresh(bars) or sym not in mtm.marks:
+                            px = marks.arrival(sym, now, "last")
+                            if px is not None:
+                                mtm.mark(sym, px)
+                state = mtm.update(now)
+                publish(state, state_path)
+                curve.append(
+                    {
+                        "ts": now,
+                        "equity": state.equity,
+                        "realized_pnl": state.realized_pnl,
+                        "unrealized_pnl": state.unrealized_pnl,
+                        "drawdown_pct": state.drawdown_pct,
+                    }
+                )
+                if time.monotonic() - last_flush >= flush_sec:
+                    _append_curve(Path(out_root) / day / "equity_curve.parquet", curve)
+                    curve, last_flush = [], time.monotonic()
+            except Exception as e:
+                typer.echo(f"Error in mtm tick: {e}", err=True)
+            time.sleep(interval_sec)
+    finally:
+        if curve:
+            _append_curve(Path(out_root) / day / "equity_curve.parquet", curve)
+
+
+if __name__ == "__main__":
+    app()
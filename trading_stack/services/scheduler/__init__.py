@@ -0,0 +1 @@
+"""Single-process advisor and controller scheduling across many symbols."""
@@ -0,0 +1,311 @@
+"""Advisor proposals and controller decisions for many symbols in one asyncio process.
+
+Each symbol's tasks start in one of `phase_slots` fixed phases inside their interval,
+picked from the symbol name, so reads spread over the interval instead of landing on the
+same tick (and a restart schedules them identically). Symbols sharing a slot and an
+interval come due together, and each tick's due advisor tasks go through one shared
+router in a single `propose_many`. Proposal and applied rows are handed to the controller guards
+in memory and buffered per file, appended together every `flush_sec`; the files are
+only read back when a symbol's guards are (re)built.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import zlib
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import typer
+
+from trading_stack.accounting.mtm import MtmReader
+from trading_stack.llm.advisor import LLMParamProposal, bar_features, proposal_row
+from trading_stack.llm.router import AsyncRouter, get_provider
+from trading_stack.params.runtime import RuntimeParams
+from trading_stack.services.controller.apply_params import decide
+from trading_stack.services.controller.guards import GuardState
+
+app = typer.Typer(help="Advisor + controller for many symbols in one process.")
+
+ADVISOR, CONTROLLER = "advisor", "controller"
+
+
+def phase(key: str, interval_sec: float, slots: int = 5) -> float:
+    """Deterministic offset in [0, interval_sec) for `key`: the start of one of `slots`
+    equal slices of the interval."""
+    return zlib.crc32(key.encode()) % slots * interval_sec / slots
+
+
+@dataclass(frozen=True)
+class SymbolSpec:
+    symbol: str
+    advisor_sec: float = 5.0
+    controller_sec: float = 5.0
+
+
+def parse_symbols(
+    spec: str, advisor_sec: float = 5.0, controller_sec: float = 5.0
+) -> list[SymbolSpec]:
+    """Parse "SPY,QQQ:10,IWM:10:30": SYMBOL[:advisor_sec[:controller_sec]] items."""
+    out: dict[str, SymbolSpec] = {}
+    for item in spec.split(","):
+        parts = [p.strip() for p in item.split(":")]
+        if not parts[0]:
+            continue
+        adv = float(parts[1]) if len(parts) > 1 and parts[1] else advisor_sec
+        ctl = float(parts[2]) if len(parts) > 2 and parts[2] else controller_sec
+        out[parts[0].upper()] = SymbolSpec(parts[0].upper(), adv, ctl)
+    return [out[s] for s in sorted(out)]
+
+
+class RowBuffer:
+    """Rows waiting to be appended, per parquet file; a flush is one read+concat+write
+    per file however many rows it collected. A file whose write fails keeps its rows for
+    the next flush; the other files are still written and the first error is re-raised."""
+
+    def __init__(self) -> None:
+        self.rows: dict[Path, list[dict[str, Any]]] = {}
+        self.writes = 0
+
+    def add(self, path: Path, row: dict[str, Any]) -> None:
+        self.rows.setdefault(path, []).append(row)
+
+    def flush(self, paths: Sequence[Path] | None = None) -> None:
+        errors: list[Exception] = []
+        for path in sorted(self.rows) if paths is None else paths:
+            rows = self.rows.get(path)
+            if not rows:
+                continue
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                df_new = pd.DataFrame(rows)
+                if path.exists():
+                    df = pd.concat([pd.read_parquet(path), df_new], ignore_index=True)
+                else:
+                    df = df_new
+                df.to_parquet(path, index=False)
+            except Exception as e:
+                errors.append(e)
+                continue
+            del self.rows[path]
+            self.writes += 1
+        if errors:
+            raise errors[0]
+
+
+@dataclass
+class _Controller:
+    rp: RuntimeParams
+    params_path: Path
+    guards: GuardState | None = None
+    day: str = ""
+
+
+@dataclass
+class Scheduler:
+    specs: Sequence[SymbolSpec]
+    router: AsyncRouter
+    bars_dir: str | Path = "data/live"
+    llm_root: str | Path = "data/llm"
+    live_root: str | Path = "data/live"
+    ledger_root: str | Path = "data/exec"
+    params_root: str | Path = "data/params"
+    flush_sec: float = 15.0
+    delta_cap_bps: float = 0.2
+    min_bps: float = 0.3
+    max_bps: float = 3.0
+    phase_slots: int = 5
+    mtm: MtmReader | None = None
+    buffer: RowBuffer = field(default_factory=RowBuffer)
+
+    def __post_init__(self) -> None:
+        self.bars_dir, self.llm_root = Path(self.bars_dir), Path(self.llm_root)
+        self.live_root, self.params_root = Path(self.live_root), Path(self.params_root)
+        self._specs = {s.symbol: s for s in self.specs}
+        self._controllers: dict[str, _Controller] = {}
+        self._heap: list[tuple[float, str, str]] = []
+        self._next_flush: float | None = None
+
+    def start(self, t0: float) -> None:
+        """Schedule every task at its phase offset from `t0` (epoch seconds)."""
+        self._heap = []
+        n = self.phase_slots
+        for s in self._specs.values():
+            self._heap.append(
+                (t0 + phase(f"{ADVISOR}:{s.symbol}", s.advisor_sec, n), ADVISOR, s.symbol)
+            )
+            self._heap.append(
+                (t0 + phase(f"{CONTROLLER}:{s.symbol}", s.controller_sec, n), CONTROLLER, s.symbol)
+            )
+        heapq.heapify(self._heap)
+        self._next_flush = t0 + self.flush_sec
+
+    def next_due(self) -> float:
+        due = self._heap[0][0] if self._heap else float("inf")
+        return min(due, self._next_flush if self._next_flush is not None else due)
+
+    def _paths(self, symbol: str, day: str) -> tuple[Path, Path, Path]:
+        root = Path(self.llm_root) / day
+        return (
+            Path(self.bars_dir) / day / f"bars1s_{symbol}.parquet",
+            root / f"proposals_{symbol}.parquet",
+            root / f"applied_{symbol}.parquet",
+        )
+
+    async def step(self, now: datetime) -> None:
+        """Run every task due at `now`, then flush when the flush interval is up. A symbol
+        whose files cannot be read is logged and skipped; the others still run."""
+        t = now.timestamp()
+        if self._next_flush is None:
+            self.start(t)
+        due: dict[str, list[str]] = {ADVISOR: [], CONTROLLER: []}
+        while self._heap and self._heap[0][0] <= t:
+            at, kind, symbol = heapq.heappop(self._heap)
+            due[kind].append(symbol)
+            spec = self._specs[symbol]
+            every = spec.advisor_sec if kind == ADVISOR else spec.controller_sec
+            nxt = at + every
+            if nxt <= t:  # fell behind: skip the missed runs, keep the phase
+                nxt += ((t - nxt) // every + 1) * every
+            heapq.heappush(self._heap, (nxt, kind, symbol))
+        day = now.date().isoformat()
+        if due[ADVISOR]:
+            await self._advise(sorted(due[ADVISOR]), now, day)
+        if due[CONTROLLER]:
+            self._control(sorted(due[CONTROLLER]), now, day)
+        if self._next_flush is not None and t >= self._next_flush:
+            try:
+                self.buffer.flush()
+            except Exception as e:
+                typer.echo(f"Error flushing scheduler rows: {e}", err=True)
+            self._next_flush = t + self.flush_sec
+
+    async def _advise(self, symbols: list[str], now: datetime, day: str) -> None:
+        feats: dict[str, dict[str, float]] = {}
+        for symbol in symbols:
+            bars_path = self._paths(symbol, day)[0]
+            if not bars_path.exists():
+                continue
+            try:
+                feats[symbol] = bar_features(bars_path, window_sec=120)
+            except Exception as e:
+                typer.echo(f"Error reading bars for {symbol}: {e}", err=True)
+        # One batch through the shared router: shared budget, regime cache and deadline
+        routed = await self.router.propose_many(feats)
+        for symbol, r in routed.items():
+            proposal = LLMParamProposal(
+                ts=now, symbol=symbol, params=r.response.params, notes=r.response.notes
+            )
+            row = proposal_row(proposal, r.provider, r.cost_usd)
+            self.buffer.add(self._paths(symbol, day)[1], row)
+            ctl = self._controllers.get(symbol)
+            if ctl is not None and ctl.guards is not None and ctl.day == day:
+                ctl.guards.llm.add_proposal(now, r.response.params.get("signal.threshold_bps"))
+
+    def _control(self, symbols: list[str], now: datetime, day: str) -> None:
+        days = [p for p in Path(self.live_root).glob("*") if p.is_dir()]
+        live_day = max(days) if days else None  # one scan for all symbols
+        for symbol in symbols:
+            try:
+                self._control_one(symbol, now, day, live_day)
+            except Exception as e:
+                typer.echo(f"Error in controller for {symbol}: {e}", err=True)
+
+    def _control_one(self, symbol: str, now: datetime, day: str, live_day: Path | None) -> None:
+        ctl = self._controller(symbol, day)
+        assert ctl.guards is not None
+        ctl.guards.update(now, live_day, llm=False)
+        row = decide(ctl.rp, ctl.guards, now, self.delta_cap_bps, self.min_bps, self.max_bps)
+        if row is None:
+            return
+        if not row["freeze"]:
+            ctl.rp.save(ctl.params_path)
+        self.buffer.add(self._paths(symbol, day)[2], row)
+        ctl.guards.llm.add_applied(now, row["delta_bps"])
+
+    def _controller(self, symbol: str, day: str) -> _Controller:
+        ctl = self._controllers.get(symbol)
+        if ctl is None:
+            params_path = Path(self.params_root) / f"runtime_{symbol}.json"
+            ctl = _Controller(RuntimeParams.load(params_path, symbol), params_path)
+            self._controllers[symbol] = ctl
+        if ctl.day != day:  # first tick or UTC day rollover: new proposals/applied files
+            _, proposals_path, applied_path = self._paths(symbol, day)
+            self.buffer.flush([proposals_path, applied_path])
+            ctl.guards = GuardState(
+                symbol,
+                self.live_root,
+                self.ledger_root,
+                proposals_path,
+                applied_path,
+                mtm=self.mtm,
+                max_accept_rate=0.30,
+                window_min=15,
+            )
+            ctl.guards.llm.update()  # rows already on disk; later ones are fed in memory
+            ctl.day = day
+        return ctl
+
+    async def run(self, clock: Callable[[], datetime] = lambda: datetime.now(UTC)) -> None:
+        try:
+            while True:
+                await self.step(clock())
+                delay = self.next_due() - clock().timestamp()
+                await asyncio.sleep(max(delay, 0.0))
+        finally:
+            self.buffer.flush()
+
+
+@app.command()
+def main(
+    symbols: str = typer.Option("SPY", help="SYMBOL[:advisor_sec[:controller_sec]],..."),
+    bars_dir: str = "data/live",
+    llm_root: str = "data/llm",
+    live_root: str = "data/live",
+    ledger_root: str = "data/exec",
+    params_root: str = "data/params",
+    provider: str = typer.Option("rules", help="Provider, or comma-separated providers"),
+    advisor_sec: float = 5.0,
+    controller_sec: float = 5.0,
+    flush_sec: float = typer.Option(15.0, help="Append buffered proposal/applied rows this often"),
+    budget_usd: float = typer.Option(10.0, help="Shared by all symbols"),
+    deadline_sec: float = typer.Option(2.0, help="Per-call deadline before the rules fallback"),
+    delta_cap_bps: float = 0.2,
+    min_bps: float = 0.3,
+    max_bps: float = 3.0,
+    phase_slots: int = typer.Option(5, min=1, help="Start offsets per interval; 1 = all at once"),
+    mtm_path: str = typer.Option(
+        "RUN/mtm.json", help="mtmd state; its drawdown (portfolio-wide) wins while fresh. '' = off"
+    ),
+    mtm_max_age_sec: float = typer.Option(10.0, help="Older mtm state falls back to own P&L"),
+) -> None:
+    router = AsyncRouter(
+        [get_provider(k.strip()) for k in provider.split(",") if k.strip()],
+        budget_usd=budget_usd,
+        deadline_sec=deadline_sec,
+    )
+    sched = Scheduler(
+        parse_symbols(symbols, advisor_sec, controller_sec),
+        router,
+        bars_dir=bars_dir,
+        llm_root=llm_root,
+        live_root=live_root,
+        ledger_root=ledger_root,
+        params_root=params_root,
+        flush_sec=flush_sec,
+        delta_cap_bps=delta_cap_bps,
+        min_bps=min_bps,
+        max_bps=max_bps,
+        phase_slots=phase_slots,
+        mtm=MtmReader(mtm_path, max_age_sec=mtm_max_age_sec) if mtm_path else None,
+    )
+    asyncio.run(sched.run())
+
+
+if __name__ == "__main__":
+    app()
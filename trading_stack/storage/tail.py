@@ -0,0 +1,53 @@
+"""Row-offset tail over an append-only parquet file (rewritten whole on every append)."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+class ParquetTail:
+    """
+    `poll()` returns only the rows appended since the previous poll. The file is re-read
+    only when its (mtime_ns, size, inode) changed, and the row count comes from the
+    parquet footer first, so an unchanged or same-length file costs a stat and a footer
+    read. A grown file is still parsed whole (writers rewrite it as a single row group),
+    so that read grows with the file; what the tail saves is the callers re-processing
+    old rows. If the file shrinks it was replaced: `reset` is set and the whole file
+    returns.
+    """
+
+    def __init__(self, path: str | Path, columns: list[str] | None = None, offset: int = 0) -> None:
+        self.path = Path(path)
+        self.columns = columns
+        self.offset = offset
+        self.reset = False
+        self._key: tuple[int, int, int] | None = None
+
+    def poll(self) -> pd.DataFrame:
+        self.reset = False
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return pd.DataFrame(columns=self.columns)
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if key == self._key:
+            return pd.DataFrame(columns=self.columns)
+        n = pq.ParquetFile(self.path).metadata.num_rows
+        self._key = key
+        if n == self.offset:
+            return pd.DataFrame(columns=self.columns)
+        cols = self.columns
+        if cols is not None:  # tolerate columns that older rows never had
+            have = set(pq.read_schema(self.path).names)
+            cols = [c for c in cols if c in have]
+        df = pd.read_parquet(self.path, columns=cols)
+        if len(df) < self.offset:
+            self.reset = True
+            self.offset = 0
+        new = df.iloc[self.offset :].reset_index(drop=True)
+        self.offset = len(df)
+        return new
@@ -0,0 +1,109 @@
+"""Arrival-price index: sorted per-symbol bar arrays answering asof lookups by binary search."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+ArrivalKind = Literal["last", "mid", "vwap"]
+_COLS = ["ts", "symbol", "high", "low", "close", "volume"]
+
+
+@dataclass
+class _Series:
+    ts: np.ndarray  # int64 ns, sorted ascending
+    last: np.ndarray  # bar close
+    mid: np.ndarray  # (high + low) / 2 - bars carry no quotes, so this is the mid proxy
+    cum_pv: np.ndarray  # prefix sums with a leading 0: cum_pv[i] = sum(close*vol)[:i]
+    cum_v: np.ndarray
+
+    @classmethod
+    def empty(cls) -> _Series:
+        f, z = np.empty(0), np.zeros(1)
+        return cls(np.empty(0, dtype=np.int64), f, f, z, z)
+
+    def extend(self, df: pd.DataFrame) -> _Series:
+        """Append rows that are all newer than the current tail."""
+        pv = (df["close"] * df["volume"]).to_numpy(np.float64)
+        v = df["volume"].to_numpy(np.float64)
+        return _Series(
+            ts=np.concatenate([self.ts, _ts_ns(df["ts"])]),
+            last=np.concatenate([self.last, df["close"].to_numpy(np.float64)]),
+            mid=np.concatenate([self.mid, ((df["high"] + df["low"]) / 2).to_numpy(np.float64)]),
+            cum_pv=np.concatenate([self.cum_pv, self.cum_pv[-1] + np.cumsum(pv)]),
+            cum_v=np.concatenate([self.cum_v, self.cum_v[-1] + np.cumsum(v)]),
+        )
+
+
+class ArrivalPriceIndex:
+    """
+    Register bars files with `refresh(path)`; each call re-stats the file and, when it
+    changed, folds only the rows past the previous row count into the per-symbol arrays
+    (a rewrite that shrinks the file or goes back in time triggers a rebuild). Lookups
+    are `np.searchsorted` on the ts array, plus prefix sums for interval VWAP.
+    """
+
+    def __init__(self) -> None:
+        self.series: dict[str, _Series] = {}
+        self._files: dict[Path, tuple[tuple[int, int, int], int]] = {}  # key, rows seen
+
+    def refresh(self, path: str | Path) -> bool:
+        """Fold new rows of a bars parquet into the index; True when anything changed."""
+        p = Path(path)
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            return False
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        prev = self._files.get(p)
+        if prev is not None and prev[0] == key:
+            return False
+        df = pd.read_parquet(p, columns=_COLS)
+        seen = prev[1] if prev is not None else 0
+        tail = df.iloc[seen:] if len(df) >= seen else df
+        for sym, g in tail.groupby("symbol", sort=False):
+            cur = self.series.get(str(sym), _Series.empty())
+            g = g.sort_values("ts", kind="stable")
+            first = _ts_ns(g["ts"][:1])
+            if len(df) < seen or (cur.ts.size and first.size and first[0] < cur.ts[-1]):
+                whole = df[df["symbol"] == sym].sort_values("ts", kind="stable")
+                self.series[str(sym)] = _Series.empty().extend(whole)
+            else:
+                self.series[str(sym)] = cur.extend(g)
+        self._files[p] = (key, len(df))
+        return True
+
+    def arrival(
+        self,
+        symbol: str,
+        ts: datetime,
+        kind: ArrivalKind = "last",
+        window_sec: float = 60.0,
+    ) -> float | None:
+        """Price as of `ts` (last bar with bar.ts <= ts); VWAP is over (ts - window, ts]."""
+        s = self.series.get(symbol)
+        if s is None:
+            return None
+        t = int(pd.Timestamp(ts).as_unit("ns").value)
+        i = int(np.searchsorted(s.ts, t, side="right"))
+        if i == 0:
+            return None
+        if kind == "last":
+            return float(s.last[i - 1])
+        if kind == "mid":
+            return float(s.mid[i - 1])
+        j = int(np.searchsorted(s.ts, t - int(window_sec * 1e9), side="right"))
+        vol = s.cum_v[i] - s.cum_v[j]
+        if vol <= 0:
+            return float(s.last[i - 1])
+        return float((s.cum_pv[i] - s.cum_pv[j]) / vol)
+
+
+def _ts_ns(ts: pd.Series) -> np.ndarray:
+    return np.asarray(pd.to_datetime(ts, utc=True).dt.as_unit("ns").astype("int64"))
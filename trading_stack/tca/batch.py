@@ -0,0 +1,187 @@
+"""Batch TCA: every FILL of a day asof-joined to bars (and trades when captured) for
+arrival shortfall, interval-VWAP slippage, a spread-cost proxy and markouts."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import typer
+
+app = typer.Typer(help="Batch transaction-cost analysis over ledger fills")
+
+MARKOUTS_SEC: tuple[int, ...] = (1, 5, 30, 60)
+_BAR_COLS = ["ts", "symbol", "high", "low", "close", "volume"]
+
+
+def fills_frame(ledger: pd.DataFrame) -> pd.DataFrame:
+    """One row per FILL with symbol/side (from INTENT when missing), the intent time and
+    the per-fill price recovered from the cumulative avg_px per tag."""
+    if ledger.empty or "kind" not in ledger.columns:
+        return pd.DataFrame()
+    fills = ledger[ledger["kind"] == "FILL"].copy()
+    if fills.empty:
+        return pd.DataFrame()
+    intents = ledger[ledger["kind"] == "INTENT"].drop_duplicates("tag").set_index("tag")
+    for c in ("symbol", "side"):
+        by_tag = fills["tag"].map(intents[c]) if c in intents.columns else None
+        if c not in fills.columns:
+            fills[c] = by_tag
+        elif by_tag is not None:
+            fills[c] = fills[c].fillna(by_tag)
+    t_intent = fills["tag"].map(intents["ts"]) if "ts" in intents.columns else None
+    fills["intent_ts"] = pd.to_datetime(
+        t_intent.fillna(fills["ts"]) if t_intent is not None else fills["ts"], utc=True
+    )
+    fills["event_ts"] = pd.to_datetime(fills["event_ts"], utc=True)
+    fills = fills.dropna(subset=["symbol", "side"]).reset_index(drop=True)
+    q = fills["fill_qty"].astype(float).to_numpy()
+    a = fills["avg_px"].astype(float).to_numpy()
+    tags = fills["tag"].to_numpy()
+    aq = a * pd.Series(q).groupby(tags).cumsum().to_numpy()
+    aq_prev = pd.Series(aq).groupby(tags).shift(fill_value=0.0).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fills["px"] = np.where(q > 0, (aq - aq_prev) / q, np.nan)
+    fills["fill_qty"] = q
+    fills["sign"] = np.where(fills["side"].astype(str).str.upper() == "BUY", 1.0, -1.0)
+    cols = ["tag", "symbol", "side", "sign", "intent_ts", "event_ts", "fill_qty", "px"]
+    return fills[cols]
+
+
+def batch_tca(
+    fills: pd.DataFrame,
+    bars: pd.DataFrame,
+    trades: pd.DataFrame | None = None,
+    markouts_sec: Sequence[int] = MARKOUTS_SEC,
+) -> pd.DataFrame:
+    """
+    Costs in bps, positive = cost to us, for the rows of `fills_frame`:
+    - arrival_shortfall_bps: px vs the last bar close at or before the intent;
+    - ivwap_slippage_bps: px vs bar VWAP over (intent, fill], from prefix sums;
+    - spread_cost_bps: px vs the fill bar's (high + low) / 2 - bars carry no quotes;
+    - markout_{h}s_bps: mark h seconds after the fill vs px (positive = favourable),
+      marked on trades when given, else on bar closes; NaN while the symbol has no
+      mark at or past fill + h yet, so fills near the end of the data are not marked
+      on a stale price.
+    Every lookup is one `merge_asof(by="symbol")` over the whole frame.
+    """
+    if fills.empty:
+        return pd.DataFrame()
+    b = bars[_BAR_COLS].copy()
+    b["ts"] = pd.to_datetime(b["ts"], utc=True)
+    b = b.sort_values("ts", kind="stable")
+    pv = (b["close"] * b["volume"]).astype(float)
+    b["cum_pv"] = pv.groupby(b["symbol"]).cumsum()
+    b["cum_v"] = b["volume"].astype(float).groupby(b["symbol"]).cumsum()
+    b["mid"] = (b["high"] + b["low"]) / 2.0
+
+    out = fills.reset_index(drop=True).copy()
+    out["_row"] = np.arange(len(out))
+
+    def asof(on: str, right: pd.DataFrame, cols: list[str], shift_sec: float = 0.0) -> pd.DataFrame:
+        left = out[["_row", "symbol", on]].copy()
+        left["_t"] = (left[on] + pd.Timedelta(seconds=shift_sec)).dt.as_unit("ns")
+        r = right[["ts", "symbol", *cols]].rename(columns={"ts": "_t"})
+        r["_t"] = r["_t"].dt.as_unit("ns")
+        m = pd.merge_asof(
+            left.sort_values("_t", kind="stable"), r, on="_t", by="symbol", direction="backward"
+        )
+        return m.sort_values("_row").reset_index(drop=True)
+
+    at_intent = asof("intent_ts", b, ["close", "cum_pv", "cum_v"])
+    at_fill = asof("event_ts", b, ["mid", "cum_pv", "cum_v"])
+    px, sign = out["px"].to_numpy(), out["sign"].to_numpy()
+    arrival = at_intent["close"].to_numpy(np.float64)
+    d_pv = at_fill["cum_pv"].to_numpy(np.float64) - at_intent["cum_pv"].fillna(0.0).to_numpy()
+    d_v = at_fill["cum_v"].to_numpy(np.float64) - at_intent["cum_v"].fillna(0.0).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ivwap = np.where(d_v > 0, d_pv / d_v, np.nan)
+        mid = at_fill["mid"].to_numpy(np.float64)
+        out["arrival_px"] = arrival
+        out["arrival_shortfall_bps"] = sign * (px / arrival - 1.0) * 1e4
+        out["ivwap"] = ivwap
+        out["ivwap_slippage_bps"] = sign * (px / ivwap - 1.0) * 1e4
+        out["spread_cost_bps"] = sign * (px / mid - 1.0) * 1e4
+
+    if trades is not None and not trades.empty:
+        marks = trades[["ts", "symbol", "price"]].rename(columns={"price": "mark"}).copy()
+    else:
+        marks = b[["ts", "symbol", "close"]].rename(columns={"close": "mark"})
+    marks["ts"] = pd.to_datetime(marks["ts"], utc=True)
+    marks = marks.sort_values("ts", kind="stable")
+    last_mark = out["symbol"].map(marks.groupby("symbol")["ts"].max())
+    for h in markouts_sec:
+        mk = asof("event_ts", marks, ["mark"], shift_sec=h)["mark"].to_numpy(np.float64)
+        ahead = (out["event_ts"] + pd.Timedelta(seconds=h) <= last_mark).to_numpy(bool)
+        mk = np.where(ahead, mk, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[f"markout_{h}s_bps"] = sign * (mk / px - 1.0) * 1e4
+    return out.drop(columns="_row")
+
+
+def _read_symbol_files(day_dir: Path, prefix: str, symbols: list[str]) -> pd.DataFrame:
+    parts = [
+        pd.read_parquet(p) for s in symbols if (p := day_dir / f"{prefix}_{s}.parquet").exists()
+    ]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def tca_day(
+    day: str,
+    ledger_root: str | Path = "data/exec",
+    live_root: str | Path = "data/live",
+    out_root: str | Path = "data/tca",
+) -> Path | None:
+    """Write data/tca/{day}/tca.parquet for the day's fills; None when there are none."""
+    ledger = Path(ledger_root) / day / "ledger.parquet"
+    if not ledger.exists():
+        return None
+    fills = fills_frame(pd.read_parquet(ledger))
+    if fills.empty:
+        return None
+    symbols = sorted(fills["symbol"].astype(str).unique())
+    live = Path(live_root) / day
+    bars = _read_symbol_files(live, "bars1s", symbols)
+    if bars.empty:
+        return None
+    trades = _read_symbol_files(live, "trades", symbols)
+    out = Path(out_root) / day / "tca.parquet"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    batch_tca(fills, bars, trades).to_parquet(out, index=False)
+    return out
+
+
+def read_tca(out_root: str | Path, start: str, end: str | None = None) -> pd.DataFrame:
+    """Concatenate per-day TCA files for start..end (inclusive, ISO dates)."""
+    d0, d1 = date.fromisoformat(start), date.fromisoformat(end or start)
+    parts = []
+    while d0 <= d1:
+        p = Path(out_root) / d0.isoformat() / "tca.parquet"
+        if p.exists():
+            parts.append(pd.read_parquet(p))
+        d0 += timedelta(days=1)
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+@app.command()
+def run(
+    start: str,
+    end: str | None = None,
+    ledger_root: str = "data/exec",
+    live_root: str = "data/live",
+    out_root: str = "data/tca",
+) -> None:
+    """Compute per-day TCA for start..end (ISO dates, inclusive)."""
+    d0, d1 = date.fromisoformat(start), date.fromisoformat(end or start)
+    while d0 <= d1:
+        out = tca_day(d0.isoformat(), ledger_root, live_root, out_root)
+        if out is not None:
+            typer.echo(f"[tca] wrote {out}")
+        d0 += timedelta(days=1)
+
+
+if __name__ == "__main__":
+    app()